@@ -0,0 +1,80 @@
+"""
+Задержка ввода во время автосохранения большого проекта: сохранение
+в потоке Tk и резервная копия с записью в рабочем потоке (core.autosave)
+
+Ввод имитируется изменением ячейки баланса каждые TYPING_INTERVAL мс;
+задержка - насколько позже назначенного времени выполнился обработчик.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_autosave [строк баланса]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import benchmarks.bench_incremental_save as project_bench
+from benchmarks.bench_background import TimerLoop
+from core.autosave import Autosave
+from core.project_manager import ProjectManager
+
+TYPING_INTERVAL = 20  # мс
+KEYSTROKES = 100
+
+
+def make_app(rows):
+    project_bench.BALANCE_ROWS = rows
+    folder = tempfile.mkdtemp()
+    app = project_bench.make_app(folder, random.Random(1))
+    settings = {'auto_save': True, 'backup_interval': 10, 'backup_count': 3}
+    app.settings_manager.get_setting = lambda key, default=None: settings.get(key, default)
+    app.root = TimerLoop()
+    app.project_manager = ProjectManager(app)
+    app.autosave = Autosave(app)
+    return app
+
+
+def typing(app, save):
+    """Наибольшая задержка ввода, мс; save() вызывается перед первым нажатием"""
+    rnd = random.Random(2)
+    balance = app.main_window.balance_tab.table
+    delays = []
+
+    def schedule(delay):
+        due = time.perf_counter() + delay / 1000
+        app.root.after(delay, lambda: keystroke(due))
+
+    def keystroke(due):
+        delays.append(time.perf_counter() - due)
+        balance.set(rnd.randrange(len(balance)), 'q_day', rnd.uniform(1, 50))
+        if len(delays) < KEYSTROKES:
+            schedule(TYPING_INTERVAL)
+
+    app.root.after(0, save)
+    schedule(0)
+    app.root.run(lambda: len(delays) >= KEYSTROKES and not (app.autosave.job and app.autosave.job.running))
+    return max(delays) * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    app = make_app(rows)
+    file_path = os.path.join(app.settings_manager.projects_folder, "project.hydro")
+
+    def save_in_tk():
+        app.project_manager.collect_ui_data()
+        app.project_manager.current_project.save(file_path)
+
+    print(f"Строк баланса: {rows}, ввод каждые {TYPING_INTERVAL} мс")
+    for title, save in (("Сохранение в потоке Tk (первое)", save_in_tk),
+                        ("Сохранение в потоке Tk (повторное)", save_in_tk)):
+        print(f"{title:40s} задержка ввода до {typing(app, save):8.1f} мс")
+    app.project_manager.encoded_sections.clear()
+    for title in ("Автосохранение (первое)", "Автосохранение (повторное)"):
+        print(f"{title:40s} задержка ввода до {typing(app, app.autosave.save):8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
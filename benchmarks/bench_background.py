@@ -0,0 +1,173 @@
+"""
+Отзывчивость главного потока при пересчете большой таблицы участков:
+расчет в главном потоке и в рабочем потоке (utils.background)
+
+Вместо Tk используется простой цикл таймеров с тем же методом after;
+главный поток каждые 10 мс выполняет "обработку событий" и измеряется
+наибольшая пауза между ними. Если есть дисплей, расчет повторяется с
+настоящим Treeview: готовые порции перерисовываются так же, как во
+вкладке (BaseTab.refresh_rows).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_background
+"""
+
+import heapq
+import itertools
+import random
+import time
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+from models.calculation_data import CapacityTable
+from ui.tabs.base_tab import BaseTab
+from utils.background import BackgroundJob
+from utils.capacity_index import capacity_index
+from utils.solver_cache import solver_cache
+
+ROWS = 50000
+PLATFORMS = 40
+CHUNK = 1000
+TICK = 0.01
+
+
+class TimerLoop:
+    """Цикл таймеров с интерфейсом root.after / root.after_cancel"""
+    def __init__(self):
+        self._timers = []
+        self._counter = itertools.count()
+        self._cancelled = set()
+
+    def after(self, ms, callback):
+        timer = next(self._counter)
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, timer, callback))
+        return timer
+
+    def after_cancel(self, timer):
+        self._cancelled.add(timer)
+
+    def run(self, stop):
+        while self._timers and not stop():
+            due, timer, callback = heapq.heappop(self._timers)
+            if timer in self._cancelled:
+                self._cancelled.discard(timer)
+                continue
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            callback()
+
+
+def make_table(rnd):
+    table = CapacityTable()
+    for index in range(ROWS):
+        platforms = rnd.sample(range(1, PLATFORMS + 1), 2)
+        table.append(interval=f"A{index + 1}",
+                     platform=" + ".join(f"п.{number}" for number in platforms),
+                     diametr=rnd.choice([200, 250, 300, 400, 500]),
+                     i_uklon=rnd.choice([0.003, 0.005, 0.007]))
+    return table
+
+
+def run_background(loop, run, table, platform_q_day, refresh=None):
+    """Расчет в рабочем потоке: (время расчета, наибольшая пауза событий), с"""
+    snapshot = table.copy()
+    solver_cache.clear()
+    ticks = []
+
+    def tick():
+        ticks.append(time.perf_counter())
+        loop.after(int(TICK * 1000), tick)
+
+    def work(job):
+        rows = snapshot.calculate_flows(range(ROWS), platform_q_day)
+        for position in range(0, len(rows), CHUNK):
+            if job.cancelled:
+                return
+            chunk = rows[position:position + CHUNK]
+            snapshot.solve(chunk)
+            job.post(chunk)
+            job.progress(position + len(chunk), len(rows))
+
+    def apply(chunk):
+        table.copy_from(snapshot, chunk, CapacityTable.CALCULATED)
+        if refresh is not None:
+            refresh(chunk)
+
+    start = time.perf_counter()
+    job = BackgroundJob(loop, work, apply).start()
+    tick()
+    run(lambda: not job.running)
+    return time.perf_counter() - start, max(b - a for a, b in zip(ticks, ticks[1:]))
+
+
+def treeview_tab(table):
+    """Вкладка с настоящим Treeview, показывающим table (None без дисплея)"""
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    columns = [str(position) for position in range(len(table.view_names()))]
+    tab = object.__new__(BaseTab)
+    tab.bind_view(ttk.Treeview(root, columns=columns, show="headings"), table)
+    tab.refresh_view()
+    return tab
+
+
+def run_tk(root, stop):
+    while not stop():
+        root.update()
+        time.sleep(0.001)
+
+
+def main():
+    rnd = random.Random(1)
+    table = make_table(rnd)
+    platform_q_day = array('d', (rnd.uniform(10, 3000) for _ in range(PLATFORMS)))
+    len(capacity_index)
+
+    # Расчет в главном потоке: все это время события не обрабатываются
+    synchronous = table.copy()
+    solver_cache.clear()
+    start = time.perf_counter()
+    synchronous.recalculate(range(ROWS), platform_q_day)
+    blocked = time.perf_counter() - start
+
+    loop = TimerLoop()
+    background, max_gap = run_background(loop, loop.run, table, platform_q_day)
+
+    same = table.to_values() == synchronous.to_values()
+    print(f"Строк: {ROWS}, порция: {CHUNK}")
+    print(f"Главный поток:  расчет {blocked * 1000:8.0f} мс, события не обрабатываются "
+          f"{blocked * 1000:8.0f} мс")
+    print(f"Рабочий поток:  расчет {background * 1000:8.0f} мс, наибольшая пауза событий "
+          f"{max_gap * 1000:8.0f} мс")
+    print(f"Совпадение результатов: {'да' if same else 'НЕТ'}")
+
+    table = make_table(random.Random(1))
+    tab = treeview_tab(table)
+    if tab is None:
+        print("Treeview: нет дисплея, замер пропущен")
+        return
+    root = tab.view.master
+    chunk = range(CHUNK)
+    start = time.perf_counter()
+    for index in chunk[:100]:
+        tab.view.item(tab.view.get_children()[index], values=table.format_row(index))
+    per_row = (time.perf_counter() - start) / 100 * CHUNK
+    start = time.perf_counter()
+    tab.refresh_rows(chunk)
+    per_chunk = time.perf_counter() - start
+    print(f"Treeview, перерисовка порции: get_children на строку {per_row * 1000:8.0f} мс "
+          f"(оценка по 100 строкам), один раз на порцию {per_chunk * 1000:8.0f} мс")
+    background, max_gap = run_background(root, lambda stop: run_tk(root, stop),
+                                         table, platform_q_day, tab.refresh_rows)
+    print(f"Рабочий поток с Treeview: расчет {background * 1000:8.0f} мс, "
+          f"наибольшая пауза событий {max_gap * 1000:8.0f} мс")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Сравнение скорости расчета наполнения: исходная бисекция и текущий решатель
+
+Ускорение на порядок достигается только пакетным расчетом
+(filling_speed_batch); расчет по одной строке сравнивается для справки.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_filling_speed
+"""
+
+import random
+import time
+
+from functions import filling_speed, filling_speed_batch, HAS_NUMPY
+from benchmarks.legacy_solver import legacy_filling_speed
+
+ROWS = 10000
+DIAMETERS = [200, 250, 300, 400, 500]
+SLOPES = [0.003, 0.005, 0.007, 0.01]
+
+
+def make_rows(count, seed=1):
+    """Типичная таблица: расходы до 15 л/с на каталожных диаметрах без перегрузки"""
+    rnd = random.Random(seed)
+    return [(rnd.uniform(0.5, 15), rnd.choice(DIAMETERS), rnd.choice(SLOPES), 0.014)
+            for _ in range(count)]
+
+
+def per_row_time(func, rows):
+    """Среднее время расчета одной строки, мкс"""
+    start = time.perf_counter()
+    for row in rows:
+        func(*row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def main():
+    rows = make_rows(ROWS)
+
+    legacy = per_row_time(legacy_filling_speed, rows)
+    precise = per_row_time(lambda *row: legacy_filling_speed(*row, tolerance=1e-9), rows)
+    scalar = per_row_time(filling_speed, rows)
+    print(f"Строк: {ROWS}")
+    print(f"Исходная бисекция:       {legacy:8.2f} мкс/строка")
+    print(f"Бисекция, допуск 1e-9:   {precise:8.2f} мкс/строка")
+    print(f"filling_speed:           {scalar:8.2f} мкс/строка  (x{legacy / scalar:.1f}, "
+          f"x{precise / scalar:.1f} при равной точности)")
+
+    if HAS_NUMPY:
+        Q, d, i, n = (list(column) for column in zip(*rows))
+        start = time.perf_counter()
+        filling_speed_batch(Q, d, i, n)
+        batch = (time.perf_counter() - start) / ROWS * 1e6
+        print(f"filling_speed_batch:     {batch:8.2f} мкс/строка  (x{legacy / batch:.1f})")
+
+    # Точность относительно исходного алгоритма
+    max_diff = max(abs(filling_speed(*row)[0] - legacy_filling_speed(*row)[0]) for row in rows)
+    print(f"Макс. расхождение h/d с исходной бисекцией: {max_diff:.4f}")
+
+
+if __name__ == "__main__":
+    main()
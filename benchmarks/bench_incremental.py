@@ -0,0 +1,85 @@
+"""
+Пересчет площадок и участков после изменения одной ячейки баланса:
+полная перестройка таблиц и пересчет только помеченных узлов графа
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_incremental
+"""
+
+import random
+import time
+
+from models.balance_record import BalanceTable
+from models.calculation_data import PlatformTable, CapacityTable
+from models.dependency_graph import DependencyGraph, BALANCE, CAPACITY
+from utils.solver_cache import solver_cache
+
+BALANCE_ROWS = 20000
+PLATFORMS = 40
+CAPACITY_ROWS = 200
+EDITS = 50
+
+
+def make_tables(rnd):
+    balance = BalanceTable()
+    for index in range(BALANCE_ROWS):
+        balance.append(number_platform=str(rnd.randint(1, PLATFORMS)), number_phase="1",
+                       name=f"Потребитель {index + 1}", q_day=rnd.uniform(1, 50))
+    capacity = CapacityTable()
+    for index in range(CAPACITY_ROWS):
+        platforms = rnd.sample(range(1, PLATFORMS + 1), 2)
+        capacity.append(interval=f"A{index + 1}",
+                        platform=" + ".join(f"п.{number}" for number in platforms),
+                        diametr=rnd.choice([300, 400, 500, 600]), i_uklon=0.005)
+    return balance, capacity
+
+
+def full_update(balance, platforms, capacity, graph):
+    platforms.rebuild(balance, graph)
+    capacity.link(graph, platforms.keys)
+    capacity.recalculate(range(len(capacity)), platforms.column('q_day'))
+
+
+def incremental_update(balance, platforms, capacity, graph, index):
+    if not platforms.move_rows(balance, graph, [index]):
+        full_update(balance, platforms, capacity, graph)
+        return
+    graph.mark_dirty((BALANCE, index))
+    platforms.recompute_dirty(balance, graph)
+    capacity.recalculate(graph.take_dirty(CAPACITY), platforms.column('q_day'))
+
+
+def main():
+    rnd = random.Random(1)
+    balance, capacity = make_tables(rnd)
+    platforms, graph = PlatformTable(), DependencyGraph()
+    full_update(balance, platforms, capacity, graph)
+
+    edits = [(rnd.randrange(BALANCE_ROWS), rnd.uniform(1, 50)) for _ in range(EDITS)]
+
+    full_time = incremental_time = 0.0
+    for index, q_day in edits:
+        balance.set(index, 'q_day', q_day)
+        solver_cache.clear()
+        start = time.perf_counter()
+        incremental_update(balance, platforms, capacity, graph, index)
+        incremental_time += time.perf_counter() - start
+
+    # Сверка с полным пересчетом тех же данных
+    expected_platforms, expected_capacity = PlatformTable(), CapacityTable()
+    expected_capacity.load_values(capacity.to_values())
+    solver_cache.clear()
+    start = time.perf_counter()
+    full_update(balance, expected_platforms, expected_capacity, DependencyGraph())
+    full_time = time.perf_counter() - start
+
+    same = (expected_platforms.to_values() == platforms.to_values()
+            and expected_capacity.to_values() == capacity.to_values())
+    print(f"Строк баланса: {BALANCE_ROWS}, площадок: {PLATFORMS}, участков: {CAPACITY_ROWS}")
+    print(f"Полный пересчет:           {full_time * 1000:8.1f} мс")
+    print(f"Изменение одной ячейки:    {incremental_time / EDITS * 1000:8.2f} мс")
+    print(f"Совпадение с полным пересчетом: {'да' if same else 'НЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
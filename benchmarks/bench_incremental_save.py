@@ -0,0 +1,116 @@
+"""
+Сохранение большого проекта после изменения одной ячейки баланса:
+полная запись всех разделов и запись только измененных порций строк
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_incremental_save [строк баланса]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+from core.project_manager import ProjectManager
+from models.balance_record import BalanceTable
+from models.calculation_data import PlatformTable, CapacityTable, ConstructionTable
+from models.dependency_graph import DependencyGraph, BALANCE
+from models.project import Project
+
+BALANCE_ROWS = 200000
+CONSUMERS_PER_PLATFORM = 10
+CAPACITY_ROWS = 5000
+EDITS = 5
+
+
+class TableTab:
+    """Вкладка с таблицей данных (без Treeview)"""
+    def __init__(self, table):
+        self.table = table
+
+    def current_table(self):
+        return self.table.snapshot()
+
+    def is_up_to_date(self):
+        return True
+
+    def set_data(self, data):
+        self.table.load_values(data)
+
+
+class CalculationsTab:
+    def get_data(self):
+        return {"results": ""}
+
+
+def make_app(folder, rnd):
+    balance = BalanceTable()
+    platforms_count = BALANCE_ROWS // CONSUMERS_PER_PLATFORM
+    for index in range(BALANCE_ROWS):
+        balance.append(justification="Баланс", number_platform=str(rnd.randint(1, platforms_count)),
+                       number_phase=str(rnd.randint(1, 5)), name=f"Потребитель {index + 1}",
+                       q_day=rnd.uniform(1, 50), percent_q=100)
+    platforms, graph = PlatformTable(), DependencyGraph()
+    platforms.rebuild(balance, graph)
+    construction = ConstructionTable()
+    construction.rebuild(balance)
+    capacity = CapacityTable()
+    for index in range(CAPACITY_ROWS):
+        capacity.append(interval=f"A{index + 1}", platform=f"п.{rnd.randint(1, platforms_count)}",
+                        diametr=rnd.choice([300, 400, 500]), i_uklon=0.005)
+
+    main_window = types.SimpleNamespace(
+        calculations_tab=CalculationsTab(), balance_tab=TableTab(balance),
+        platforms_tab=TableTab(platforms), capacity_tab=TableTab(capacity),
+        construction_tab=TableTab(construction))
+    settings = types.SimpleNamespace(projects_folder=folder)
+    app = types.SimpleNamespace(main_window=main_window, settings_manager=settings)
+    app.graph = graph
+    return app
+
+
+def save(manager, file_path):
+    start = time.perf_counter()
+    manager.collect_ui_data()
+    manager.current_project.save(file_path)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    global BALANCE_ROWS
+    if len(sys.argv) > 1:
+        BALANCE_ROWS = int(sys.argv[1])
+    rnd = random.Random(1)
+    folder = tempfile.mkdtemp()
+    file_path = os.path.join(folder, "project.hydro")
+    app = make_app(folder, rnd)
+    tabs = app.main_window
+    manager = ProjectManager(app)
+
+    full_time = save(manager, file_path)
+
+    edit_time = 0.0
+    for _ in range(EDITS):
+        # Изменение одной ячейки и пересчет зависимых таблиц, как во вкладках
+        index = rnd.randrange(BALANCE_ROWS)
+        balance = tabs.balance_tab.table
+        balance.set(index, 'q_day', rnd.uniform(1, 50))
+        tabs.platforms_tab.table.move_rows(balance, app.graph, [index])
+        app.graph.mark_dirty((BALANCE, index))
+        tabs.platforms_tab.table.recompute_dirty(balance, app.graph)
+        tabs.construction_tab.table.rebuild(balance)
+        edit_time += save(manager, file_path)
+
+    loaded = Project.load(file_path)
+    same = all([list(row) for row in getattr(tabs, tab_name).table.to_rows()] == loaded.data[name]
+               for name, tab_name, empty in ProjectManager.SECTIONS[1:])
+    print(f"Строк баланса: {BALANCE_ROWS}, размер файла {os.path.getsize(file_path) / 1e6:.1f} МБ")
+    print(f"Первое сохранение (все порции):        {full_time:8.1f} мс")
+    print(f"Сохранение после изменения ячейки:     {edit_time / EDITS:8.1f} мс")
+    print(f"Совпадение с таблицами: {'да' if same else 'НЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
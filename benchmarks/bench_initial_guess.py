@@ -0,0 +1,89 @@
+"""
+Точность явного приближения h/d и ускорение решателя на таблице 10 000 строк
+
+1. Отчет о точности h_d_estimate относительно точного решения на сетке
+   каталожных диаметров, уклонов, материалов и долей расхода.
+2. Сравнение числа итераций и времени решателя с начальным приближением
+   из середины интервала и из h_d_estimate.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_initial_guess
+"""
+
+import random
+import time
+
+from functions import (DIAMETR, MATERIAL, HAS_NUMPY, full_flow, h_d_estimate,
+                       solve_filling, filling_speed_batch)
+
+SLOPES = [0.001, 0.002, 0.003, 0.005, 0.007, 0.01, 0.02, 0.05]
+Q_RATIOS = [0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5,
+            0.6, 0.7, 0.8, 0.9, 0.95, 1.0, 1.03, 1.05]  # Доля от Q полного сечения
+BANDS = [(0.0, 0.1), (0.1, 0.3), (0.3, 0.5), (0.5, 0.7), (0.7, 0.8), (0.8, 1.0)]
+ROWS = 10000
+
+
+def accuracy_report():
+    """Погрешность h_d_estimate по диапазонам наполнения"""
+    diameters = sorted({int(d) for values in DIAMETR.values() for d in values})
+    errors = {band: [] for band in BANDS}
+    for d in diameters:
+        for n in MATERIAL.values():
+            for i in SLOPES:
+                q_full = full_flow(d, i, n)
+                for ratio in Q_RATIOS:
+                    Q = q_full * ratio
+                    exact = solve_filling(Q, d, i, n)
+                    if not exact.converged:
+                        continue
+                    error = abs(h_d_estimate(Q, d, i, n) - exact.h_d)
+                    for band in BANDS:
+                        if band[0] <= exact.h_d < band[1]:
+                            errors[band].append(error)
+
+    print("Точность h_d_estimate относительно точного решения")
+    print(f"{'h/d':>10} | {'точек':>6} | {'сред. ошибка':>12} | {'макс. ошибка':>12}")
+    for (lo, hi), values in errors.items():
+        if values:
+            print(f"{f'{lo:.1f}..{hi:.1f}':>10} | {len(values):>6} | {sum(values) / len(values):>12.5f} | "
+                  f"{max(values):>12.5f}")
+
+
+def make_rows(count, seed=1):
+    """Таблица пропускной способности: каталожные диаметры, расходы до 0.9·Qполн"""
+    rnd = random.Random(seed)
+    diameters = sorted({int(d) for values in DIAMETR.values() for d in values})
+    rows = []
+    for _ in range(count):
+        d = rnd.choice(diameters)
+        i = rnd.choice(SLOPES)
+        n = rnd.choice(list(MATERIAL.values()))
+        rows.append((full_flow(d, i, n) * rnd.uniform(0.01, 0.9), d, i, n))
+    return rows
+
+
+def solver_benchmark():
+    """Итерации и время решателя для разных начальных приближений"""
+    rows = make_rows(ROWS)
+    print(f"\nТаблица из {ROWS} строк")
+    for label, h_d0 in [("середина интервала", 0.47), ("h_d_estimate", None)]:
+        start = time.perf_counter()
+        iterations = [solve_filling(*row, h_d0=h_d0).iterations for row in rows]
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<20}: {sum(iterations) / len(iterations):.2f} итераций (макс. {max(iterations)}), "
+              f"{elapsed * 1000:.0f} мс")
+
+    if HAS_NUMPY:
+        Q, d, i, n = (list(column) for column in zip(*rows))
+        start = time.perf_counter()
+        filling_speed_batch(Q, d, i, n)
+        print(f"  {'filling_speed_batch':<20}: {(time.perf_counter() - start) * 1000:.0f} мс")
+
+
+def main():
+    accuracy_report()
+    solver_benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Сохранность каждой правки большого проекта: запись правки в журнал
+(utils.edit_journal) и сохранение проекта после каждой правки
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_journal [строк баланса]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import benchmarks.bench_incremental_save as project_bench
+from core.project_manager import ProjectManager
+from utils.edit_journal import EditJournal, read_journal
+
+EDITS = 200
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    project_bench.BALANCE_ROWS = rows
+    rnd = random.Random(1)
+    folder = tempfile.mkdtemp()
+    app = project_bench.make_app(folder, rnd)
+    manager = ProjectManager(app)
+    file_path = os.path.join(folder, "project.hydro")
+    project_bench.save(manager, file_path)
+
+    balance = app.main_window.balance_tab.table
+    edits = [('set', rnd.randrange(rows), 'q_day', f"{rnd.uniform(1, 50):.2f}") for _ in range(EDITS)]
+
+    journal = EditJournal(file_path + ".journal", manager.current_project.metadata.modified_date)
+    start = time.perf_counter()
+    for edit in edits:
+        balance.set(*edit[1:])
+        journal.append([("balance", *edit)])
+    journal_time = (time.perf_counter() - start) / EDITS * 1000
+    journal.close()
+
+    start = time.perf_counter()
+    saved, recorded = read_journal(journal.file_path)
+    for section, op, index, name, value in recorded:
+        balance.set(index, name, value)
+    replay_time = (time.perf_counter() - start) * 1000
+
+    save_edits = edits[:10]
+    start = time.perf_counter()
+    for edit in save_edits:
+        balance.set(*edit[1:])
+        project_bench.save(manager, file_path)
+    save_time = (time.perf_counter() - start) / len(save_edits) * 1000
+
+    print(f"Строк баланса: {rows}, правок: {EDITS}")
+    print(f"Запись правки в журнал (с fsync):     {journal_time:8.2f} мс")
+    print(f"Сохранение проекта после правки:      {save_time:8.2f} мс")
+    print(f"Чтение и повтор {len(recorded)} правок журнала: {replay_time:8.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
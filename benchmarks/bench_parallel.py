@@ -0,0 +1,54 @@
+"""
+Масштабирование пакетного расчета наполнения и скорости по числу процессов
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_parallel [строк]
+"""
+
+import random
+import sys
+import time
+
+from functions import filling_speed_batch as solve_batch
+from utils import parallel
+from utils.capacity_index import capacity_index
+
+DEFAULT_ROWS = 200000
+DIAMETERS = [200, 250, 300, 400, 500, 600]
+SLOPES = [0.003, 0.005, 0.007]
+N = 0.014
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    rnd = random.Random(1)
+    d = [rnd.choice(DIAMETERS) for _ in range(rows)]
+    i = [rnd.choice(SLOPES) for _ in range(rows)]
+    entries = [capacity_index.lookup(d_row, i_row, N) for d_row, i_row in zip(d, i)]
+    Q = [entry.q_max * rnd.uniform(0.05, 0.95) for entry in entries]
+    q_max = [entry.q_max for entry in entries]
+    h_d_max = [entry.h_d_max for entry in entries]
+
+    start = time.perf_counter()
+    expected, _, _ = solve_batch(Q, d, i, N, q_max=q_max, h_d_max=h_d_max)
+    single = time.perf_counter() - start
+    print(f"Строк: {rows}, ядер: {parallel.worker_count()}, порция: {parallel.CHUNK_ROWS}")
+    print(f"Текущий процесс:  {single * 1000:8.0f} мс")
+
+    for workers in range(1, parallel.worker_count() + 1):
+        if workers > 1:
+            start = time.perf_counter()
+            parallel.start_pool(workers).result()
+            print(f"Запуск пула:      {(time.perf_counter() - start) * 1000:8.0f} мс")
+        start = time.perf_counter()
+        h_d, _, _ = parallel.filling_speed_batch(Q, d, i, N, q_max=q_max, h_d_max=h_d_max,
+                                                 workers=workers)
+        elapsed = time.perf_counter() - start
+        same = all(a == b or a != a and b != b for a, b in zip(h_d, expected))
+        print(f"Процессов {workers:2}:     {elapsed * 1000:8.0f} мс, ускорение {single / elapsed:4.1f}, "
+              f"совпадение {'да' if same else 'НЕТ'}")
+    parallel.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Скорость подбора труб для всей таблицы и сверка с полным перебором
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_pipe_sizing
+"""
+
+import random
+import time
+
+from functions import solve_filling
+from utils.pipe_sizing import PipeSizer, filling_limit, min_velocity
+
+ROWS = 10000
+CHECK_ROWS = 300
+
+
+def brute_force(sizer, Q):
+    """Перебор вариантов с расчетом наполнения для каждого"""
+    for d, i in sizer.candidates:
+        result = solve_filling(Q, d, i, sizer.n)
+        if (result.converged and result.h_d <= filling_limit(d) + 1e-9
+                and min_velocity(d) <= result.velocity <= sizer.max_velocity):
+            return d, i
+    return None
+
+
+def main():
+    rnd = random.Random(1)
+    flows = [rnd.uniform(0.5, 80) for _ in range(ROWS)]
+
+    start = time.perf_counter()
+    sizer = PipeSizer()
+    prepared = time.perf_counter() - start
+
+    start = time.perf_counter()
+    options = sizer.best(flows)
+    sized = time.perf_counter() - start
+
+    mismatches = 0
+    for Q, option in zip(flows[:CHECK_ROWS], options):
+        expected = brute_force(sizer, Q)
+        found = None if option is None else (option.diameter, option.slope)
+        mismatches += expected != found
+
+    print(f"Строк: {ROWS}, вариантов в каталоге: {len(sizer.candidates)}")
+    print(f"Подготовка диапазонов: {prepared * 1000:8.1f} мс")
+    print(f"Подбор для таблицы:    {sized * 1000:8.1f} мс")
+    print(f"Без подходящей трубы:  {sum(option is None for option in options)}")
+    print(f"Расхождений с полным перебором ({CHECK_ROWS} строк): {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Сохранение проекта строками в отображаемом виде (to_values) и числами
+полной точности (to_rows): время сохранения/загрузки и накопление
+ошибки округления
+
+Каждый цикл - сохранение и загрузка проекта, изменение нескольких
+участков и пересчет только зависящих от них строк. Загруженные расходы
+площадок и интервалов участвуют в пересчете, поэтому при сохранении
+строками округление до сотых накапливается по цепочкам интервалов.
+Результат сравнивается с расчетом без сохранения.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_precision
+"""
+
+import json
+import random
+import time
+
+from models.balance_record import BalanceTable
+from models.calculation_data import ColumnarTable, PlatformTable, CapacityTable
+from models.dependency_graph import DependencyGraph, CAPACITY
+
+BALANCE_ROWS = 20000
+PLATFORMS = 40
+CAPACITY_ROWS = 300
+CHAIN = 10      # Длина цепочек интервалов
+CYCLES = 20
+EDITED_ROWS = 5
+COMPARED = ('q_day', 'q_k_sec', 'filling', 'speed')
+
+
+def make_balance(rnd):
+    balance = BalanceTable()
+    for index in range(BALANCE_ROWS):
+        balance.append(number_platform=str(rnd.randint(1, PLATFORMS)), number_phase="1",
+                       name=f"Потребитель {index + 1}", q_day=round(rnd.uniform(1, 50), 3))
+    return balance
+
+
+def make_capacity(rnd):
+    capacity = CapacityTable()
+    for index in range(CAPACITY_ROWS):
+        platform = f"п.{rnd.randint(1, PLATFORMS)}"
+        if index % CHAIN:
+            platform += f" + A{index}"  # Интервал предыдущей строки
+        capacity.append(interval=f"A{index + 1}", platform=platform,
+                        diametr=rnd.choice([300, 400, 500, 600]), i_uklon=0.005)
+    return capacity
+
+
+def save_and_load(tables, serialize):
+    """Сохранение таблиц в JSON и загрузка в новые таблицы; (таблицы, время)"""
+    start = time.perf_counter()
+    texts = [json.dumps(serialize(table), ensure_ascii=False) for table in tables]
+    saved = time.perf_counter()
+    loaded = []
+    for table, text in zip(tables, texts):
+        loaded.append(type(table)())
+        loaded[-1].load_values(json.loads(text))
+    return loaded, saved - start, time.perf_counter() - saved
+
+
+def edit(capacity, platforms, graph, rows, diameters):
+    """Замена диаметров и пересчет строк rows и зависящих от них участков"""
+    capacity.link(graph, list(range(len(platforms))))
+    for index, diameter in zip(rows, diameters):
+        capacity.set(index, 'diametr', diameter)
+    graph.mark_dirty(*((CAPACITY, index) for index in rows))
+    capacity.recalculate(graph.take_dirty(CAPACITY), platforms.column('q_day'))
+
+
+def run(balance, edits, serialize=None):
+    """Циклы изменений; serialize - способ сохранения проекта (None - без сохранения)"""
+    platforms, graph = PlatformTable(), DependencyGraph()
+    platforms.rebuild(balance, graph)
+    capacity = make_capacity(random.Random(2))
+    capacity.recalculate(range(len(capacity)), platforms.column('q_day'))
+
+    save_time = load_time = 0.0
+    for rows, diameters in edits:
+        if serialize is not None:
+            (balance, platforms, capacity), save, load = save_and_load(
+                (balance, platforms, capacity), serialize)
+            save_time += save
+            load_time += load
+        edit(capacity, platforms, DependencyGraph(), rows, diameters)
+    return capacity, save_time, load_time
+
+
+def drift(capacity, expected, name):
+    """Наибольшее абсолютное отклонение столбца от расчета без сохранения"""
+    errors = [abs(value - reference) for value, reference
+              in zip(capacity.column(name), expected.column(name))
+              if value == value and reference == reference]
+    return max(errors, default=0.0)
+
+
+def main():
+    rnd = random.Random(1)
+    balance = make_balance(rnd)
+    edits = [(rnd.sample(range(CAPACITY_ROWS), EDITED_ROWS),
+              [rnd.choice([300, 400, 500, 600]) for _ in range(EDITED_ROWS)])
+             for _ in range(CYCLES)]
+
+    expected, _, _ = run(balance, edits)
+    print(f"Строк баланса: {BALANCE_ROWS}, участков: {CAPACITY_ROWS}, "
+          f"циклов сохранения и загрузки: {CYCLES}")
+    for title, serialize in (("Строки (to_values)", ColumnarTable.to_values),
+                             ("Полная точность (to_rows)", ColumnarTable.to_rows)):
+        capacity, save_time, load_time = run(balance, edits, serialize)
+        errors = ", ".join(f"{name} {drift(capacity, expected, name):.2e}" for name in COMPARED)
+        print(f"{title}:")
+        print(f"    сохранение {save_time / CYCLES * 1000:7.1f} мс, "
+              f"загрузка {load_time / CYCLES * 1000:7.1f} мс на цикл")
+        print(f"    отклонение: {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Открытие большого проекта: прежний формат (JSON целиком, indent=4) и
+контейнер .hydro с отдельно сжатыми разделами
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_project_file [строк баланса]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from models.balance_record import BalanceTable
+from models.calculation_data import PlatformTable, CapacityTable, ConstructionTable
+from models.dependency_graph import DependencyGraph
+from models.project import Project
+from utils.project_file import read_metadata
+
+BALANCE_ROWS = 200000
+PLATFORMS = 200
+CAPACITY_ROWS = 5000
+
+
+def make_project(rows, rnd):
+    balance = BalanceTable()
+    for index in range(rows):
+        balance.append(justification="Баланс", number_platform=str(rnd.randint(1, PLATFORMS)),
+                       number_phase=str(rnd.randint(1, 5)), name=f"Потребитель {index + 1}",
+                       q_day=rnd.uniform(1, 50), percent_q=100)
+        balance.recalculate(index)
+    platforms = PlatformTable()
+    platforms.rebuild(balance, DependencyGraph())
+    construction = ConstructionTable()
+    construction.rebuild(balance)
+    capacity = CapacityTable()
+    for index in range(CAPACITY_ROWS):
+        capacity.append(interval=f"A{index + 1}", platform=f"п.{rnd.randint(1, PLATFORMS)}",
+                        diametr=rnd.choice([300, 400, 500]), i_uklon=0.005)
+
+    project = Project()
+    project.data = {
+        "calculations": {"results": "Результаты расчета появятся здесь..."},
+        "construction_stages": construction.to_rows(),
+        "platforms": platforms.to_rows(),
+        "capacity_check": capacity.to_rows(),
+        "balance": balance.to_rows(),
+    }
+    return project
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else BALANCE_ROWS
+    project = make_project(rows, random.Random(1))
+    folder = tempfile.mkdtemp()
+    json_path = os.path.join(folder, "project.json")
+    hydro_path = os.path.join(folder, "project.hydro")
+
+    _, json_save = timed(lambda: project.save(json_path))
+    _, hydro_save = timed(lambda: project.save(hydro_path))
+
+    _, json_open = timed(lambda: Project.load(json_path))
+    _, metadata_time = timed(lambda: read_metadata(hydro_path))
+    loaded, hydro_open = timed(lambda: Project.load(hydro_path))
+    _, first_section = timed(lambda: loaded.data["capacity_check"])
+    _, all_sections = timed(lambda: [loaded.data[name] for name in loaded.data])
+
+    same = all(json.loads(json.dumps(project.data[name])) == loaded.data[name]
+               for name in project.data)
+    print(f"Строк баланса: {rows}")
+    print(f"JSON:    {os.path.getsize(json_path) / 1e6:7.1f} МБ, сохранение {json_save:8.1f} мс, "
+          f"открытие {json_open:8.1f} мс")
+    print(f".hydro:  {os.path.getsize(hydro_path) / 1e6:7.1f} МБ, сохранение {hydro_save:8.1f} мс, "
+          f"открытие {hydro_open:8.1f} мс")
+    print(f"    метаданные {metadata_time:.2f} мс, первая вкладка (участки) {first_section:.1f} мс, "
+          f"остальные разделы {all_sections:.1f} мс")
+    print(f"Совпадение данных: {'да' if same else 'НЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Холодный и теплый запуск с постоянным кэшем результатов
+
+Имитирует два сеанса работы: первый заполняет базу, второй открывает
+ее заново с пустым кэшем в памяти. Запись в базу идет в потоке
+хранилища и в замер не входит (ее окончания ждет detach_store).
+Пакетный расчет (solve_batch) кэш не использует и приводится для
+сравнения с filling_speed_batch без отсева перегруженных труб.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_result_store
+"""
+
+import os
+import tempfile
+import time
+
+from functions import filling_speed, filling_speed_batch
+from utils.capacity_index import capacity_index
+from utils.result_store import ResultStore
+from utils.solver_cache import SolverCache
+from benchmarks.bench_filling_speed import make_rows
+
+ROWS = 10000
+
+
+def run_session(folder, rows):
+    """Расчет таблицы по строкам и пакетом в новом сеансе, мкс/строка"""
+    times = []
+    for batch in (False, True):
+        path = os.path.join(folder, f"result_cache_{int(batch)}.sqlite")
+        cache = SolverCache()
+        cache.attach_store(ResultStore(path))
+        start = time.perf_counter()
+        if batch:
+            cache.filling_speed_batch(*(list(column) for column in zip(*rows)))
+        else:
+            for row in rows:
+                cache.filling_speed(*row)
+        times.append((time.perf_counter() - start) / len(rows) * 1e6)
+        cache.detach_store()
+    return times
+
+
+def main():
+    rows = make_rows(ROWS)
+    len(capacity_index)  # Индекс загружается при запуске приложения, а не в расчете
+
+    start = time.perf_counter()
+    for row in rows:
+        filling_speed(*row)
+    plain = (time.perf_counter() - start) / ROWS * 1e6
+    start = time.perf_counter()
+    filling_speed_batch(*(list(column) for column in zip(*rows)))
+    plain_batch = (time.perf_counter() - start) / ROWS * 1e6
+
+    with tempfile.TemporaryDirectory() as folder:
+        cold_scalar, cold_batch = run_session(folder, rows)
+        warm_scalar, warm_batch = run_session(folder, rows)
+
+    print(f"Строк: {ROWS}")
+    print(f"filling_speed без кэша:     {plain:8.2f} мкс/строка")
+    print(f"По строкам, холодный кэш:   {cold_scalar:8.2f} мкс/строка")
+    print(f"По строкам, теплый кэш:     {warm_scalar:8.2f} мкс/строка")
+    print(f"filling_speed_batch без кэша: {plain_batch:6.2f} мкс/строка")
+    print(f"Пакетом, первый сеанс:      {cold_batch:8.2f} мкс/строка")
+    print(f"Пакетом, второй сеанс:      {warm_batch:8.2f} мкс/строка")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Группировка баланса по площадкам и этапам: словарь на каждую строку
+(как в прежних вкладках) и models.rollup
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_rollup
+"""
+
+import random
+import time
+
+from models import rollup as rollup_module
+from models.balance_record import BalanceTable
+from models.rollup import rollup
+
+ROWS = 100000
+REPEAT = 5
+
+
+def legacy_platform_totals(balance):
+    """Группировка словарями, как в прежнем PlatformsTab.update_data"""
+    platforms = {}
+    for platform, name, q_day in zip(balance.column('number_platform'), balance.column('name'),
+                                     balance.column('q_day')):
+        if platform not in platforms:
+            platforms[platform] = {"names": [], "total_q_day": 0.0}
+        platforms[platform]["names"].append(name)
+        platforms[platform]["total_q_day"] += 0.0 if q_day != q_day else q_day
+    return dict(sorted(platforms.items()))
+
+
+def best_time(function):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    rnd = random.Random(1)
+    balance = BalanceTable()
+    for index in range(ROWS):
+        balance.append(number_platform=str(rnd.randint(1, 40)), number_phase=str(rnd.randint(1, 5)),
+                       name=f"Потребитель {index + 1}",
+                       q_day=rnd.uniform(1, 50) if index % 10 else None)
+
+    expected = legacy_platform_totals(balance)
+    found = {group.key[0]: group.total for group in rollup(balance, 'number_platform')}
+    mismatches = sum(abs(found[key] - data["total_q_day"]) > 1e-6 for key, data in expected.items())
+
+    print(f"Строк баланса: {ROWS}, numpy: {'да' if rollup_module.HAS_NUMPY else 'нет'}")
+    print(f"Словарь на строку, по площадкам: {best_time(lambda: legacy_platform_totals(balance)):8.1f} мс")
+    cases = [
+        ("по площадкам", lambda: rollup(balance, 'number_platform')),
+        ("по этапам", lambda: rollup(balance, 'number_phase', skip_empty=True)),
+        ("по этапам и площадкам", lambda: rollup(balance, ('number_phase', 'number_platform'))),
+    ]
+    for label, function in cases:
+        print(f"rollup {label + ':':24} {best_time(function):8.1f} мс")
+    print(f"Расхождений с группировкой словарями: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
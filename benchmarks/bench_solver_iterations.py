@@ -0,0 +1,62 @@
+"""
+Количество итераций решателя по каталогу диаметров и диапазону уклонов
+
+Сравнивается исходная бисекция (абсолютный допуск 0.0001 м³/с)
+и solve_filling (метод Ньютона, относительный допуск).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_solver_iterations
+"""
+
+import math
+
+from functions import DIAMETR, solve_filling
+from benchmarks.legacy_solver import legacy_filling_speed
+
+SLOPES = [0.001, 0.002, 0.003, 0.005, 0.007, 0.01, 0.02]
+FILL_RATIOS = [0.02, 0.05, 0.1, 0.2, 0.35, 0.5, 0.7, 0.85, 0.95, 1.0]  # Доля от Q полного сечения
+N = 0.014
+
+
+def full_flow(d, i, n):
+    """Расход при полном заполнении (л/с), d в мм"""
+    d = d / 1000
+    R = d / 4
+    sqrt_n = math.sqrt(n)
+    y = 2.5 * sqrt_n - 0.13 - 0.75 * math.sqrt(R) * (sqrt_n - 0.10)
+    return math.pi * d**2 / 4 * (1 / n) * R**y * math.sqrt(R * i) * 1000
+
+
+def main():
+    diameters = sorted({int(d) for values in DIAMETR.values() for d in values})
+
+    print(f"{'D, мм':>6} | {'бисекция: сред/макс':>20} | {'ошибка V':>11} | "
+          f"{'Ньютон: сред/макс':>18} | {'отн. невязка':>12}")
+    total_legacy, total_new, count = 0, 0, 0
+    for d in diameters:
+        legacy_iters, new_iters = [], []
+        legacy_error, new_error = 0.0, 0.0
+        for i in SLOPES:
+            q_full = full_flow(d, i, N)
+            for ratio in FILL_RATIOS:
+                Q = q_full * ratio
+                result = solve_filling(Q, d, i, N)
+                h_d, v, iterations = legacy_filling_speed(Q, d, i, N)
+                legacy_iters.append(iterations)
+                new_iters.append(result.iterations)
+                new_error = max(new_error, abs(result.residual))
+                # Ошибка скорости у бисекции относительно точного решения
+                legacy_error = max(legacy_error, abs(v - result.velocity) / result.velocity)
+
+        total_legacy += sum(legacy_iters)
+        total_new += sum(new_iters)
+        count += len(new_iters)
+        print(f"{d:>6} | {sum(legacy_iters) / len(legacy_iters):>12.1f} / {max(legacy_iters):<5} | "
+              f"{legacy_error:>11.2e} | {sum(new_iters) / len(new_iters):>10.1f} / {max(new_iters):<5} | "
+              f"{new_error:>12.2e}")
+
+    print(f"Среднее по каталогу: бисекция {total_legacy / count:.1f}, Ньютон {total_new / count:.1f} итераций")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Сеть с перегруженными участками: исходная бисекция и решатель с индексом
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_surcharged
+"""
+
+import random
+import time
+
+from functions import filling_speed_batch
+from utils.capacity_index import capacity_index
+from benchmarks.legacy_solver import legacy_filling_speed
+
+ROWS = 10000
+DIAMETERS = [200, 250, 300, 400]
+SLOPES = [0.003, 0.005, 0.007]
+N = 0.014
+
+
+def main():
+    rnd = random.Random(1)
+    rows = []
+    for _ in range(ROWS):
+        d, i = rnd.choice(DIAMETERS), rnd.choice(SLOPES)
+        # Около трети строк - расход выше максимального
+        rows.append((capacity_index.lookup(d, i, N).q_max * rnd.uniform(0.2, 1.5), d, i, N))
+
+    start = time.perf_counter()
+    legacy_iterations = sum(legacy_filling_speed(*row)[2] for row in rows)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [capacity_index.solve(*row) for row in rows]
+    scalar = time.perf_counter() - start
+
+    Q, d, i, n = (list(column) for column in zip(*rows))
+    entries = [capacity_index.lookup(*row[1:]) for row in rows]
+    start = time.perf_counter()
+    filling_speed_batch(Q, d, i, n, q_max=[e.q_max for e in entries],
+                        h_d_max=[e.h_d_max for e in entries])
+    batch = time.perf_counter() - start
+
+    surcharged = sum(result.surcharged for result in results)
+    print(f"Строк: {ROWS}, перегруженных: {surcharged}")
+    print(f"Исходная бисекция:          {legacy * 1000:8.1f} мс, "
+          f"{legacy_iterations / ROWS:.1f} итераций на строку")
+    print(f"capacity_index.solve:       {scalar * 1000:8.1f} мс, "
+          f"{sum(r.iterations for r in results) / ROWS:.1f} итераций на строку")
+    print(f"filling_speed_batch:        {batch * 1000:8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
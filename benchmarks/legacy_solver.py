@@ -0,0 +1,42 @@
+"""
+Исходный алгоритм расчета наполнения (для сравнения в бенчмарках)
+"""
+
+import math
+
+
+def legacy_filling_speed(Q, d, i, n, tolerance=0.0001, max_iter=100):
+    """
+    Бисекция по h на [0.001d, 0.99d] с абсолютным допуском по расходу.
+
+    Возвращает h/d, скорость и количество итераций.
+    """
+    d = d/1000
+    Q = Q/1000
+    iter_count = 0
+
+    h_min = 0.001 * d
+    h_max = 0.99 * d
+    h = (h_min + h_max) / 2
+    error = float('inf')
+
+    while error > tolerance and iter_count < max_iter:
+        iter_count += 1
+        theta = 2 * math.acos(1 - (2 * h / d))
+        omega = (d**2 / 8) * (theta - math.sin(theta))
+        R = omega / ((d / 2) * theta)
+        sqrt_n = math.sqrt(n)
+        y = 2.5 * sqrt_n - 0.13 - 0.75 * math.sqrt(R) * (sqrt_n - 0.10)
+        Q_theor = omega * (1 / n) * (R ** y) * math.sqrt(R * i)
+        error = abs(Q_theor - Q)
+        if error <= tolerance:
+            break
+        if Q_theor < Q:
+            h_min = h
+        else:
+            h_max = h
+        h = (h_min + h_max) / 2
+
+    theta_final = 2 * math.acos(1 - (2 * h / d))
+    omega_final = (d**2 / 8) * (theta_final - math.sin(theta_final))
+    return h / d, Q / omega_final, iter_count
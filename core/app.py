@@ -7,7 +7,11 @@ from tkinter import ttk
 import os
 from .project_manager import ProjectManager
 from .settings_manager import SettingsManager
+from .autosave import Autosave
 from ui.main_window import MainWindow
+from utils.solver_cache import solver_cache
+from utils.result_store import ResultStore, FILE_NAME as RESULT_CACHE_FILE
+from utils import parallel
 
 class HydraulicCalculatorApp:
     def __init__(self, root):
@@ -15,11 +19,12 @@ class HydraulicCalculatorApp:
         self.setup_app()
         
         # Инициализация менеджеров
-        self.settings_manager = SettingsManager()
+        self.settings_manager = SettingsManager(root)
         self.project_manager = ProjectManager(self)
         
         # Загружаем настройки ДО создания UI
         self.load_settings()
+        self.setup_result_cache()
         
         # Инициализация UI
         self.main_window = MainWindow(self)
@@ -27,6 +32,14 @@ class HydraulicCalculatorApp:
         # Применяем настройки к UI
         self.apply_settings()
         
+        # Автосохранение в резервные копии
+        self.autosave = Autosave(self)
+        self.autosave.mark_saved()
+        self.autosave.start()
+        
+        # Закрытие окна - тот же выход, что и из меню
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_app)
+        
     def setup_app(self):
         """Базовая настройка приложения"""
         self.root.title("Гидравлический калькулятор")
@@ -40,6 +53,16 @@ class HydraulicCalculatorApp:
         """Сохранение настроек приложения"""
         return self.settings_manager.save_settings()
         
+    def setup_result_cache(self):
+        """Подключение постоянного кэша результатов расчета"""
+        if not self.settings_manager.get_setting('result_cache', True):
+            return
+        store = ResultStore(
+            os.path.join(self.settings_manager.projects_folder, RESULT_CACHE_FILE),
+            max_rows=self.settings_manager.get_setting('result_cache_size', 200000)
+        )
+        solver_cache.attach_store(store)
+        
     def apply_settings(self):
         """Применение настроек к UI"""
         # Применяем геометрию окна
@@ -52,11 +75,24 @@ class HydraulicCalculatorApp:
         
     def exit_app(self):
         """Корректный выход из приложения"""
+        if self.project_manager.has_unsaved_changes():
+            if not self.project_manager.ask_save_changes():
+                return
+                
         # Сохраняем геометрию окна перед выходом
         self.settings_manager.update_window_geometry(self.root.geometry())
         
-        # Сохраняем настройки
-        self.save_settings()
+        # Записываем накопленные изменения настроек
+        self.settings_manager.flush()
+        
+        self.autosave.stop()
+        # Штатный выход: несохраненные правки не восстанавливаются
+        self.project_manager.close_journal()
+        
+        # Останавливаем расчет в рабочем потоке и закрываем постоянный кэш результатов
+        self.main_window.capacity_tab.cancel_calculations()
+        solver_cache.detach_store()
+        parallel.shutdown()
         
         # Закрываем приложение
         self.root.quit()
\ No newline at end of file
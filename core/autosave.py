@@ -0,0 +1,149 @@
+"""
+Автосохранение проекта в резервные копии
+
+Если включена настройка auto_save, каждые backup_interval минут проект
+записывается в резервную копию "<проект>_<дата>_<время>.hydro" в папке
+BACKUP_FOLDER внутри папки проектов. В потоке Tk берутся только снимки
+таблиц вкладок (ProjectManager.snapshot_sections), кодирование и запись
+файла выполняются в рабочем потоке (BackgroundJob), поэтому сохранение
+не прерывает ввод. Вкладки для копии не пересчитываются: таблица с
+необработанными изменениями или идущим расчетом записывается в виде
+последнего сохранения, а после пересчета попадает в следующую копию.
+Копия не связана с файлом проекта (file_path пуст), поэтому сохранение
+открытой копии не перезаписывает проект. Цикл пропускается, если
+данные не изменились с прошлого сохранения. Если предыдущая запись еще
+идет, новая не начинается: после ее окончания выполняется одна запись
+со всеми накопленными изменениями. Для каждого проекта хранятся последние
+backup_count копий, более старые удаляются.
+"""
+
+import os
+import re
+from dataclasses import asdict
+from datetime import datetime
+
+from utils.background import BackgroundJob
+from utils.file_operations import atomic_write, ensure_directory_exists
+from utils.project_file import ProjectSections, write_project_file
+
+BACKUP_FOLDER = "Резервные копии"
+BACKUP_EXTENSION = ".hydro"
+
+
+def backup_prefix(project_name):
+    """Начало имени резервных копий проекта (недопустимые в имени файла символы заменяются)"""
+    return re.sub(r'[<>:"/\\|?*\s]+', '_', project_name).strip('_.') or "Проект"
+
+
+class Autosave:
+    def __init__(self, app):
+        self.app = app
+        self.root = app.root
+        self.folder = os.path.join(app.settings_manager.projects_folder, BACKUP_FOLDER)
+        self.job = None
+        self.saved_state = None  # Состояние данных при последнем сохранении
+        self.last_backup = None
+        self._timer = None
+        self._again = False      # Запрошено сохранение во время записи
+
+    def start(self):
+        """Запуск таймера по настройкам auto_save и backup_interval"""
+        self.stop()
+        settings = self.app.settings_manager
+        if settings.get_setting('auto_save', False):
+            minutes = max(1, settings.get_setting('backup_interval', 10))
+            self._timer = self.root.after(int(minutes * 60000), self._tick)
+
+    def stop(self):
+        """Остановка таймера (начатая запись завершается в рабочем потоке)"""
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+
+    def mark_saved(self):
+        """Текущие данные сохранены (проект сохранен или открыт)"""
+        self.saved_state = self.app.project_manager.content_state()
+
+    def _tick(self):
+        self._timer = None
+        self.save()
+        self.start()
+
+    def save(self):
+        """
+        Запись резервной копии, если данные изменились.
+
+        Возвращает True, если запись начата или отложена до окончания
+        текущей.
+        """
+        if self.job is not None and self.job.running:
+            self._again = True
+            return True
+        project_manager = self.app.project_manager
+        state = project_manager.content_state()
+        if state == self.saved_state:
+            return False
+
+        project = project_manager.current_project
+        snapshots = project_manager.snapshot_sections(update=False)
+        # Разделы еще не заполненных и не пересчитанных вкладок - как были записаны
+        data = ProjectSections()
+        for name, tab_name, empty in project_manager.SECTIONS:
+            if name in snapshots:
+                continue
+            chunks = project_manager.saved_chunks(name)
+            if chunks is not None:
+                data.set_chunks(name, *chunks)
+            else:
+                snapshots[name] = getattr(self.app.main_window, tab_name).table.snapshot()
+        metadata = asdict(project.metadata)
+        metadata['file_path'] = None
+        file_path = os.path.join(self.folder, f"{backup_prefix(project.name)}_"
+                                              f"{datetime.now():%Y%m%d_%H%M%S}{BACKUP_EXTENSION}")
+
+        def work(job):
+            project_manager.store_sections(data, snapshots)
+            ensure_directory_exists(self.folder)
+            with atomic_write(file_path, 'wb') as f:
+                write_project_file(f, metadata, data)
+            self.remove_old_backups(project.name)
+            job.post(file_path)
+
+        self.job = BackgroundJob(self.root, work, on_result=self._saved,
+                                 on_done=lambda job: self._done(job, state))
+        self.job.start()
+        return True
+
+    def _saved(self, file_path):
+        self.last_backup = file_path
+        print(f"Резервная копия сохранена: {file_path}")
+
+    def _done(self, job, state):
+        if job.error is None:
+            self.saved_state = state
+        else:
+            print(f"Ошибка автосохранения: {job.error}")
+        if self._again:
+            self._again = False
+            self.save()
+
+    def backups(self, project_name):
+        """Резервные копии проекта, от старых к новым"""
+        prefix = backup_prefix(project_name) + "_"
+        try:
+            names = os.listdir(self.folder)
+        except OSError:
+            return []
+        # Дата и время в имени имеют постоянную длину, поэтому сортировка по имени - по времени
+        return [os.path.join(self.folder, name) for name in sorted(names)
+                if name.startswith(prefix) and name.endswith(BACKUP_EXTENSION)
+                and re.fullmatch(r"\d{8}_\d{6}", name[len(prefix):-len(BACKUP_EXTENSION)])]
+
+    def remove_old_backups(self, project_name):
+        """Удаление копий сверх backup_count"""
+        count = max(1, self.app.settings_manager.get_setting('backup_count', 10))
+        for file_path in self.backups(project_name)[:-count]:
+            try:
+                os.remove(file_path)
+            except OSError as e:
+                print(f"Не удалось удалить резервную копию {file_path}: {e}")
@@ -2,17 +2,33 @@
 Менеджер проектов
 """
 
-import json
 import os
 from datetime import datetime
 from tkinter import messagebox, filedialog
 from models.project import Project
-from utils.file_operations import save_json, load_json, ensure_directory_exists
+from models.calculation_data import ColumnarTable, CHUNK_ROWS
+from utils.file_operations import ensure_directory_exists
+from utils.project_file import encode_section
+from utils.edit_journal import EditJournal, journal_path, read_journal
+from .autosave import BACKUP_FOLDER
 
 class ProjectManager:
+    # Разделы данных проекта: (раздел, вкладка главного окна, пустое значение)
+    SECTIONS = (
+        ("calculations", "calculations_tab", dict),
+        ("balance", "balance_tab", list),
+        ("platforms", "platforms_tab", list),
+        ("capacity_check", "capacity_tab", list),
+        ("construction_stages", "construction_tab", list),
+    )
+    
     def __init__(self, app):
         self.app = app
         self.current_project = Project()
+        self.pending_sections = []  # Разделы, еще не примененные к вкладкам
+        # Сжатые порции таблиц вкладок: раздел -> (версия таблицы, порции)
+        self.encoded_sections = {}
+        self.journal = None  # Журнал правок открытого проекта (EditJournal)
         self.projects_folder = self.app.settings_manager.projects_folder
         self.ensure_projects_folder()
         
@@ -26,8 +42,11 @@ class ProjectManager:
             if not self.ask_save_changes():
                 return False
                 
+        self.close_journal()
         self.current_project = Project()
+        self.reset_sections()
         self.app.main_window.update_project_info()
+        self.mark_saved()
         print("Создан новый проект")
         return True
         
@@ -46,7 +65,10 @@ class ProjectManager:
             # Сохраняем проект
             success = self.current_project.save(file_path)
             if success:
+                # Правки журнала вошли в файл проекта
+                self.close_journal()
                 self.app.main_window.update_project_info()
+                self.mark_saved()
                 
                 # Добавляем в недавние проекты
                 self.app.settings_manager.add_recent_project(file_path)
@@ -103,9 +125,16 @@ class ProjectManager:
                 folder = os.path.dirname(file_path)
                 self.app.settings_manager.set_setting('last_project_folder', folder)
                 
+                self.close_journal()
                 self.current_project = Project.load(file_path)
+                self.reset_sections()
+                # Путь из метаданных указывает на исходный файл, если проект скопирован или перемещен.
+                # Резервная копия с файлом не связывается: сохранение - "Сохранить как"
+                self.current_project.metadata.file_path = None if self.is_backup(file_path) else file_path
                 self.apply_ui_data()
                 self.app.main_window.update_project_info()
+                self.mark_saved()
+                self.recover_edits()
                 
                 # Добавляем в недавние проекты
                 self.app.settings_manager.add_recent_project(file_path)
@@ -120,10 +149,89 @@ class ProjectManager:
             print(f"Ошибка загрузки проекта: {e}")
             return False
         
+    def is_backup(self, file_path):
+        """Файл из папки резервных копий автосохранения"""
+        folder = os.path.dirname(os.path.abspath(file_path))
+        backups = os.path.abspath(os.path.join(self.projects_folder, BACKUP_FOLDER))
+        return os.path.normcase(folder) == os.path.normcase(backups)
+        
+    def reset_sections(self):
+        """Сброс отложенных разделов и сжатых порций предыдущего проекта"""
+        self.pending_sections = []
+        self.encoded_sections = {}
+        
     def has_unsaved_changes(self):
         """Проверяет есть ли несохраненные изменения"""
         return self.current_project.is_modified
         
+    def mark_saved(self):
+        """Данные вкладок совпадают с файлом: автосохранению нечего записывать"""
+        if hasattr(self.app, 'autosave'):
+            self.app.autosave.mark_saved()
+            
+    def record_edits(self, tab, edits):
+        """
+        Запись правок вкладки tab в журнал проекта.
+
+        Журнал ведется для проектов, сохраненных в файл; первая правка
+        после сохранения отмечает проект измененным.
+        """
+        project = self.current_project
+        if not edits or not project.file_path:
+            return
+        name = next(name for name, tab_name, empty in self.SECTIONS
+                    if getattr(self.app.main_window, tab_name) is tab)
+        try:
+            if self.journal is None:
+                self.journal = EditJournal(journal_path(project.file_path),
+                                           project.metadata.modified_date)
+            self.journal.append([name, *edit] for edit in edits)
+        except OSError as e:
+            print(f"Ошибка записи журнала правок: {e}")
+        if not project.is_modified:
+            project.is_modified = True
+            self.app.main_window.update_project_info()
+            
+    def close_journal(self):
+        """Удаление журнала правок: правки сохранены в проекте или отклонены"""
+        if self.journal is not None:
+            self.journal.discard()
+            self.journal = None
+            
+    def recover_edits(self):
+        """
+        Повтор правок из журнала, оставшегося после аварийного завершения.
+
+        Журнал от другой версии файла проекта не применяется и удаляется.
+        """
+        project = self.current_project
+        if not project.file_path:
+            return False
+        file_path = journal_path(project.file_path)
+        saved, edits = read_journal(file_path)
+        if saved is None:
+            return False
+        if saved != project.metadata.modified_date:
+            print(f"Журнал правок {file_path} относится к другой версии проекта и не применен")
+            os.remove(file_path)
+            return False
+        
+        if edits:
+            self.apply_pending_sections(all_sections=True)
+            for name, tab_name, empty in self.SECTIONS:
+                tab_edits = [edit[1:] for edit in edits if edit[0] == name]
+                if tab_edits:
+                    getattr(self.app.main_window, tab_name).apply_edits(tab_edits)
+            project.is_modified = True
+            self.app.main_window.update_project_info()
+        # Дальнейшие правки дописываются в тот же журнал
+        self.journal = EditJournal(file_path, saved, edits)
+        if edits:
+            messagebox.showinfo("Восстановление проекта",
+                                f"Проект был закрыт без сохранения. "
+                                f"Восстановлено несохраненных правок: {len(edits)}")
+        return bool(edits)
+            
     def ask_save_changes(self):
         """Спрашивает о сохранении изменений"""
         result = messagebox.askyesnocancel(
@@ -139,34 +247,147 @@ class ProjectManager:
         return True
         
     def collect_ui_data(self):
-        """Собирает данные из UI в модель проекта"""
+        """
+        Собирает данные из UI в модель проекта.
+
+        Разделы вкладок, еще не заполненных после открытия проекта,
+        остаются как были загружены.
+        """
         try:
             if hasattr(self.app, 'main_window'):
-                # Собираем данные из всех вкладок
-                self.current_project.data = {
-                    "calculations": self.app.main_window.calculations_tab.get_data(),
-                    "construction_stages": self.app.main_window.construction_tab.get_data(),
-                    "platforms": self.app.main_window.platforms_tab.get_data(),
-                    "capacity_check": self.app.main_window.capacity_tab.get_data(),
-                    "balance": self.app.main_window.balance_tab.get_data()
-                }
+                self.store_sections(self.current_project.data, self.snapshot_sections())
                 print("Данные собраны из UI")
         except Exception as e:
             print(f"Ошибка сбора данных из UI: {e}")
+            
+    def snapshot_sections(self, update=True):
+        """
+        Снимки данных вкладок для сохранения: раздел -> неизменяемый снимок
+        таблицы вкладки (ColumnarTable.snapshot) или данные вкладки без
+        таблицы. Вкладки, еще не заполненные после открытия проекта, не
+        включаются. Вызывается в потоке Tk.
+
+        update=False (автосохранение): вкладки не пересчитываются, таблицы
+        вкладок с необработанными изменениями или идущим расчетом
+        (is_up_to_date) не включаются.
+        """
+        pending = [section[0] for section in self.pending_sections]
+        sections = {}
+        for name, tab_name, empty in self.SECTIONS:
+            if name in pending:
+                continue
+            tab = getattr(self.app.main_window, tab_name)
+            if not hasattr(tab, 'table'):
+                sections[name] = tab.get_data()
+            elif update:
+                sections[name] = tab.current_table()
+            elif tab.is_up_to_date():
+                sections[name] = tab.table.snapshot()
+        return sections
+        
+    def saved_chunks(self, name):
+        """
+        Последние записанные сжатые порции раздела: (порции, строк в
+        порции) или None, если раздел еще не записывался и не загружался.
+        """
+        encoded = self.encoded_sections.get(name)
+        if encoded is not None:
+            return encoded[1], CHUNK_ROWS
+        if name in self.current_project.data:
+            return self.current_project.data.chunks(name)
+        return None
+        
+    def content_state(self):
+        """Состояние данных вкладок (версии таблиц): изменилось - есть что сохранять"""
+        state = [id(self.current_project)]
+        for name, tab_name, empty in self.SECTIONS:
+            tab = getattr(self.app.main_window, tab_name)
+            state.append(tab.table.version if hasattr(tab, 'table') else tab.get_data())
+        return state
+        
+    def store_sections(self, data, sections):
+        """
+        Снимки snapshot_sections в данные проекта data (ProjectSections).
+
+        Таблицы записываются сжатыми порциями (encode_table). Снимки
+        неизменяемы, поэтому запись можно выполнять в рабочем потоке.
+        """
+        for name, value in sections.items():
+            if isinstance(value, ColumnarTable):
+                data.set_chunks(name, self.encode_table(name, value), CHUNK_ROWS)
+            else:
+                data[name] = value
+        
+    def encode_table(self, name, table):
+        """
+        Сжатые порции таблицы раздела name по CHUNK_ROWS строк.
+
+        Порции, не изменившиеся с прошлого сохранения или загрузки (по
+        chunk_versions таблицы), повторно не кодируются.
+        """
+        version, encoded = self.encoded_sections.get(name, (-1, []))
+        chunks = []
+        for chunk, start in enumerate(range(0, len(table), CHUNK_ROWS)):
+            if chunk < len(encoded) and table.chunk_versions[chunk] <= version:
+                chunks.append(encoded[chunk])
+            else:
+                chunks.append(encode_section(table.rows(start, start + CHUNK_ROWS)))
+        # Пара заменяется целиком: сохранение из другого потока увидит согласованные данные
+        self.encoded_sections[name] = (table.version, chunks)
+        return chunks
         
     def apply_ui_data(self):
-        """Применяет данные проекта к UI"""
+        """
+        Применяет данные проекта к UI.
+
+        Сразу заполняется открытая вкладка и вкладки, от которых она
+        зависит, остальные - по одной в моменты простоя. Раздел проекта
+        распаковывается только перед заполнением своей вкладки.
+        """
         try:
             if hasattr(self.app, 'main_window'):
-                # Применяем данные ко всем вкладкам
-                data = self.current_project.data
+                main_window = self.app.main_window
+                current = main_window.current_tab()
+                immediate = main_window.changes.sources(current) + [current]
                 
-                self.app.main_window.calculations_tab.set_data(data.get("calculations", {}))
-                self.app.main_window.construction_tab.set_data(data.get("construction_stages", []))
-                self.app.main_window.platforms_tab.set_data(data.get("platforms", []))
-                self.app.main_window.capacity_tab.set_data(data.get("capacity_check", []))
-                self.app.main_window.balance_tab.set_data(data.get("balance", []))
+                self.pending_sections = []
+                for section in self.SECTIONS:
+                    if getattr(main_window, section[1]) in immediate:
+                        self.apply_section(section)
+                    else:
+                        self.pending_sections.append(section)
+                main_window.changes.clear()
                 
+                if self.pending_sections:
+                    self.app.root.after_idle(self.apply_pending_sections)
                 print("Данные применены к UI")
         except Exception as e:
-            print(f"Ошибка применения данных к UI: {e}")
\ No newline at end of file
+            print(f"Ошибка применения данных к UI: {e}")
+            
+    def apply_section(self, section):
+        """Заполнение вкладки данными раздела проекта"""
+        name, tab_name, empty = section
+        data = self.current_project.data
+        tab = getattr(self.app.main_window, tab_name)
+        from_file = hasattr(tab, 'table') and name in data and not data.is_loaded(name)
+        tab.set_data(data.get(name, empty()))
+        
+        # Порции файла соответствуют загруженной таблице и записываются повторно как есть
+        if from_file:
+            chunks, chunk_rows = data.chunks(name)
+            if chunk_rows == CHUNK_ROWS and len(chunks) == len(tab.table.chunk_versions):
+                self.encoded_sections[name] = (tab.table.version, chunks)
+        
+    def apply_pending_sections(self, all_sections=False):
+        """Заполнение следующей отложенной вкладки (all_sections - всех сразу)"""
+        autosave = getattr(self.app, 'autosave', None)
+        while self.pending_sections:
+            # Заполнение вкладки данными файла не является изменением
+            saved = autosave is not None and autosave.saved_state == self.content_state()
+            self.apply_section(self.pending_sections.pop(0))
+            if saved:
+                self.mark_saved()
+            if not all_sections:
+                break
+        if self.pending_sections:
+            self.app.root.after_idle(self.apply_pending_sections)
\ No newline at end of file
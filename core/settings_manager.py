@@ -1,13 +1,28 @@
 """
 Менеджер настроек приложения
+
+Изменения настроек накапливаются в памяти и записываются в файл одним
+разом через SAVE_DELAY мс после последнего изменения (или при выходе -
+flush), поэтому несколько изменений подряд (открытие проекта, выход)
+не переписывают файл каждое. Неудачная запись повторяется через
+RETRY_DELAY мс.
 """
 
 import json
 import os
 from utils.file_operations import save_json, load_json, ensure_directory_exists
 
+SAVE_DELAY = 1000  # Пауза после последнего изменения перед записью настроек, мс
+RETRY_DELAY = 10000  # Пауза перед повтором неудачной записи, мс
+
 class SettingsManager:
-    def __init__(self):
+    def __init__(self, root=None):
+        """root - окно Tk для отложенной записи (без него настройки записываются сразу)"""
+        self.root = root
+        self.save_timer = None
+        self.dirty = False         # Есть изменения, не записанные в файл
+        self.writes = 0            # Успешных записей файла настроек
+        self.avoided_writes = 0    # Изменений, не потребовавших отдельной записи
         self.projects_folder = os.path.join(
             os.path.expanduser("~"), 
             "ГидравлическийКалькулятор"
@@ -17,12 +32,15 @@ class SettingsManager:
         # Настройки по умолчанию
         self.settings = {
             'auto_save': False,
-            'backup_interval': 10,
+            'backup_interval': 10,      # Период автосохранения, мин
+            'backup_count': 10,         # Резервных копий на проект
             'recent_projects': [],
             'window_geometry': '1200x600',
             'default_material': 'Пластик',
             'last_project_folder': self.projects_folder,
-            'theme': 'default'
+            'theme': 'default',
+            'result_cache': True,
+            'result_cache_size': 200000
         }
         
         # Создаем папку для проектов если ее нет
@@ -51,16 +69,53 @@ class SettingsManager:
             
     def save_settings(self):
         """Сохранение настроек в файл"""
+        self.cancel_save()
         try:
-            success = save_json(self.settings, self.settings_file)
-            if success:
-                print(f"Настройки сохранены в {self.settings_file}")
-            else:
+            success = save_json(self.settings, self.settings_file, quiet=True)
+            if not success:
                 print("Ошибка сохранения настроек")
-            return success
         except Exception as e:
             print(f"Ошибка сохранения настроек: {e}")
-            return False
+            success = False
+        if success:
+            self.writes += 1
+            self.dirty = False
+        else:
+            self.dirty = True
+            if self.root is not None:
+                self.save_timer = self.root.after(RETRY_DELAY, self.flush)
+        return success
+        
+    def settings_changed(self):
+        """Отложенная запись: изменения за SAVE_DELAY мс записываются одним разом"""
+        if self.root is None:
+            self.save_settings()
+            return
+        if self.dirty:
+            self.avoided_writes += 1
+        self.dirty = True
+        self.cancel_save()
+        self.save_timer = self.root.after(SAVE_DELAY, self.flush)
+        
+    def cancel_save(self):
+        if self.save_timer is not None:
+            self.root.after_cancel(self.save_timer)
+            self.save_timer = None
+            
+    def flush(self):
+        """Немедленная запись накопленных изменений (если они есть)"""
+        self.save_timer = None
+        if self.dirty:
+            return self.save_settings()
+        return True
+        
+    def stats(self):
+        """Статистика записи файла настроек"""
+        return {
+            'writes': self.writes,
+            'avoided_writes': self.avoided_writes,
+            'pending': self.dirty
+        }
         
     def get_setting(self, key, default=None):
         """Получение значения настройки"""
@@ -68,9 +123,11 @@ class SettingsManager:
         
     def set_setting(self, key, value):
         """Установка значения настройки"""
+        if self.settings.get(key) == value:
+            self.avoided_writes += 1
+            return
         self.settings[key] = value
-        # Автоматически сохраняем при изменении
-        self.save_settings()
+        self.settings_changed()
         
     def add_recent_project(self, file_path):
         """Добавление проекта в список недавних"""
@@ -80,14 +137,13 @@ class SettingsManager:
         self.settings['recent_projects'].insert(0, file_path)
         self.settings['recent_projects'] = self.settings['recent_projects'][:10]  # Ограничение
         
-        # Сохраняем изменения
-        self.save_settings()
+        self.settings_changed()
         
     def remove_recent_project(self, file_path):
         """Удаление проекта из списка недавних"""
         if file_path in self.settings['recent_projects']:
             self.settings['recent_projects'].remove(file_path)
-            self.save_settings()
+            self.settings_changed()
             
     def get_recent_projects(self):
         """Получение списка недавних проектов"""
@@ -95,5 +151,4 @@ class SettingsManager:
         
     def update_window_geometry(self, geometry):
         """Обновление геометрии окна"""
-        self.settings['window_geometry'] = geometry
-        self.save_settings()
\ No newline at end of file
+        self.set_setting('window_geometry', geometry)
\ No newline at end of file
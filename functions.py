@@ -2,6 +2,17 @@
 Функции для гидравлических расчетов
 """
 import math
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Optional
+
+from utils import pipe_geometry as geometry
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
 
 # Существующие функции из вашего кода
@@ -18,64 +29,484 @@ DIAMETR = {
     "Чугун": ['100', '150', '200', '250', '300']
 }
 
-def filling_speed(Q, d, i, n):
+# Стандартные уклоны
+SLOPES = ['0.001', '0.002', '0.003', '0.004', '0.005', '0.006', '0.007', '0.008', '0.009', '0.01']
+
+SOLVER_VERSION = 5     # Увеличивать при любом изменении результатов решателя
+REL_TOLERANCE = 1e-8   # Допустимая относительная погрешность расхода
+MAX_ITER = 50          # Максимальное количество итераций
+H_D_SURCHARGED = 1.0   # Наполнение, возвращаемое для перегруженной (напорной) трубы
+
+# Явное приближение наполнения по доле от расхода полным сечением:
+#   h/d ≈ Σ (A_k + B_k·y)·u^k, k = 1..4,  u = (Q/Qполн)^(1/(2 + y)),
+# где y - показатель Павловского при полном заполнении (R = d/4).
+# Коэффициенты подобраны методом наименьших квадратов по точному решению
+# для d = 50...2000 мм и n = 0.011...0.017; погрешность до 0.005 при h/d < 0.8
+# (отчет о точности - benchmarks/bench_initial_guess.py)
+GUESS_A = (0.52999, 0.56413, -0.94280, 0.69086)
+GUESS_B = (-0.09786, 0.11833, -0.36870, 0.18711)
+
+# Наполнение, при котором расход максимален: h/d ≈ 0.94955 - 0.06981·y
+# (погрешность 1.5e-4 в том же диапазоне d и n)
+PEAK_A = 0.94955
+PEAK_B = -0.06981
+
+# До этой доли от расхода полным сечением перегрузка заведомо невозможна
+# (максимальный расход не меньше 1.07·Qполн)
+SAFE_Q_RATIO = 1.0
+
+
+@dataclass
+class FillingResult:
+    """Результат расчета наполнения трубы"""
+    h_d: float          # Относительное наполнение h/d
+    velocity: float     # Скорость, м/с
+    iterations: int     # Количество вычислений расхода
+    residual: float     # Относительная невязка расхода (Q(h) - Q) / Q
+    converged: bool     # Достигнута ли требуемая точность
+    surcharged: bool = False                    # Расход больше максимального - труба работает под напором
+    required_diameter: Optional[float] = None   # Диаметр (мм), пропускающий расход полным сечением
+
+
+def _exponent(R, n):
+    """Показатель степени y в формуле Павловского C = (1/n)·R^y"""
+    sqrt_n = math.sqrt(n)
+    return 2.5 * sqrt_n - 0.13 - 0.75 * math.sqrt(R) * (sqrt_n - 0.10)
+
+
+def _full_flow(d, i, n):
+    """Расход полным сечением (м³/с) и показатель y при R = d/4; d в метрах"""
+    R = d / 4
+    y = _exponent(R, n)
+    return math.pi / 4 * d**2 * (1 / n) * (R ** y) * math.sqrt(R * i), y
+
+
+def _estimate(q_ratio, y):
+    """Явное приближение h/d по доле q_ratio = Q/Qполн"""
+    u = q_ratio ** (1 / (2 + y))
+    a1, a2, a3, a4 = GUESS_A
+    b1, b2, b3, b4 = GUESS_B
+    return u * (a1 + b1 * y + u * (a2 + b2 * y + u * (a3 + b3 * y + u * (a4 + b4 * y))))
+
+
+def _flow_and_slope(h_d, d, i, n):
+    """Расход Q(h/d), производная dQ/d(h/d) и относительная площадь ω/d²"""
+    theta = 2 * math.acos(1 - 2 * h_d)
+    area = (theta - math.sin(theta)) / 8
+    R = 2 * area / theta * d
+    s = math.sqrt(h_d * (1 - h_d))
+
+    sqrt_n = math.sqrt(n)
+    sqrt_R = math.sqrt(R)
+    b = 0.75 * (sqrt_n - 0.10)
+    y = 2.5 * sqrt_n - 0.13 - b * sqrt_R
+    Q = area * d**2 * (1 / n) * (R ** y) * math.sqrt(R * i)
+
+    # d(ω/d²)/dx = 2s, dθ/dx = 2/s, R/d = 2·(ω/d²)/θ
+    dlnR = 2 * s / area - 2 / (s * theta)
+    dy = -0.5 * b * sqrt_R * dlnR
+    dlnQ = 2 * s / area + (y + 0.5) * dlnR + math.log(R) * dy
+    return Q, Q * dlnQ, area
+
+
+def _check_arguments(Q, d, i, n):
+    if Q < 0:
+        raise ValueError(f"Расход не может быть отрицательным: {Q}")
+    if d <= 0 or i <= 0 or n <= 0:
+        raise ValueError(f"Диаметр, уклон и шероховатость должны быть положительными: d={d}, i={i}, n={n}")
+
+
+def full_flow(d, i, n):
+    """Расход при полном заполнении трубы (л/с); d - диаметр, мм"""
+    _check_arguments(0, d, i, n)
+    return _full_flow(d/1000, i, n)[0] * 1000
+
+
+def partial_flow(h_d, d, i, n):
+    """Расход при наполнении h/d (л/с); d - диаметр, мм"""
+    _check_arguments(0, d, i, n)
+    if h_d <= 0:
+        return 0.0
+    if h_d >= 1:
+        return _full_flow(d/1000, i, n)[0] * 1000
+    return _flow_and_slope(h_d, d/1000, i, n)[0] * 1000
+
+
+def peak_flow(d, i, n, iterations=60):
+    """
+    Максимальный расход (л/с) и наполнение, при котором он достигается.
+
+    Максимум Q(h) ищется делением пополам по знаку производной dQ/dh
+    в окрестности явной оценки PEAK_A + PEAK_B·y.
+    """
+    _check_arguments(0, d, i, n)
+    d = d/1000
+    y = _full_flow(d, i, n)[1]
+    h_peak = PEAK_A + PEAK_B * y
+    lo, hi = h_peak - 0.05, min(h_peak + 0.05, 1 - 1e-9)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        if _flow_and_slope(mid, d, i, n)[1] > 0:
+            lo = mid
+        else:
+            hi = mid
+    h_d = (lo + hi) / 2
+    return _flow_and_slope(h_d, d, i, n)[0] * 1000, h_d
+
+
+def required_diameter(Q, i, n):
+    """
+    Подсказка для перегруженной трубы: наименьший диаметр (мм), который
+    пропускает расход Q (л/с) полным сечением при том же уклоне.
+
+    Сначала перебираются диаметры каталога DIAMETR; если их не хватает,
+    диаметр подбирается делением пополам и округляется вверх до 1 мм.
+    """
+    _check_arguments(Q, 1, i, n)
+    diameters = sorted({float(d) for values in DIAMETR.values() for d in values})
+    for d in diameters:
+        if full_flow(d, i, n) >= Q:
+            return d
+    lo, hi = diameters[-1], diameters[-1] * 2
+    while full_flow(hi, i, n) < Q:
+        lo, hi = hi, hi * 2
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if full_flow(mid, i, n) < Q:
+            lo = mid
+        else:
+            hi = mid
+    return float(math.ceil(hi))
+
+
+def _surcharged_result(Q, d, i, n, Q_max, iterations):
+    """Результат для перегруженной трубы (Q в м³/с, d в метрах)"""
+    velocity = Q / (math.pi / 4 * d**2)
+    return FillingResult(H_D_SURCHARGED, velocity, iterations, (Q_max - Q) / Q, False,
+                         surcharged=True, required_diameter=required_diameter(Q*1000, i, n))
+
+
+def h_d_estimate(Q, d, i, n):
+    """Явное приближение наполнения h/d без итераций (Q в л/с, d в мм)"""
+    _check_arguments(Q, d, i, n)
+    Q_full, y = _full_flow(d/1000, i, n)
+    return min(_estimate(Q/1000 / Q_full, y), PEAK_A + PEAK_B * y)
+
+
+def solve_filling(Q, d, i, n, rel_tol=REL_TOLERANCE, max_iter=MAX_ITER, h_d0=None,
+                  q_max=None, h_d_max=None):
+    """
+    Расчет наполнения и скорости методом Ньютона с защитой интервалом.
+
+    Q - расход (л/с), d - диаметр (мм), i - уклон, n - шероховатость.
+    Корень ищется на возрастающей ветви Q(h) от 0 до наполнения
+    максимального расхода; начальное приближение h_d0 по умолчанию
+    дает h_d_estimate. При выходе шага Ньютона за интервал выполняется
+    деление пополам.
+
+    q_max (л/с) и h_d_max - заранее рассчитанные максимальный расход и
+    наполнение при нем (см. utils.capacity_index): тогда перегрузка
+    проверяется без вычислений, а корень ищется точно на возрастающей
+    ветви. Если расход не меньше максимального, возвращается результат
+    с surcharged=True, h/d = H_D_SURCHARGED, скоростью напорного потока
+    и подсказкой required_diameter. Для nan и бесконечных данных
+    возвращается nan без итераций (converged=False).
+    """
+    _check_arguments(Q, d, i, n)
+    if not math.isfinite(Q + d + i + n):  # nan или бесконечность в любом из аргументов
+        nan = float('nan')
+        return FillingResult(nan, nan, 0, nan, False)
     d = d/1000  # (в метрах)
     Q = Q/1000  # (в м³/с)
-    tolerance = 0.0001  # Допустимая погрешность расхода (м³/с)
-    max_iter = 100      # Максимальное количество итераций
-    iter_count = 0       # Счетчик итераций
-
-    h_min = 0.001 * d
-    h_max = 0.99 * d
-    h = (h_min + h_max) / 2  # Начальное приближение
-    error = float('inf')     # Инициализируем ошибку бесконечностью
-
-    while error > tolerance and iter_count < max_iter:
-        iter_count += 1
-        
-        theta = 2 * math.acos(1 - (2 * h / d))
-        omega = (d**2 / 8) * (theta - math.sin(theta))
-        P_wet = (d / 2) * theta
-        R = omega / P_wet
-
-        sqrt_n = math.sqrt(n)
-        sqrt_R = math.sqrt(R)
-        y = 2.5 * sqrt_n - 0.13 - 0.75 * sqrt_R * (sqrt_n - 0.10)
-        C = (1 / n) * (R ** y)
+    if Q == 0:
+        return FillingResult(0.0, 0.0, 0, 0.0, True)
+
+    # Постоянные строки: Q(h) = (ω/d²)·K·R^(y + 0.5), y = a - b·sqrt(R)
+    sqrt_n = math.sqrt(n)
+    a = 2.5 * sqrt_n - 0.13
+    b = 0.75 * (sqrt_n - 0.10)
+    K = d * d / n * math.sqrt(i)
+    R_full = d / 4
+    y = a - b * math.sqrt(R_full)
+    q_ratio = Q / (math.pi / 4 * K * R_full ** (y + 0.5))
 
-        Q_theor = omega * C * math.sqrt(R * i)
-        error = abs(Q_theor - Q)
+    iterations = 0
+    if q_max is not None and h_d_max is not None:
+        lo, hi = 0.0, h_d_max
+        if Q >= q_max/1000:
+            return _surcharged_result(Q, d, i, n, q_max/1000, iterations)
+    else:
+        lo, hi = 0.0, PEAK_A + PEAK_B * y
+        if q_ratio > SAFE_Q_RATIO:
+            # Проверка на перегрузку только вблизи максимума расхода
+            iterations += 1
+            Q_max = _flow_and_slope(hi, d, i, n)[0]
+            if Q >= Q_max:
+                return _surcharged_result(Q, d, i, n, Q_max, iterations)
 
-        if error <= tolerance:
+    h_d = _estimate(q_ratio, y) if h_d0 is None else h_d0
+    h_d = min(max(h_d, hi * 1e-9), hi * (1 - 1e-9))
+
+    # Шаг Ньютона считается по формулам _flow_and_slope, встроенным в цикл
+    converged = False
+    residual = float('nan')  # Остается nan при max_iter = 0
+    while iterations < max_iter:
+        iterations += 1
+        theta = 2 * math.acos(1 - 2 * h_d)
+        area = (theta - math.sin(theta)) / 8
+        R = 2 * area / theta * d
+        sqrt_R = math.sqrt(R)
+        y = a - b * sqrt_R
+        Q_theor = area * K * R ** (y + 0.5)
+        residual = (Q_theor - Q) / Q
+        if abs(residual) <= rel_tol:
+            converged = True
             break
 
         if Q_theor < Q:
-            h_min = h  # Требуется большее h
+            lo = h_d  # Требуется большее h
         else:
-            h_max = h  # Требуется меньшее h
-            
-        h = (h_min + h_max) / 2
+            hi = h_d  # Требуется меньшее h
+
+        # d ln Q / d(h/d): d(ω/d²)/dx = 2s, dθ/dx = 2/s, R/d = 2·(ω/d²)/θ
+        s = math.sqrt(h_d * (1 - h_d))
+        dlnR = 2 * s / area - 2 / (s * theta)
+        dlnQ = 2 * s / area + (y + 0.5 - 0.5 * b * sqrt_R * math.log(R)) * dlnR
+        h_next = h_d - residual * Q / (Q_theor * dlnQ) if dlnQ > 0 else lo - 1
+        h_d = h_next if lo < h_next < hi else (lo + hi) / 2
+
+    if not converged:
+        area = geometry.exact_partial_fill(h_d)[1]
+    return FillingResult(h_d, Q / (area * d**2), iterations, residual, converged)
+
+
+def filling_speed(Q, d, i, n):
+    result = solve_filling(Q, d, i, n)
+    return result.h_d, result.velocity
+
+
+def _flow_and_slope_array(h_d, d, i, n):
+    """Векторный вариант _flow_and_slope"""
+    theta = 2 * np.arccos(1 - 2 * h_d)
+    area = (theta - np.sin(theta)) / 8
+    R = 2 * area / theta * d
+    s = np.sqrt(h_d * (1 - h_d))
+
+    sqrt_n = np.sqrt(n)
+    sqrt_R = np.sqrt(R)
+    b = 0.75 * (sqrt_n - 0.10)
+    y = 2.5 * sqrt_n - 0.13 - b * sqrt_R
+    Q = area * d**2 * (1 / n) * (R ** y) * np.sqrt(R * i)
+
+    dlnR = 2 * s / area - 2 / (s * theta)
+    dy = -0.5 * b * sqrt_R * dlnR
+    dlnQ = 2 * s / area + (y + 0.5) * dlnR + np.log(R) * dy
+    return Q, Q * dlnQ, area
+
+
+def filling_speed_batch(Q, d, i, n, rel_tol=REL_TOLERANCE, max_iter=MAX_ITER,
+                        q_max=None, h_d_max=None):
+    """
+    Расчет наполнения и скорости сразу для массива труб.
+
+    Q, d, i, n - числа или массивы одинаковой длины (л/с, мм, м/м, -).
+    q_max, h_d_max - необязательные массивы заранее рассчитанных
+    максимальных расходов и наполнений (nan - неизвестно), как в solve_filling.
+    Возвращает массивы h/d, скорости (м/с) и маску сходимости.
+    Перегруженные трубы получают h/d = H_D_SURCHARGED и False в маске,
+    строки с некорректными данными - nan и False.
+    """
+    if not HAS_NUMPY:
+        return _filling_speed_batch_python(Q, d, i, n, rel_tol, max_iter, q_max, h_d_max)
+
+    Q, d, i, n = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(Q, dtype=float)), np.atleast_1d(np.asarray(d, dtype=float)),
+        np.atleast_1d(np.asarray(i, dtype=float)), np.atleast_1d(np.asarray(n, dtype=float))
+    )
+    if q_max is None or h_d_max is None:
+        q_max = h_d_max = np.nan
+    q_max, h_d_max = (np.broadcast_to(np.asarray(x, dtype=float), Q.shape) for x in (q_max, h_d_max))
+    d = d / 1000  # (в метрах)
+    Q = Q / 1000  # (в м³/с)
+
+    valid = (Q >= 0) & (d > 0) & (i > 0) & (n > 0)
+    valid &= np.isfinite(Q) & np.isfinite(d) & np.isfinite(i) & np.isfinite(n)
+
+    h_d = np.full(Q.shape, np.nan)
+    v_final = np.full(Q.shape, np.nan)
+    converged = np.zeros(Q.shape, dtype=bool)
+
+    # Нулевой расход - пустая труба
+    empty = valid & (Q == 0)
+    h_d[empty] = 0.0
+    v_final[empty] = 0.0
+    converged[empty] = True
+
+    rows = np.flatnonzero(valid & ~empty)
+    if not len(rows):
+        return h_d, v_final, converged
+    Q_r, d_r, i_r, n_r = Q[rows], d[rows], i[rows], n[rows]
+
+    # Расход полным сечением и явное начальное приближение
+    R_full = d_r / 4
+    sqrt_n = np.sqrt(n_r)
+    y = 2.5 * sqrt_n - 0.13 - 0.75 * np.sqrt(R_full) * (sqrt_n - 0.10)
+    q_ratio = Q_r / (np.pi / 4 * d_r**2 * (1 / n_r) * R_full**y * np.sqrt(R_full * i_r))
+    known = np.isfinite(q_max[rows]) & np.isfinite(h_d_max[rows])
+    hi = np.where(known, h_d_max[rows], PEAK_A + PEAK_B * y)
+    lo = np.zeros(len(rows))
+    u = q_ratio ** (1 / (2 + y))
+    a1, a2, a3, a4 = GUESS_A
+    b1, b2, b3, b4 = GUESS_B
+    x = u * (a1 + b1 * y + u * (a2 + b2 * y + u * (a3 + b3 * y + u * (a4 + b4 * y))))
+    x = np.clip(x, hi * 1e-9, hi * (1 - 1e-9))
+
+    # Перегрузка: по известному максимальному расходу или, для остальных
+    # строк, расчетом только вблизи максимума
+    overloaded = known & (Q_r >= q_max[rows] / 1000)
+    near_peak = np.flatnonzero(~known & (q_ratio > SAFE_Q_RATIO))
+    if len(near_peak):
+        Q_max = _flow_and_slope_array(hi[near_peak], d_r[near_peak], i_r[near_peak], n_r[near_peak])[0]
+        overloaded[near_peak] = Q_r[near_peak] >= Q_max
+    over = rows[overloaded]
+    h_d[over] = H_D_SURCHARGED
+    v_final[over] = Q[over] / (np.pi / 4 * d[over]**2)
 
-    if iter_count >= max_iter:
-        print(f"Внимание: достигнут лимит {max_iter} итераций!")
-        print(f"Текущая погрешность: {error:.6f} м³/с (требуемая: {tolerance})")
+    # Метод Ньютона с защитой интервалом для всех строк сразу
+    active = np.flatnonzero(~overloaded)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        x_a = x[active]
+        Q_a = Q_r[active]
+        Q_theor, dQ, area = _flow_and_slope_array(x_a, d_r[active], i_r[active], n_r[active])
+
+        done = np.abs(Q_theor - Q_a) <= rel_tol * Q_a
+        finished = rows[active[done]]
+        h_d[finished] = x_a[done]
+        v_final[finished] = Q_a[done] / (area[done] * d_r[active[done]]**2)
+        converged[finished] = True
+
+        lo_a = np.where(Q_theor < Q_a, x_a, lo[active])
+        hi_a = np.where(Q_theor < Q_a, hi[active], x_a)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_next = x_a - (Q_theor - Q_a) / dQ
+        inside = (x_next > lo_a) & (x_next < hi_a)
+        lo[active] = lo_a
+        hi[active] = hi_a
+        x[active] = np.where(inside, x_next, (lo_a + hi_a) / 2)
+        active = active[~done]
+
+    # Строки, не сошедшиеся за max_iter
+    if len(active):
+        unfinished = rows[active]
+        h_d[unfinished] = x[active]
+        area = geometry.partial_fill_array(x[active])[1]
+        v_final[unfinished] = Q[unfinished] / (area * d[unfinished]**2)
+
+    return h_d, v_final, converged
+
+
+def _filling_speed_batch_python(Q, d, i, n, rel_tol=REL_TOLERANCE, max_iter=MAX_ITER,
+                                q_max=None, h_d_max=None):
+    """Запасной вариант filling_speed_batch без numpy (построчный расчет)"""
+    nan = float('nan')
+    columns = [Q, d, i, n, nan if q_max is None else q_max, nan if h_d_max is None else h_d_max]
+    size = max(len(x) if hasattr(x, '__len__') else 1 for x in columns)
+    columns = [x if hasattr(x, '__len__') else [x] * size for x in columns]
+
+    h_d_list, v_list, converged_list = [], [], []
+    for q_row, d_row, i_row, n_row, q_max_row, h_d_max_row in zip(*columns):
+        known = math.isfinite(q_max_row) and math.isfinite(h_d_max_row)
+        try:
+            result = solve_filling(float(q_row), float(d_row), float(i_row), float(n_row),
+                                   rel_tol, max_iter,
+                                   q_max=q_max_row if known else None,
+                                   h_d_max=h_d_max_row if known else None)
+            h_d, v, converged = result.h_d, result.velocity, result.converged
+        except (ValueError, TypeError, ZeroDivisionError, OverflowError):
+            h_d, v, converged = float('nan'), float('nan'), False
+        h_d_list.append(h_d)
+        v_list.append(v)
+        converged_list.append(converged)
+    return h_d_list, v_list, converged_list
+
+
+def _build_mgsn_table():
+    """
+    Подготовка таблицы МГСН для поиска коэффициента неравномерности.
+
+    Интервалы расхода (a, b] задаются верхними границами, по которым
+    ведется двоичный поиск; внутри интервала коэффициент меняется линейно.
+    """
+    lower = [float(low) for low, high in MGSN]
+    upper = [float(high) for low, high in MGSN]
+    k_start = [float(k_1) for k_1, k_2 in K_MGSN]
+    k_slope = [(k_2 - k_1) / (high - low) for (low, high), (k_1, k_2) in zip(MGSN, K_MGSN)]
+    return lower, upper, k_start, k_slope
 
-    theta_final = 2 * math.acos(1 - (2 * h / d))
-    omega_final = (d**2 / 8) * (theta_final - math.sin(theta_final))
-    v_final = Q / omega_final
-    h_d_relative = h / d
-    return h_d_relative, v_final
+
+MGSN_LOWER, MGSN_UPPER, MGSN_K, MGSN_SLOPE = _build_mgsn_table()
+Q_SEC_MAX = MGSN_UPPER[-1]  # Наибольший средне-секундный расход таблицы, л/с
+
+if HAS_NUMPY:
+    MGSN_LOWER_ARRAY = np.array(MGSN_LOWER)
+    MGSN_UPPER_ARRAY = np.array(MGSN_UPPER)
+    MGSN_K_ARRAY = np.array(MGSN_K)
+    MGSN_SLOPE_ARRAY = np.array(MGSN_SLOPE)
+
+
+def peaking_coefficient(q):
+    """
+    Коэффициент неравномерности для средне-секундного расхода q, л/с.
+
+    q = 0 - коэффициент первого интервала таблицы (предел при q → 0).
+    q > Q_SEC_MAX - коэффициент на верхней границе таблицы.
+    """
+    if not q >= 0:
+        raise ValueError(f"Расход не может быть отрицательным: {q}")
+    a = min(bisect_left(MGSN_UPPER, q), len(MGSN_UPPER) - 1)
+    return MGSN_K[a] + MGSN_SLOPE[a] * (min(q, MGSN_UPPER[a]) - MGSN_LOWER[a])
 
 
 def calculate_lit_per_sec(Q):
+    """
+    Максимальный секундный расход, л/с, и коэффициент неравномерности
+    по среднесуточному расходу Q, м³/сут.
+
+    Нулевой расход дает (0, коэффициент первого интервала), расход выше
+    таблицы - коэффициент на ее верхней границе. Отрицательный расход
+    вызывает ValueError.
+    """
+    if not Q >= 0:
+        raise ValueError(f"Расход не может быть отрицательным: {Q}")
     q = Q/86.4
-    q_lit_per_sec = 0
-    k, k_1, k_2 = 0, 0, 0
-    for a in range(0, len(MGSN)):
-        if MGSN[a][0] < q <= MGSN[a][1]:
-            k_1 = K_MGSN[a][0]
-            k_2 = K_MGSN[a][1]
-            # k = k_1 + (k_2 - k_1)*(q - k_1)/(k_2 - k_1)
-            k = K_MGSN[a][0] + (K_MGSN[a][1] - K_MGSN[a][0])*(q - MGSN[a][0])/(MGSN[a][1] - MGSN[a][0])
-            q_lit_per_sec = q*k
-            return q_lit_per_sec, k
\ No newline at end of file
+    k = peaking_coefficient(q)
+    return q*k, k
+
+
+def calculate_lit_per_sec_batch(Q):
+    """
+    Пакетный аналог calculate_lit_per_sec для списка расходов, м³/сут.
+
+    Возвращает массивы (л/с, коэффициент); для отрицательных и
+    nan-расходов - nan. Без numpy возвращает списки.
+    """
+    if not HAS_NUMPY:
+        q_lit_per_sec, k = [], []
+        for value in Q:
+            try:
+                row = calculate_lit_per_sec(float(value))
+            except (TypeError, ValueError):
+                row = (float('nan'), float('nan'))
+            q_lit_per_sec.append(row[0])
+            k.append(row[1])
+        return q_lit_per_sec, k
+
+    q = np.atleast_1d(np.asarray(Q, dtype=float)) / 86.4
+    valid = q >= 0
+    q_valid = np.where(valid, q, 0.0)
+    a = np.minimum(np.searchsorted(MGSN_UPPER_ARRAY, q_valid, side='left'), len(MGSN_UPPER) - 1)
+    k = MGSN_K_ARRAY[a] + MGSN_SLOPE_ARRAY[a] * (np.minimum(q_valid, MGSN_UPPER_ARRAY[a]) - MGSN_LOWER_ARRAY[a])
+    k = np.where(valid, k, np.nan)
+    return q * k, k
@@ -0,0 +1,31 @@
+"""
+Модель баланса водопотребления и водоотведения
+"""
+
+from models.calculation_data import ColumnarTable, TEXT, NUMBER, INPUT_FORMAT, EMPTY, is_empty
+
+
+class BalanceTable(ColumnarTable):
+    """Записи баланса: потребители с расходами по площадкам и этапам"""
+    COLUMNS = (
+        ('justification', TEXT, None),      # Обоснование
+        ('number_platform', TEXT, None),    # № пл.
+        ('number_phase', TEXT, None),       # № эт.
+        ('name', TEXT, None),               # Наименование
+        ('q_day', NUMBER, INPUT_FORMAT),    # Общий расход, м3/сут
+        ('percent_q', NUMBER, INPUT_FORMAT),  # %
+        ('percent_result', NUMBER, '.2f'),  # Итог %
+    )
+
+    def recalculate(self, index):
+        """Пересчет итогового процента строки"""
+        q_day = self.get(index, 'q_day')
+        percent = self.get(index, 'percent_q')
+        if is_empty(q_day) or is_empty(percent):
+            self.set(index, 'percent_result', EMPTY)
+        else:
+            self.set(index, 'percent_result', q_day * percent / 100)
+
+    def total_q_day(self):
+        """Суммарный общий расход, м3/сут"""
+        return sum(value for value in self.column('q_day') if not is_empty(value))
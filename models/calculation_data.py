@@ -0,0 +1,576 @@
+"""
+Табличные данные расчетов
+
+Таблицы хранятся по столбцам: числовые столбцы - в массивах array('d')
+(пустая ячейка - nan), текстовые - в списках. Treeview вкладок только
+отображает таблицу, преобразование чисел в строки выполняется только
+при выводе (format_row) и экспорте (to_values). Проект сохраняется с
+числами полной точности (to_rows), поэтому округление при выводе не
+накапливается в зависимых расчетах после загрузки. Для сохранения
+строки делятся на порции по CHUNK_ROWS; версия последнего изменения
+каждой порции хранится в chunk_versions, так что неизмененные порции
+можно не кодировать повторно.
+
+Каждое изменение таблицы увеличивает ее версию. Читатели, которым не
+нужны изменения (экспорт, сохранение, диалоги, рабочие потоки),
+пользуются снимком (snapshot): неизменяемой копией текущей версии,
+общей для всех читателей, пока таблица не изменится. Производные данные
+снимка (to_values, расходы площадок и интервалов) вычисляются один раз.
+"""
+
+import math
+from array import array
+
+from functions import calculate_lit_per_sec_batch
+from models.dependency_graph import BALANCE, PLATFORM, CAPACITY, topological_order
+from models.reference_expression import compile_references
+from models.rollup import rollup, sum_rows
+from utils.solver_cache import solver_cache
+
+EMPTY = float('nan')  # Пустая числовая ячейка
+
+TEXT = 'text'
+NUMBER = 'number'
+INPUT_FORMAT = '.10g'  # Формат введенных пользователем чисел (без лишних нулей)
+
+CHUNK_BITS = 10  # 1024 строки: порция кодируется за единицы мс, сжатие почти не хуже
+CHUNK_ROWS = 1 << CHUNK_BITS  # Строк в порции при сохранении проекта
+
+
+def parse_number(value):
+    """Число из значения ячейки; пустое или некорректное значение - nan"""
+    if value is None or value == "":
+        return EMPTY
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return EMPTY
+
+
+def format_number(value, spec):
+    """Строковое представление числа для таблицы; nan - пустая строка"""
+    if math.isnan(value):
+        return ""
+    return format(value, spec)
+
+
+def is_empty(value):
+    return math.isnan(value)
+
+
+class ColumnarTable:
+    # Столбцы: (имя, тип, формат); формат используется только для чисел
+    COLUMNS = ()
+    # Первый столбец представления - номер строки (вычисляется при выводе)
+    NUMBERED = True
+    # Снимок таблицы (snapshot) изменять нельзя
+    frozen = False
+
+    def __init__(self):
+        self._columns = {}
+        for name, kind, spec in self.COLUMNS:
+            self._columns[name] = array('d') if kind == NUMBER else []
+        self._kinds = {name: kind for name, kind, spec in self.COLUMNS}
+        self._formats = {name: spec for name, kind, spec in self.COLUMNS}
+        self.version = 0       # Увеличивается при каждом изменении
+        self.chunk_versions = array('q')  # Версия последнего изменения порций строк
+        self._snapshot = None  # Снимок последней запрошенной версии
+        self._derived = {}     # Производные данные снимка
+
+    @property
+    def names(self):
+        return [name for name, kind, spec in self.COLUMNS]
+
+    def view_names(self):
+        """Имена столбцов в порядке представления (None - номер строки)"""
+        return ([None] if self.NUMBERED else []) + self.names
+
+    def name_at(self, view_index):
+        """Имя столбца по номеру столбца представления (None - номер строки)"""
+        names = self.view_names()
+        return names[view_index] if 0 <= view_index < len(names) else None
+
+    def __len__(self):
+        return len(self._columns[self.COLUMNS[0][0]]) if self.COLUMNS else 0
+
+
+    def _convert(self, name, value):
+        if self._kinds[name] == NUMBER:
+            return parse_number(value)
+        return "" if value is None else str(value)
+
+    def column(self, name):
+        """Столбец целиком (array('d') для чисел, список для текста)"""
+        return self._columns[name]
+
+    def get(self, index, name):
+        return self._columns[name][index]
+
+    def set(self, index, name, value):
+        """Запись значения; строки в числовых столбцах преобразуются в числа"""
+        self._columns[name][index] = self._convert(name, value)
+        self.version += 1
+        self.chunk_versions[index >> CHUNK_BITS] = self.version
+
+    def row(self, index):
+        """Строка в виде словаря имя -> значение"""
+        return {name: column[index] for name, column in self._columns.items()}
+
+    def insert(self, index, **values):
+        """Вставка строки перед index; незаданные значения - пустые"""
+        for name, column in self._columns.items():
+            column.insert(index, self._convert(name, values.get(name)))
+        self._rows_shifted(index)
+        return index
+
+    def append(self, **values):
+        return self.insert(len(self), **values)
+
+    def delete(self, indexes):
+        """Удаление строк по номерам"""
+        indexes = sorted(set(indexes), reverse=True)
+        for index in indexes:
+            for column in self._columns.values():
+                del column[index]
+        if indexes:
+            self._rows_shifted(indexes[-1])
+
+    def clear(self):
+        for name, column in self._columns.items():
+            del column[:]
+        self._rows_shifted(0)
+
+    def _rows_shifted(self, first_row):
+        """Изменение всех строк начиная с first_row (вставка, удаление)"""
+        self.version += 1
+        count = (len(self) + CHUNK_ROWS - 1) >> CHUNK_BITS
+        versions = self.chunk_versions
+        del versions[count:]
+        for chunk in range(first_row >> CHUNK_BITS, len(versions)):
+            versions[chunk] = self.version
+        versions.extend([self.version] * (count - len(versions)))
+
+    def assign(self, table):
+        """
+        Замена содержимого строками таблицы table того же вида.
+
+        Помечаются только порции строк, которые отличаются, поэтому
+        перестроение таблицы с тем же результатом не требует повторной
+        записи ее порций при сохранении.
+        """
+        changed = []
+        for start in range(0, max(len(self), len(table)), CHUNK_ROWS):
+            if any(self._chunk(name, start) != table._chunk(name, start) for name in self.names):
+                changed.append(start >> CHUNK_BITS)
+        if not changed:
+            return
+        self._columns = {name: column[:] for name, column in table._columns.items()}
+        self.version += 1
+        versions = self.chunk_versions
+        count = (len(self) + CHUNK_ROWS - 1) >> CHUNK_BITS
+        del versions[count:]
+        versions.extend([self.version] * (count - len(versions)))
+        for chunk in changed:
+            if chunk < count:
+                versions[chunk] = self.version
+
+    def _chunk(self, name, start):
+        """Значения столбца в порции строк (числа - байтами, чтобы nan совпадали)"""
+        values = self._columns[name][start:start + CHUNK_ROWS]
+        return values.tobytes() if self._kinds[name] == NUMBER else values
+
+    def copy(self):
+        """Изменяемая копия данных таблицы (для расчета в рабочем потоке)"""
+        table = object.__new__(type(self))
+        table.__dict__.update(self.__dict__)
+        table._columns = {name: array('d', column.tobytes()) if self._kinds[name] == NUMBER
+                          else list(column)
+                          for name, column in self._columns.items()}
+        table.chunk_versions = self.chunk_versions[:]
+        table.frozen = False
+        table._snapshot = None
+        table._derived = {}
+        return table
+
+    def snapshot(self):
+        """
+        Неизменяемый снимок текущей версии таблицы.
+
+        Числовые столбцы снимка - memoryview только для чтения, текстовые -
+        кортежи. Пока таблица не изменилась, возвращается тот же снимок.
+        """
+        if self.frozen:
+            return self
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.version:
+            snapshot = object.__new__(type(self))
+            snapshot.__dict__.update(self.__dict__)
+            snapshot._columns = {name: memoryview(column[:]).toreadonly()
+                                 if self._kinds[name] == NUMBER else tuple(column)
+                                 for name, column in self._columns.items()}
+            snapshot.chunk_versions = self.chunk_versions[:]
+            snapshot.frozen = True
+            snapshot._snapshot = None
+            snapshot._derived = {}
+            self._snapshot = snapshot
+        return snapshot
+
+    def derived(self, key, compute):
+        """Значение compute(снимок), вычисляемое один раз для версии таблицы"""
+        snapshot = self.snapshot()
+        try:
+            return snapshot._derived[key]
+        except KeyError:
+            value = snapshot._derived[key] = compute(snapshot)
+            return value
+
+    def copy_from(self, table, indexes, names):
+        """Перенос значений столбцов names строк indexes из таблицы table"""
+        for name in names:
+            source = table.column(name)
+            target = self._columns[name]
+            for index in indexes:
+                target[index] = source[index]
+        self.version += 1
+        for index in indexes:
+            self.chunk_versions[index >> CHUNK_BITS] = self.version
+
+    def format_value(self, index, name):
+        value = self._columns[name][index]
+        if self._kinds[name] == NUMBER:
+            return format_number(value, self._formats[name])
+        return value
+
+    def format_row(self, index):
+        """Строка для отображения в Treeview"""
+        values = [self.format_value(index, name) for name in self.names]
+        if self.NUMBERED:
+            values.insert(0, index + 1)
+        return tuple(values)
+
+    def to_values(self):
+        """Все строки в отображаемом виде (для экспорта)"""
+        return self.derived('values', lambda table: tuple(
+            table.format_row(index) for index in range(len(table))))
+
+    def to_rows(self):
+        """Все строки с числами полной точности (для сохранения; пустое число - "")"""
+        return self.derived('rows', ColumnarTable.rows)
+
+    def rows(self, start=0, stop=None):
+        """Строки start..stop с числами полной точности"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        columns = [(self._columns[name], self._kinds[name] == NUMBER) for name in self.names]
+        rows = []
+        for index in range(start, stop):
+            values = [("" if math.isnan(column[index]) else column[index]) if numeric
+                      else column[index] for column, numeric in columns]
+            if self.NUMBERED:
+                values.insert(0, index + 1)
+            rows.append(tuple(values))
+        return tuple(rows)
+
+    def load_values(self, rows):
+        """Загрузка строк (to_rows или строки в отображаемом виде из старых проектов)"""
+        self.clear()
+        offset = 1 if self.NUMBERED else 0
+        for values in rows:
+            values = list(values)
+            self.append(**{name: values[position + offset]
+                           for position, name in enumerate(self.names)
+                           if position + offset < len(values)})
+
+
+class PlatformTable(ColumnarTable):
+    """Площадки: суммарные расходы по площадкам баланса"""
+    COLUMNS = (
+        ('names', TEXT, None),
+        ('q_day', NUMBER, '.2f'),           # Среднесуточный расход, м3/сут
+        ('q_sec', NUMBER, '.2f'),           # Средне-секундный расход, л/с
+        ('coeffic', NUMBER, '.2f'),         # Коэффициент неравномерности
+        ('q_lit_per_sec', NUMBER, '.2f'),   # Секундный расчетный расход, л/с
+    )
+
+    def __init__(self):
+        super().__init__()
+        # № площадки баланса для каждой строки; строятся в rebuild
+        self.keys = []
+        self._positions = {}
+
+    def clear(self):
+        super().clear()
+        self.keys = []
+        self._positions = {}
+
+    def is_linked(self):
+        """Построены ли связи строк с балансом (после загрузки проекта - нет)"""
+        return len(self.keys) == len(self)
+
+    def rebuild(self, balance, graph):
+        """Полное построение площадок по таблице баланса и связей в графе"""
+        self.clear()
+        graph.discard_kind(BALANCE)
+        graph.discard_kind(PLATFORM)
+
+        # Площадки в порядке номеров
+        names = balance.column('name')
+        platforms = rollup(balance, 'number_platform')
+        for group in platforms:
+            key = group.key[0]
+            self._positions[key] = self.append(names=' + '.join(names[row] for row in group.rows))
+            self.keys.append(key)
+            graph.set_sources((PLATFORM, key), ((BALANCE, row) for row in group.rows))
+        self._set_totals(range(len(self)), [group.total for group in platforms])
+
+    def move_rows(self, balance, graph, indexes):
+        """
+        Перенос строк баланса в площадки по текущему № пл.
+
+        False, если состав площадок изменился (появилась новая или
+        опустела существующая) и нужен полный rebuild.
+        """
+        if not self.is_linked():
+            return False
+        for index in indexes:
+            node = (BALANCE, index)
+            target = (PLATFORM, balance.get(index, 'number_platform'))
+            current = [node for node in graph.targets(node) if node[0] == PLATFORM]
+            if current == [target]:
+                continue
+            if target[1] not in self._positions:
+                return False
+            for platform in current:
+                graph.remove_source(platform, node)
+                if not graph.sources(platform):
+                    return False
+                graph.mark_dirty(platform)
+            graph.add_source(target, node)
+        return True
+
+    def recompute(self, balance, graph, indexes):
+        """Пересчет строк площадок по их строкам баланса"""
+        indexes = list(indexes)
+        names = balance.column('name')
+        q_day = balance.column('q_day')
+        totals = []
+        for index in indexes:
+            rows = sorted(key for kind, key in graph.sources((PLATFORM, self.keys[index])))
+            self.set(index, 'names', ' + '.join(names[row] for row in rows))
+            totals.append(sum_rows(q_day, rows))  # Общий расход
+        self._set_totals(indexes, totals)
+        return indexes
+
+    def _set_totals(self, indexes, totals):
+        """Расходы площадок по среднесуточным расходам totals"""
+        # Коэффициенты неравномерности для всех площадок одним вызовом
+        q_lit_per_sec_all, k_all = calculate_lit_per_sec_batch(totals)
+        for index, total, q_lit_per_sec, k in zip(indexes, totals, q_lit_per_sec_all, k_all):
+            self.set(index, 'q_day', total)  # Среднесуточный расход
+            self.set(index, 'q_sec', total / 86.4)  # Средне-секундный расход
+            self.set(index, 'coeffic', k)  # Коэффициент неравномерности
+            self.set(index, 'q_lit_per_sec', q_lit_per_sec)  # Секундный расход
+
+    def recompute_dirty(self, balance, graph):
+        """Пересчет помеченных площадок; номера пересчитанных строк"""
+        graph.take_dirty(BALANCE)  # Строки баланса учтены через площадки
+        indexes = [self._positions[key] for key in graph.take_dirty(PLATFORM)
+                   if key in self._positions]
+        if not indexes:
+            return []
+        return self.recompute(balance, graph, sorted(indexes))
+
+    def flows(self):
+        """Среднесуточные расходы площадок по обозначениям "п.N", м3/сут"""
+        return self.derived('flows', lambda table: {
+            f"п.{index + 1}": (0.0 if is_empty(q_day) else q_day)
+            for index, q_day in enumerate(table.column('q_day'))})
+
+
+class ConstructionTable(ColumnarTable):
+    """Этапы строительства: потребители, итоги по этапам и по проекту"""
+    NUMBERED = False
+    COLUMNS = (
+        ('name', TEXT, None),
+        ('q_day', NUMBER, INPUT_FORMAT),    # Qсут, м3/сут
+        ('q_mid', NUMBER, '.2f'),           # qср, л/с
+    )
+
+    def rebuild(self, balance):
+        """
+        Потребители по этапам строительства с итогами по этапам и по проекту.
+
+        Таблица строится заново и переносится через assign: изменяются
+        только порции строк, которые отличаются от прежних.
+        """
+        stages = ConstructionTable()
+        phases = rollup(balance, 'number_phase', skip_empty=True)
+        if len(phases):
+            names = balance.column('name')
+            q_day = balance.column('q_day')
+            stages.append(name="Проектируемая застройка")
+            for group in phases:
+                number_phase = group.key[0]
+                stages.append(name=f"{number_phase} этап строительства.")
+                for row in group.rows:
+                    stages.append(name=names[row], q_day=q_day[row], q_mid=q_day[row] / 86.4)
+                stages.append(name=f"Итого по {number_phase} этапу строительства",
+                              q_day=group.total, q_mid=group.total / 86.4)
+            stages.append(name="ИТОГО ПО ПРОЕКТУ:", q_day=phases.total, q_mid=phases.total / 86.4)
+        self.assign(stages)
+
+
+class CapacityTable(ColumnarTable):
+    """Проверка пропускной способности участков"""
+    COLUMNS = (
+        ('interval', TEXT, None),
+        ('platform', TEXT, None),           # Выражение "п.1 + п.3 + A2"
+        ('q_day', NUMBER, '.2f'),           # Ср. сут. расход, м3/сут
+        ('q_sec', NUMBER, '.2f'),           # Ср. сек. расход, л/с
+        ('coeffic', NUMBER, '.2f'),         # Коэффициент неравномерности
+        ('q_k_sec', NUMBER, '.2f'),         # Сек. расчетный расход, л/с
+        ('diametr', NUMBER, INPUT_FORMAT),  # Диаметр, мм
+        ('i_uklon', NUMBER, INPUT_FORMAT),  # Уклон
+        ('filling', NUMBER, '.2f'),         # Наполнение h/d
+        ('speed', NUMBER, '.2f'),           # Скорость, м/с
+        ('diametr_req', NUMBER, INPUT_FORMAT),  # Требуемый диаметр перегруженного участка, мм
+    )
+    N = 0.014  # Шероховатость
+
+    def __init__(self):
+        super().__init__()
+        self.cyclic = []  # Строки, не рассчитанные из-за циклических ссылок
+
+    def expression(self, index):
+        """Разобранные ссылки строки на площадки и интервалы"""
+        return compile_references(self.get(index, 'platform'))
+
+    def interval_rows(self):
+        """Обозначение интервала -> номер строки (при повторе - последняя)"""
+        rows = {}
+        for index, interval_name in enumerate(self.column('interval')):
+            if interval_name:
+                rows[interval_name] = index
+        return rows
+
+    def link(self, graph, platform_keys):
+        """
+        Построение связей участков в графе.
+
+        "п.N" - N-я строка таблицы площадок, остальные обозначения -
+        интервалы таблицы (в любой строке).
+        """
+        graph.discard_kind(CAPACITY)
+        interval_rows = self.interval_rows()
+        for index in range(len(self)):
+            expression = self.expression(index)
+            sources = [(PLATFORM, platform_keys[number - 1]) for number in expression.platforms
+                       if 1 <= number <= len(platform_keys)]
+            sources += [(CAPACITY, interval_rows[name]) for name in expression.intervals
+                        if name in interval_rows]
+            graph.set_sources((CAPACITY, index), sources)
+
+    def interval_flows(self):
+        """Среднесуточные расходы интервалов, м3/сут"""
+        return self.derived('interval_flows', lambda table: {
+            interval_name: table.q_day_or_zero(index)
+            for interval_name, index in table.interval_rows().items()})
+
+    def q_day_or_zero(self, index):
+        q_day = self.get(index, 'q_day')
+        return 0.0 if is_empty(q_day) else q_day
+
+    # Столбцы, рассчитываемые recalculate
+    CALCULATED = ('q_day', 'q_sec', 'coeffic', 'q_k_sec', 'filling', 'speed', 'diametr_req')
+
+    def recalculate(self, indexes, platform_q_day):
+        """
+        Пересчет расходов, наполнения и скорости в строках indexes.
+
+        Возвращает номера перегруженных участков.
+        """
+        indexes = self.calculate_flows(indexes, platform_q_day)
+        return self.solve(indexes)
+
+    def calculate_flows(self, indexes, platform_q_day):
+        """
+        Пересчет расходов в строках indexes (без наполнения и скорости).
+
+        platform_q_day - среднесуточные расходы площадок по порядку (п.1,
+        п.2, ...). Строки считаются в топологическом порядке: интервал
+        суммируется после пересчета строки, в которой он рассчитан, так
+        что цепочки интервалов накапливаются за один проход. Строки на
+        циклических ссылках не рассчитываются и попадают в self.cyclic.
+        Возвращает номера строк по возрастанию.
+        """
+        pending = set(indexes)
+        interval_rows = self.interval_rows()
+
+        def sources(index):
+            rows = (interval_rows.get(name) for name in self.expression(index).intervals)
+            return [row for row in rows if row in pending]
+
+        order, self.cyclic = topological_order(sorted(pending), sources)
+        for index in self.cyclic:
+            for name in ('q_day', 'q_sec', 'coeffic', 'q_k_sec'):
+                self.set(index, name, EMPTY)
+
+        # Суммарные расходы строк; рассчитанные q_day служат промежуточными итогами
+        to_peak = []
+        for index in order:
+            expression = self.expression(index)
+            if not expression:
+                continue
+            total_q_day = 0.0
+            for number in expression.platforms:
+                if 1 <= number <= len(platform_q_day) and not is_empty(platform_q_day[number - 1]):
+                    total_q_day += platform_q_day[number - 1]
+            for name in expression.intervals:
+                if name in interval_rows:
+                    total_q_day += self.q_day_or_zero(interval_rows[name])
+
+            if total_q_day > 0:
+                self.set(index, 'q_day', total_q_day)
+                self.set(index, 'q_sec', total_q_day / 86.4)
+                to_peak.append((index, total_q_day))
+            else:
+                for name in ('q_day', 'q_sec', 'coeffic', 'q_k_sec'):
+                    self.set(index, name, EMPTY)
+
+        # Коэффициенты неравномерности для всех строк одним вызовом
+        if to_peak:
+            peak_indexes, Q_day = zip(*to_peak)
+            q_lit_per_sec, k_sec = calculate_lit_per_sec_batch(list(Q_day))
+            for index, q, k in zip(peak_indexes, q_lit_per_sec, k_sec):
+                self.set(index, 'coeffic', k)
+                self.set(index, 'q_k_sec', q)
+
+        return sorted(pending)
+
+    def solve(self, indexes):
+        """
+        Наполнение и скорость одним пакетом для строк с расходом, диаметром и уклоном.
+
+        Для перегруженных участков заполняется требуемый диаметр.
+        Возвращает номера перегруженных участков.
+        """
+        to_solve = []
+        for index in indexes:
+            Q, d, i = (self.get(index, name) for name in ('q_k_sec', 'diametr', 'i_uklon'))
+            if is_empty(Q) or is_empty(d) or is_empty(i):
+                for name in ('filling', 'speed', 'diametr_req'):
+                    self.set(index, name, EMPTY)
+            else:
+                to_solve.append((index, Q, d, i))
+        if not to_solve:
+            return []
+
+        solve_indexes, Q, d, i = zip(*to_solve)
+        results = solver_cache.solve_batch(Q=list(Q), d=list(d), i=list(i), n=self.N)
+        overloaded = []
+        for index, (h_d_relative, v_final, converged, surcharged, required) in zip(solve_indexes, results):
+            self.set(index, 'filling', h_d_relative)
+            self.set(index, 'speed', EMPTY if math.isnan(h_d_relative) else v_final)
+            self.set(index, 'diametr_req', required)
+            if surcharged:
+                overloaded.append(index)
+        return overloaded
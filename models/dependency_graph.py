@@ -0,0 +1,120 @@
+"""
+Граф зависимостей расчетных таблиц
+
+Узлы - кортежи (вид, ключ): ('balance', номер строки баланса),
+('platform', № площадки), ('capacity', номер участка). Ребро источник ->
+зависимый означает, что значение зависимого узла вычисляется из
+источника. Изменение ячейки помечает узел, все зависящие от него узлы
+становятся "грязными" и пересчитываются, остальные не трогаются.
+"""
+
+import heapq
+
+BALANCE = 'balance'
+PLATFORM = 'platform'
+CAPACITY = 'capacity'
+
+
+class DependencyGraph:
+    def __init__(self):
+        self._sources = {}  # узел -> узлы, от которых он зависит
+        self._targets = {}  # узел -> узлы, зависящие от него
+        self._dirty = set()
+
+    def set_sources(self, node, sources):
+        """Замена всех источников узла"""
+        for source in self._sources.pop(node, ()):
+            targets = self._targets.get(source)
+            if targets is not None:
+                targets.discard(node)
+                if not targets:
+                    del self._targets[source]
+        sources = set(sources)
+        if sources:
+            self._sources[node] = sources
+            for source in sources:
+                self._targets.setdefault(source, set()).add(node)
+
+    def add_source(self, node, source):
+        self._sources.setdefault(node, set()).add(source)
+        self._targets.setdefault(source, set()).add(node)
+
+    def remove_source(self, node, source):
+        self._sources.get(node, set()).discard(source)
+        self._targets.get(source, set()).discard(node)
+
+    def sources(self, node):
+        return self._sources.get(node, set())
+
+    def targets(self, node):
+        return self._targets.get(node, set())
+
+    def discard_kind(self, kind):
+        """Удаление всех узлов вида kind вместе с их ребрами"""
+        for node in [node for node in self._sources if node[0] == kind]:
+            self.set_sources(node, ())
+        for node in [node for node in self._targets if node[0] == kind]:
+            for target in self._targets.pop(node):
+                sources = self._sources.get(target)
+                if sources is not None:
+                    sources.discard(node)
+        self._dirty = {node for node in self._dirty if node[0] != kind}
+
+    def mark_dirty(self, *nodes):
+        """Пометка узлов и всех зависящих от них узлов"""
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if node in self._dirty:
+                continue
+            self._dirty.add(node)
+            stack.extend(self._targets.get(node, ()))
+
+    def is_dirty(self, node):
+        return node in self._dirty
+
+    def take_dirty(self, kind):
+        """Ключи помеченных узлов вида kind (по возрастанию); пометка снимается"""
+        nodes = [node for node in self._dirty if node[0] == kind]
+        self._dirty.difference_update(nodes)
+        return sorted(key for kind, key in nodes)
+
+    def clear(self):
+        self._sources.clear()
+        self._targets.clear()
+        self._dirty.clear()
+
+    def __len__(self):
+        return len(set(self._sources) | set(self._targets))
+
+
+def topological_order(nodes, sources):
+    """
+    Порядок вычисления: каждый узел после всех своих источников.
+
+    sources(node) - источники узла среди nodes. Из готовых к вычислению
+    узлов первым берется наименьший, поэтому без зависимостей порядок
+    совпадает с исходным. Возвращает (порядок, узлы на циклах и
+    зависящие от них), вторые вычислить нельзя.
+    """
+    nodes = list(nodes)
+    waiting = {node: 0 for node in nodes}  # число невычисленных источников
+    targets = {node: [] for node in nodes}
+    for node in nodes:
+        for source in sources(node):
+            waiting[node] += 1
+            targets[source].append(node)
+
+    ready = [node for node in nodes if not waiting[node]]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node = heapq.heappop(ready)
+        order.append(node)
+        for target in targets[node]:
+            waiting[target] -= 1
+            if not waiting[target]:
+                heapq.heappush(ready, target)
+
+    cyclic = sorted(node for node in nodes if waiting[node])
+    return order, cyclic
@@ -1,11 +1,17 @@
 """
 Модель проекта
+
+Проект сохраняется в контейнер .hydro (utils.project_file) с отдельно
+сжатыми разделами данных вкладок; файлы с расширением .json и проекты
+прежнего формата (JSON целиком) по-прежнему открываются.
 """
 
 import json
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Any
+from utils.project_file import ProjectFile, ProjectSections, is_project_file, write_project_file
+from utils.file_operations import atomic_write
 
 @dataclass
 class ProjectMetadata:
@@ -25,13 +31,14 @@ class ProjectMetadata:
 class Project:
     def __init__(self):
         self.metadata = ProjectMetadata()
-        self.data = {
+        self.data = ProjectSections()
+        self.data.update({
             "calculations": {},
             "construction_stages": [],
             "platforms": [],
             "capacity_check": [],
             "balance": []
-        }
+        })
         self.is_modified = False
         
     @property
@@ -53,18 +60,26 @@ class Project:
         self.is_modified = True
         
     def save(self, file_path):
-        """Сохранение проекта в файл"""
+        """
+        Сохранение проекта в файл (.json - в прежнем формате, иначе - контейнер .hydro).
+
+        Файл записывается во временный и заменяется целиком, так что сбой
+        при записи не портит сохраненный ранее проект.
+        """
         self.metadata.file_path = file_path
         self.metadata.modified_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        project_data = {
-            "metadata": asdict(self.metadata),
-            "data": self.data
-        }
-        
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, ensure_ascii=False, indent=4)
+            if file_path.lower().endswith('.json'):
+                project_data = {
+                    "metadata": asdict(self.metadata),
+                    "data": dict(self.data)
+                }
+                with atomic_write(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(project_data, f, ensure_ascii=False, indent=4)
+            else:
+                with atomic_write(file_path, 'wb') as f:
+                    write_project_file(f, asdict(self.metadata), self.data)
                 
             self.is_modified = False
             print(f"Проект сохранен: {file_path}")
@@ -75,15 +90,27 @@ class Project:
         
     @classmethod
     def load(cls, file_path):
-        """Загрузка проекта из файла"""
+        """
+        Загрузка проекта из файла.
+
+        Из контейнера .hydro читаются только метаданные и оглавление,
+        разделы распаковываются при первом обращении к project.data.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                project_data = json.load(f)
+            if is_project_file(file_path):
+                project_file = ProjectFile(file_path)
+                metadata_dict = project_file.metadata
+                data = ProjectSections(project_file)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    project_data = json.load(f)
+                metadata_dict = project_data.get("metadata", {})
+                data = ProjectSections()
+                data.update(project_data.get("data", {}))
                 
             project = cls()
             
             # Загружаем метаданные, обрабатывая отсутствующие поля
-            metadata_dict = project_data.get("metadata", {})
             project.metadata = ProjectMetadata(
                 name=metadata_dict.get("name", "Новый проект"),
                 file_path=metadata_dict.get("file_path"),
@@ -93,7 +120,7 @@ class Project:
                 description=metadata_dict.get("description", "")
             )
             
-            project.data = project_data.get("data", {})
+            project.data = data
             project.is_modified = False
             
             print(f"Проект загружен: {file_path}")
@@ -0,0 +1,39 @@
+"""
+Ссылки на площадки и интервалы в столбце "№№ Пл./инт."
+
+Строка вида "п.1 + п.3 + A2" разбирается один раз: "п.N" - ссылка на
+N-ю площадку, остальные слагаемые - обозначения интервалов таблицы
+пропускной способности. Разобранные выражения кэшируются по тексту.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+PLATFORM_REFERENCE = re.compile(r"п\.(\d+)$")
+
+
+@dataclass(frozen=True)
+class ReferenceExpression:
+    platforms: Tuple[int, ...] = ()    # Номера площадок "п.N"
+    intervals: Tuple[str, ...] = ()    # Обозначения интервалов
+
+    def __bool__(self):
+        return bool(self.platforms or self.intervals)
+
+
+@lru_cache(maxsize=4096)
+def compile_references(text):
+    """Разбор строки ссылок в ReferenceExpression"""
+    platforms = []
+    intervals = []
+    for elem in (text or "").replace(" ", "").split('+'):
+        if not elem:
+            continue
+        match = PLATFORM_REFERENCE.match(elem)
+        if match:
+            platforms.append(int(match.group(1)))
+        else:
+            intervals.append(elem)
+    return ReferenceExpression(tuple(platforms), tuple(intervals))
@@ -0,0 +1,180 @@
+"""
+Группировка строк таблицы с промежуточными и общими итогами
+
+Строки группируются за один проход по столбцам таблицы: для каждой
+группы запоминаются номера строк (array('l')) и суммы числовых
+столбцов. Пустые значения (nan) в суммы не входят. Группы
+упорядочиваются по ключу, промежуточные итоги по первым полям ключа
+считаются по уже упорядоченным группам.
+"""
+
+import math
+from array import array
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+class Group:
+    """Группа строк с одинаковым ключом"""
+    __slots__ = ('key', 'rows', 'totals')
+
+    def __init__(self, key, size):
+        self.key = key              # Кортеж значений полей группировки
+        self.rows = array('l')      # Номера строк таблицы
+        self.totals = [0.0] * size  # Суммы столбцов values
+
+    @property
+    def total(self):
+        return self.totals[0]
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class Rollup:
+    def __init__(self, by, values, groups):
+        self.by = by
+        self.values = values
+        self.groups = groups  # Группы в порядке ключей
+        self.totals = [sum(group.totals[position] for group in groups)
+                       for position in range(len(values))]
+
+    @property
+    def total(self):
+        """Общий итог первого столбца values"""
+        return self.totals[0]
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def subtotals(self, level=1):
+        """
+        Промежуточные итоги по первым level полям ключа.
+
+        Список (ключ, суммы, группы) в порядке ключей.
+        """
+        result = []
+        for group in self.groups:
+            prefix = group.key[:level]
+            if not result or result[-1][0] != prefix:
+                result.append((prefix, [0.0] * len(self.values), []))
+            totals = result[-1][1]
+            for position, value in enumerate(group.totals):
+                totals[position] += value
+            result[-1][2].append(group)
+        return result
+
+
+def sum_rows(column, rows):
+    """Сумма значений столбца в строках rows без пустых"""
+    total = 0.0
+    for row in rows:
+        value = column[row]
+        if value == value:  # nan != nan
+            total += value
+    return total
+
+
+def rollup(table, by, values=('q_day',), skip_empty=False):
+    """
+    Группировка строк таблицы по столбцам by (имя или кортеж имен).
+
+    values - суммируемые числовые столбцы; при skip_empty строки с
+    пустым первым из них не входят ни в одну группу.
+    """
+    by = (by,) if isinstance(by, str) else tuple(by)
+    values = tuple(values)
+    key_columns = [table.column(name) for name in by]
+    value_columns = [table.column(name) for name in values]
+
+    if len(by) == 1:
+        uniques, codes = _codes(key_columns[0])
+        keys = [(key,) for key in uniques]
+    elif HAS_NUMPY and len(key_columns[0]):
+        keys, codes = _combined_codes_numpy(key_columns)
+    else:
+        keys, codes = _codes(list(zip(*key_columns)))
+    groups = [Group(key, len(values)) for key in keys]
+
+    if HAS_NUMPY and len(codes):
+        _group_numpy(groups, codes, value_columns, skip_empty)
+    else:
+        _group_python(groups, codes, value_columns, skip_empty)
+
+    # Группы, в которые не попало ни одной строки (все значения пустые)
+    groups = [group for group in groups if len(group)]
+    groups.sort(key=lambda group: group.key)
+    return Rollup(by, values, groups)
+
+
+def _codes(column):
+    """
+    Различные значения столбца в порядке появления и номер значения
+    каждой строки (оба шага выполняются без цикла на Python).
+    """
+    uniques = list(dict.fromkeys(column))
+    positions = {key: code for code, key in enumerate(uniques)}
+    if HAS_NUMPY:
+        codes = np.fromiter(map(positions.__getitem__, column), dtype=np.int64, count=len(column))
+    else:
+        codes = list(map(positions.__getitem__, column))
+    return uniques, codes
+
+
+def _combined_codes_numpy(key_columns):
+    """Номера сочетаний значений нескольких столбцов"""
+    uniques, combined = _codes(key_columns[0])
+    columns_uniques = [uniques]
+    for column in key_columns[1:]:
+        uniques, codes = _codes(column)
+        columns_uniques.append(uniques)
+        combined = combined * len(uniques) + codes
+    found, codes = np.unique(combined, return_inverse=True)
+
+    keys = []
+    for value in found.tolist():
+        key = []
+        for uniques in reversed(columns_uniques):
+            value, code = divmod(value, len(uniques))
+            key.append(uniques[code])
+        keys.append(tuple(reversed(key)))
+    return keys, codes.reshape(-1)
+
+
+def _group_numpy(groups, codes, value_columns, skip_empty):
+    if skip_empty:
+        codes = np.where(np.isnan(np.frombuffer(value_columns[0], dtype=float)), -1, codes)
+    included = codes >= 0
+
+    # Номера строк групп: устойчивая сортировка по номеру группы
+    # (для 16-битных номеров numpy сортирует поразрядно, за линейное время)
+    order = np.argsort(codes.astype(np.int16) if len(groups) < 2**15 else codes, kind='stable')
+    counts = np.bincount(codes[included], minlength=len(groups))
+    start = len(codes) - int(counts.sum())  # Пропущенные строки (-1) - в начале
+    for group, count in zip(groups, counts.tolist()):
+        group.rows.frombytes(order[start:start + count].astype(f'i{group.rows.itemsize}').tobytes())
+        start += count
+
+    for position, column in enumerate(value_columns):
+        column = np.frombuffer(column, dtype=float)
+        valid = included & ~np.isnan(column)
+        sums = np.bincount(codes[valid], weights=column[valid], minlength=len(groups))
+        for group, total in zip(groups, sums.tolist()):
+            group.totals[position] = total
+
+
+def _group_python(groups, codes, value_columns, skip_empty):
+    first_values = value_columns[0] if value_columns else None
+    for index, code in enumerate(codes):
+        if skip_empty and math.isnan(first_values[index]):
+            continue
+        groups[code].rows.append(index)
+    for group in groups:
+        group.totals = [sum_rows(column, group.rows) for column in value_columns]
@@ -0,0 +1,75 @@
+"""
+Расчет наполнения трубы методом Ньютона (functions.solve_filling)
+"""
+
+import math
+
+import pytest
+
+from functions import (H_D_SURCHARGED, REL_TOLERANCE, filling_speed, filling_speed_batch,
+                       partial_flow, peak_flow, solve_filling)
+
+N = 0.014
+PIPES = [(200, 0.005), (300, 0.003), (500, 0.007), (1000, 0.001)]
+
+
+@pytest.mark.parametrize("d, i", PIPES)
+@pytest.mark.parametrize("share", [0.001, 0.05, 0.3, 0.7, 0.99])
+def test_converges_to_flow(d, i, share):
+    Q = peak_flow(d, i, N)[0] * share
+    result = solve_filling(Q, d, i, N)
+    assert result.converged
+    assert not result.surcharged
+    assert 0 < result.h_d < 1
+    assert abs(result.residual) <= REL_TOLERANCE
+    assert partial_flow(result.h_d, d, i, N) == pytest.approx(Q, rel=1e-7)
+
+
+def test_filling_grows_with_flow():
+    fillings = [solve_filling(Q, 300, 0.005, N).h_d for Q in (1, 5, 10, 20, 40)]
+    assert fillings == sorted(fillings)
+
+
+@pytest.mark.parametrize("d, i", PIPES)
+def test_surcharged_pipe(d, i):
+    Q_max, h_d_max = peak_flow(d, i, N)
+    result = solve_filling(Q_max * 1.5, d, i, N)
+    assert result.surcharged
+    assert not result.converged
+    assert result.h_d == H_D_SURCHARGED
+    assert result.required_diameter > d
+    # С известным максимальным расходом перегрузка определяется так же
+    indexed = solve_filling(Q_max * 1.5, d, i, N, q_max=Q_max, h_d_max=h_d_max)
+    assert indexed.surcharged and indexed.iterations == 0
+
+
+def test_zero_flow_is_empty_pipe():
+    result = solve_filling(0, 300, 0.005, N)
+    assert (result.h_d, result.velocity, result.converged) == (0.0, 0.0, True)
+
+
+@pytest.mark.parametrize("values", [
+    (math.nan, 300, 0.005, N), (math.inf, 300, 0.005, N),
+    (10, math.nan, 0.005, N), (10, 300, math.inf, N),
+])
+def test_nan_and_inf_give_nan(values):
+    result = solve_filling(*values)
+    assert math.isnan(result.h_d) and math.isnan(result.velocity)
+    assert not result.converged
+
+
+@pytest.mark.parametrize("values", [(-1, 300, 0.005, N), (10, 0, 0.005, N), (10, 300, 0, N)])
+def test_invalid_arguments(values):
+    with pytest.raises(ValueError):
+        solve_filling(*values)
+
+
+def test_batch_matches_scalar():
+    rows = [(Q, d, i, N) for d, i in PIPES for Q in (0.0, 2.5, 15.0, 60.0, 1e4)]
+    h_d, v, converged = filling_speed_batch(*(list(column) for column in zip(*rows)))
+    for row, h_d_row, v_row, converged_row in zip(rows, h_d, v, converged):
+        expected = solve_filling(*row)
+        assert h_d_row == pytest.approx(expected.h_d, rel=1e-6)
+        assert v_row == pytest.approx(expected.velocity, rel=1e-6)
+        assert bool(converged_row) == expected.converged
+    assert filling_speed(*rows[1]) == pytest.approx((h_d[1], v[1]), rel=1e-6)
@@ -0,0 +1,153 @@
+"""
+Контейнер проекта .hydro (utils.project_file) и журнал правок (utils.edit_journal)
+"""
+
+import io
+
+import pytest
+
+from models.balance_record import BalanceTable
+from models.project import Project
+from utils.edit_journal import EditJournal, journal_path, read_journal
+from utils.project_file import (FORMAT_VERSION, MAGIC, PREAMBLE, ProjectFile, ProjectFileError,
+                                ProjectSections, encode_section, is_project_file,
+                                write_project_file)
+
+METADATA = {"name": "Проект", "modified_date": "2024-01-01 00:00:00"}
+ROWS = [["Баланс", "1", "1", f"Потребитель {k}", k * 1.5, 100] for k in range(10)]
+
+
+def write(path, sections, metadata=METADATA):
+    with open(path, 'wb') as f:
+        write_project_file(f, metadata, sections)
+    return path
+
+
+def test_container_round_trip(tmp_path):
+    sections = ProjectSections()
+    sections["calculations"] = {"results": "Итог"}
+    # Таблица порциями по 4 строки, как сохраняет ProjectManager
+    sections.set_chunks("balance", [encode_section(ROWS[k:k + 4]) for k in range(0, len(ROWS), 4)], 4)
+    path = write(tmp_path / "p.hydro", sections)
+
+    assert is_project_file(path)
+    project_file = ProjectFile(path)
+    assert project_file.metadata == METADATA
+    assert project_file.names == ["calculations", "balance"]
+    assert project_file.read("calculations") == {"results": "Итог"}
+    assert project_file.read("balance") == ROWS
+    chunks, chunk_rows = project_file.chunks("balance")
+    assert (len(chunks), chunk_rows) == (3, 4)
+
+
+def test_project_save_and_load(tmp_path):
+    project = Project()
+    project.name = "Сеть"
+    project.data["balance"] = ROWS
+    path = str(tmp_path / "p.hydro")
+    assert project.save(path)
+
+    loaded = Project.load(path)
+    assert loaded.name == "Сеть"
+    assert loaded.metadata.modified_date == project.metadata.modified_date
+    assert not loaded.is_modified
+    assert not loaded.data.is_loaded("balance")  # Разделы распаковываются по запросу
+    assert loaded.data["balance"] == ROWS
+
+
+def test_json_project_still_opens(tmp_path):
+    project = Project()
+    project.data["balance"] = ROWS
+    path = str(tmp_path / "p.json")
+    assert project.save(path)
+    assert not is_project_file(path)
+    assert Project.load(path).data["balance"] == ROWS
+
+
+def test_damaged_section_is_detected(tmp_path):
+    path = write(tmp_path / "p.hydro", {"balance": ROWS, "platforms": []})
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF  # Последний байт - в данных последнего раздела
+    path.write_bytes(bytes(data))
+
+    project_file = ProjectFile(path)
+    assert project_file.read("balance") == ROWS  # Другие разделы читаются
+    with pytest.raises(ProjectFileError):
+        project_file.read("platforms")
+
+
+def test_newer_format_and_foreign_file_are_rejected(tmp_path):
+    buffer = io.BytesIO()
+    write_project_file(buffer, METADATA, {"balance": ROWS})
+    data = bytearray(buffer.getvalue())
+    magic, version, header_length = PREAMBLE.unpack_from(data)
+    PREAMBLE.pack_into(data, 0, MAGIC, FORMAT_VERSION + 1, header_length)
+    newer = tmp_path / "newer.hydro"
+    newer.write_bytes(bytes(data))
+    with pytest.raises(ProjectFileError):
+        ProjectFile(newer)
+
+    foreign = tmp_path / "foreign.hydro"
+    foreign.write_bytes(b"not a project file")
+    assert not is_project_file(foreign)
+    with pytest.raises(ProjectFileError):
+        ProjectFile(foreign)
+
+
+def make_balance():
+    balance = BalanceTable()
+    for k in range(5):
+        balance.append(name=f"Потребитель {k}", number_platform="1", q_day=float(k), percent_q=100)
+    return balance
+
+
+def test_journal_replay(tmp_path):
+    path = journal_path(str(tmp_path / "p.hydro"))
+    edits = [("balance", "set", 1, "q_day", 10.0), ("balance", "set", 3, "name", "Новый")]
+    journal = EditJournal(path, METADATA["modified_date"])
+    journal.append(edits[:1])
+    journal.append(edits[1:])
+    journal.close()
+
+    saved, recorded = read_journal(path)
+    assert saved == METADATA["modified_date"]
+    assert [tuple(edit) for edit in recorded] == edits
+
+    expected, replayed = make_balance(), make_balance()
+    for section, op, index, name, value in edits:
+        expected.set(index, name, value)
+    for section, op, index, name, value in recorded:
+        replayed.set(index, name, value)
+    assert replayed.rows(0, len(replayed)) == expected.rows(0, len(expected))
+
+
+def test_journal_drops_torn_last_line(tmp_path):
+    path = str(tmp_path / "p.hydro.journal")
+    journal = EditJournal(path, "saved")
+    journal.append([("balance", "set", 0, "q_day", 1.0)])
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('["balance","set",1,"q_d')  # Сбой во время записи
+
+    saved, recorded = read_journal(path)
+    assert recorded == [["balance", "set", 0, "q_day", 1.0]]
+
+    # Журнал после восстановления переписывается без неполной строки
+    EditJournal(path, saved, recorded).close()
+    with open(path, encoding='utf-8') as f:
+        assert f.read().count("\n") == 2
+
+
+def test_missing_or_damaged_journal(tmp_path):
+    assert read_journal(str(tmp_path / "none.journal")) == (None, [])
+    damaged = tmp_path / "damaged.journal"
+    damaged.write_text("{broken\n", encoding='utf-8')
+    assert read_journal(str(damaged)) == (None, [])
+
+
+def test_discard_removes_journal(tmp_path):
+    path = tmp_path / "p.hydro.journal"
+    journal = EditJournal(str(path), "saved")
+    journal.discard()
+    assert not path.exists()
+    journal.discard()  # Повторное удаление не ошибка
@@ -0,0 +1,87 @@
+"""
+Шина изменений между вкладками
+
+Вкладка-источник сообщает об измененных строках (publish), подписанные
+на нее вкладки получают изменения одним пакетом в ближайший момент
+простоя (after_idle). Сразу обновляется только видимая вкладка, скрытые
+накапливают изменения и обновляются при показе или при обращении к их
+данным (update). Перед вкладкой всегда обновляется ее источник.
+"""
+
+ALL = None  # Изменены все строки источника (вставка, удаление, загрузка)
+
+
+class ChangeBus:
+    def __init__(self, root, notebook):
+        self.root = root
+        self.notebook = notebook
+        self._sources = {}   # вкладка -> вкладка-источник
+        self._targets = {}   # вкладка-источник -> подписанные вкладки
+        self._pending = {}   # вкладка -> номера измененных строк источника или ALL
+        self._scheduled = None
+        notebook.bind("<<NotebookTabChanged>>", self.tab_shown, add="+")
+
+    def subscribe(self, tab, source):
+        """Подписка вкладки tab на изменения вкладки source"""
+        self._sources[tab] = source
+        self._targets.setdefault(source, []).append(tab)
+
+    def publish(self, source, indexes=ALL):
+        """Сообщение об изменении строк indexes вкладки source"""
+        for tab in self._targets.get(source, ()):
+            changes = self._pending.get(tab, set())
+            if changes is not ALL:
+                changes = ALL if indexes is ALL else changes | set(indexes)
+            self._pending[tab] = changes
+        if self._pending and self._scheduled is None:
+            self._scheduled = self.root.after_idle(self.deliver)
+
+    def sources(self, tab):
+        """Цепочка источников вкладки, начиная с самого дальнего"""
+        chain = []
+        tab = self._sources.get(tab)
+        while tab is not None:
+            chain.insert(0, tab)
+            tab = self._sources.get(tab)
+        return chain
+
+    def is_stale(self, tab):
+        """Есть ли у вкладки (или ее источников) необработанные изменения"""
+        while tab is not None:
+            if tab in self._pending:
+                return True
+            tab = self._sources.get(tab)
+        return False
+
+    def current_tab(self):
+        """Подписанная вкладка, открытая в notebook (или None)"""
+        selected = str(self.notebook.select())
+        for tab in self._sources:
+            if str(tab.frame) == selected:
+                return tab
+        return None
+
+    def deliver(self):
+        """Обновление видимой вкладки накопленными изменениями"""
+        self._scheduled = None
+        tab = self.current_tab()
+        if tab is not None:
+            self.update(tab)
+
+    def tab_shown(self, event=None):
+        """Обновление устаревшей вкладки при ее показе"""
+        tab = self.current_tab()
+        if tab is not None and self.is_stale(tab):
+            self.update(tab)
+
+    def update(self, tab):
+        """Обновление вкладки и ее источников по накопленным изменениям"""
+        source = self._sources.get(tab)
+        if source is not None:
+            self.update(source)
+        if tab in self._pending:
+            tab.source_changed(self._pending.pop(tab))
+
+    def clear(self):
+        """Сброс накопленных изменений (данные всех вкладок заданы заново)"""
+        self._pending.clear()
@@ -74,6 +74,13 @@ class CellEditor:
         """Сохранение изменений"""
         new_value = self.entry.get()
         
+        # Таблица с моделью данных: изменение и пересчет выполняет вкладка
+        tab = getattr(self.tree, 'tab', None)
+        if tab is not None:
+            tab.set_cell(self.row, self.col_idx, new_value)
+            self.dialog.destroy()
+            return
+        
         # Обновляем значение в списке
         while len(self.values) <= self.col_idx:
             self.values.append("")
@@ -82,13 +89,4 @@ class CellEditor:
         # Обновляем запись в таблице
         self.tree.item(self.row, values=self.values)
         
-        # Обновляем связанные расчеты
-        self.update_related_calculations()
-        
         self.dialog.destroy()
-        
-    def update_related_calculations(self):
-        """Обновление связанных расчетов"""
-        # Определяем какая таблица редактируется и обновляем соответствующие данные
-        if hasattr(self.tree, 'master') and hasattr(self.tree.master, 'update_calculations'):
-            self.tree.master.update_calculations()
\ No newline at end of file
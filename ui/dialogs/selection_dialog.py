@@ -4,7 +4,6 @@
 
 import tkinter as tk
 from tkinter import ttk
-from functions import calculate_lit_per_sec, filling_speed
 
 class SelectionDialog:
     def __init__(self, app, row, column, tree):
@@ -31,28 +30,18 @@ class SelectionDialog:
         self.setup_bindings()
         
     def get_platforms_data(self):
-        """Получение данных площадок"""
+        """Получение данных площадок ("п.N" -> м3/сут)"""
         platforms_tab = self.app.main_window.platforms_tab
         if platforms_tab:
-            return platforms_tab.get_data()
-        return []
+            return platforms_tab.platform_flows()
+        return {}
         
     def get_intervals_data(self):
         """Получение данных интервалов из таблицы 3"""
         capacity_tab = self.app.main_window.capacity_tab
-        intervals = {}
-        if capacity_tab and hasattr(capacity_tab, 'tree'):
-            for item in capacity_tab.tree.get_children():
-                values = capacity_tab.tree.item(item, 'values')
-                if values and len(values) > 1 and values[1]:  # values[1] - интервал
-                    interval_name = values[1]
-                    # Получаем расход для интервала (values[3] - q_day)
-                    try:
-                        q_day = float(values[3]) if values[3] else 0
-                        intervals[interval_name] = q_day
-                    except (ValueError, IndexError):
-                        intervals[interval_name] = 0
-        return intervals
+        if capacity_tab:
+            return capacity_tab.get_intervals_data()
+        return {}
         
     def create_widgets(self):
         """Создание виджетов диалога"""
@@ -64,7 +53,13 @@ class SelectionDialog:
         self.interval_vars = {}
         intervals_data = self.get_intervals_data()
         
+        # Собственный интервал строки не предлагается (ссылка на себя - цикл)
+        tab = self.tree.tab
+        own_interval = tab.table.get(tab.row_index(self.row), 'interval')
+        
         for interval_name, q_day in intervals_data.items():
+            if interval_name == own_interval:
+                continue
             var = tk.BooleanVar()
             self.interval_vars[interval_name] = var
             label_text = f"{interval_name} ({q_day:.2f} м3/сут)" if q_day > 0 else interval_name
@@ -92,15 +87,12 @@ class SelectionDialog:
         self.platform_vars = {}
         platforms_data = self.get_platforms_data()
         
-        for platform_data in platforms_data:
-            if len(platform_data) >= 3:
-                platform_num = platform_data[0]
-                q_day = float(platform_data[2]) if platform_data[2] else 0  # Среднесуточный расход
-                var = tk.BooleanVar()
-                self.platform_vars[f"п.{platform_num}"] = (var, q_day)
-                label_text = f"п.{platform_num} ({q_day:.2f} м3/сут)" if q_day > 0 else f"п.{platform_num}"
-                cb = ttk.Checkbutton(scrollable_frame, text=label_text, variable=var)
-                cb.pack(anchor=tk.W, pady=2)
+        for platform_name, q_day in platforms_data.items():
+            var = tk.BooleanVar()
+            self.platform_vars[platform_name] = (var, q_day)
+            label_text = f"{platform_name} ({q_day:.2f} м3/сут)" if q_day > 0 else platform_name
+            cb = ttk.Checkbutton(scrollable_frame, text=label_text, variable=var)
+            cb.pack(anchor=tk.W, pady=2)
         
         platform_canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -134,71 +126,6 @@ class SelectionDialog:
         # Формируем строку результата
         result = " + ".join(selected_items) if selected_items else ""
         
-        # Обновляем ячейку в таблице
-        item = self.tree.item(self.row)
-        values = list(item['values'])
-        
-        while len(values) < 11:  # Максимальное количество столбцов
-            values.append("")
-            
-        values[2] = result  # Столбец platform
-        
-        # Рассчитываем суммарный расход
-        total_q_day = self.calculate_total_flow(selected_items)
-        values[3] = f"{total_q_day:.2f}" if total_q_day > 0 else ""
-        
-        # Пересчитываем остальные значения
-        self.update_calculated_values(values, total_q_day)
-        
-        self.tree.item(self.row, values=values)
+        # Обновляем ячейку; суммарный расход и остальные значения пересчитывает вкладка
+        self.tree.tab.set_cell(self.row, 2, result)  # Столбец platform
         self.dialog.destroy()
-        
-    def calculate_total_flow(self, selected_items):
-        """Расчет суммарного расхода для выбранных площадок и интервалов"""
-        total = 0.0
-        
-        # Получаем данные площадок
-        platforms_data = self.get_platforms_data()
-        platform_dict = {}
-        for platform_data in platforms_data:
-            if len(platform_data) >= 3:
-                platform_dict[f"п.{platform_data[0]}"] = float(platform_data[2]) if platform_data[2] else 0
-        
-        # Получаем данные интервалов
-        intervals_data = self.get_intervals_data()
-        
-        # Суммируем выбранные элементы
-        for item in selected_items:
-            if item in platform_dict:
-                # Это площадка
-                total += platform_dict[item]
-            elif item in intervals_data:
-                # Это интервал
-                total += intervals_data[item]
-        
-        return total
-        
-    def update_calculated_values(self, values, total_q_day):
-        """Обновление расчетных значений"""
-        if total_q_day > 0:
-            # Расчет средне-секундного расхода
-            q_sec = total_q_day / 86.4
-            values[4] = f"{q_sec:.2f}"
-            
-            # Расчет коэффициента неравномерности
-            q_lit_per_sec, k = calculate_lit_per_sec(total_q_day)
-            values[5] = f"{k:.2f}"
-            values[6] = f"{q_sec * k:.2f}"
-            
-            # Если есть диаметр и уклон, пересчитываем наполнение и скорость
-            if len(values) > 8 and values[7] and values[8]:
-                try:
-                    Q = float(values[6])
-                    d = float(values[7])
-                    i = float(values[8])
-                    h_d_relative, v_final = filling_speed(Q=Q, d=d, i=i, n=0.014)
-                    values[9] = f"{h_d_relative:.2f}"
-                    values[10] = f"{v_final:.2f}"
-                except (ValueError, IndexError):
-                    values[9] = ""
-                    values[10] = ""
\ No newline at end of file
@@ -12,6 +12,8 @@ from .tabs.capacity_tab import CapacityTab
 from .tabs.balance_tab import BalanceTab
 from .dialogs.project_properties import ProjectPropertiesDialog
 from utils.exporters import WordExporter
+from models.dependency_graph import DependencyGraph
+from .change_bus import ChangeBus
 
 class MainWindow:
     def __init__(self, app):
@@ -62,6 +64,8 @@ class MainWindow:
     def export_to_word(self):
         """Экспорт проекта в Word"""
         try:
+            # Вкладки, еще не заполненные после открытия проекта
+            self.app.project_manager.apply_pending_sections(all_sections=True)
             exporter = WordExporter(self.app)
             success = exporter.export_to_word()
             
@@ -115,7 +119,7 @@ class MainWindow:
     def clear_recent_projects(self):
         """Очистка списка недавних проектов"""
         self.app.settings_manager.settings['recent_projects'] = []
-        self.app.settings_manager.save_settings()
+        self.app.settings_manager.settings_changed()
         self.update_recent_menu()
         
     def create_toolbar(self):
@@ -139,6 +143,11 @@ class MainWindow:
         
     def create_tabs(self):
         """Создание всех вкладок"""
+        # Связи между строками баланса, площадками и участками
+        self.dependencies = DependencyGraph()
+        # Передача изменений между вкладками
+        self.changes = ChangeBus(self.root, self.notebook)
+        
         self.calculations_tab = CalculationsTab(self.notebook, self.app)
         self.construction_tab = ConstructionTab(self.notebook, self.app)
         self.platforms_tab = PlatformsTab(self.notebook, self.app)
@@ -151,7 +160,20 @@ class MainWindow:
         self.notebook.add(self.construction_tab.frame, text="Этапы строительства")
         self.notebook.add(self.platforms_tab.frame, text="Таблица площадок")
         self.notebook.add(self.capacity_tab.frame, text="Проверка пропускной способности")
-
+        
+        # Площадки и этапы строятся по балансу, участки - по площадкам
+        self.changes.subscribe(self.platforms_tab, self.balance_tab)
+        self.changes.subscribe(self.construction_tab, self.balance_tab)
+        self.changes.subscribe(self.capacity_tab, self.platforms_tab)
+        
+    def current_tab(self):
+        """Открытая вкладка (или None)"""
+        selected = str(self.notebook.select())
+        for tab in (self.calculations_tab, self.balance_tab, self.construction_tab,
+                    self.platforms_tab, self.capacity_tab):
+            if str(tab.frame) == selected:
+                return tab
+        return None
         
     def update_project_info(self):
         """Обновление информации о проекте"""
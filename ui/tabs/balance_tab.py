@@ -7,6 +7,10 @@ from tkinter import ttk, messagebox
 from .base_tab import BaseTab
 from ui.dialogs.cell_editor import CellEditor
 from ui.widgets.context_menus import ColumnContextMenu
+from models.balance_record import BalanceTable
+
+# Столбцы баланса, от которых зависят площадки
+PLATFORM_INPUTS = ('number_platform', 'name', 'q_day')
 
 class BalanceTab(BaseTab):
 
@@ -61,6 +65,8 @@ class BalanceTab(BaseTab):
         scroll_y.config(command=self.balance_tree.yview)
         scroll_x.config(command=self.balance_tree.xview)
         
+        self.bind_view(self.balance_tree, BalanceTable())
+        
         self.balance_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
@@ -160,22 +166,16 @@ class BalanceTab(BaseTab):
                 messagebox.showwarning("Ошибка", "Поле 'Наименование' обязательно")
                 return
                 
-            record_num = len(self.balance_tree.get_children()) + 1
-            
+            index = self.table.append(
+                justification=justification, number_platform=platform, number_phase=phase,
+                name=name, q_day=q_day, percent_q=percent_q
+            )
             # Расчет итогового процента
-            percent_result = ""
-            if q_day and percent_q:
-                try:
-                    total = float(q_day)
-                    percent = float(percent_q)
-                    percent_result = f"{(total * percent / 100):.2f}"
-                except ValueError:
-                    pass
+            self.table.recalculate(index)
+            self.record_edits([('insert', index, self.table.row(index))])
             
-            self.balance_tree.insert("", tk.END, values=(
-                record_num, justification, platform, phase, name, 
-                q_day, percent_q, percent_result
-            ))
+            self.balance_tree.insert("", tk.END, values=self.table.format_row(index))
+            self.rows_changed([index])
             
             self.clear_form()
              
@@ -197,25 +197,52 @@ class BalanceTab(BaseTab):
         
     def delete_selected(self):
         """Удаление выбранной строки"""
-        selected = self.balance_tree.selection()
+        selected = self.selected_indexes()
         if selected:
-            self.balance_tree.delete(selected)
-            self.renumber_rows()
+            self.flush_changes()
+            self.table.delete(selected)
+            self.record_edits([('delete', selected)])
+            self.refresh_view()
+            self.structure_changed()
             
     def clear_table(self):
         """Очистка таблицы"""
-        for item in self.balance_tree.get_children():
-            self.balance_tree.delete(item)
+        self.discard_changes()
+        self.table.clear()
+        self.record_edits([('load', [])])
+        self.refresh_view()
+        self.structure_changed()
+            
+    def cells_changed(self, changes):
+        """Пересчет итоговых процентов и площадок по измененным строкам"""
+        platform_rows = []
+        for index, names in sorted(changes.items()):
+            if names & {'q_day', 'percent_q'}:
+                self.table.recalculate(index)
+                self.refresh_row(index)
+            if names & set(PLATFORM_INPUTS):
+                platform_rows.append(index)
+        if platform_rows:
+            self.rows_changed(platform_rows)
+            
+    def rows_reset(self):
+        """Пересчет итоговых процентов и всех зависимых вкладок"""
+        for index in range(len(self.table)):
+            self.table.recalculate(index)
+        self.refresh_view()
+        self.structure_changed()
+            
+    def rows_changed(self, indexes):
+        """Сообщение вкладкам, зависящим от баланса, об изменении строк"""
+        self.app.main_window.changes.publish(self, indexes)
+            
+    def structure_changed(self):
+        """Сообщение о вставке или удалении строк (полный пересчет зависимых вкладок)"""
+        self.app.main_window.changes.publish(self)
             
     def calculate_totals(self):
         """Расчет общих итогов"""
-        total_q = 0.0
-        for item in self.balance_tree.get_children():
-            values = self.balance_tree.item(item, 'values')
-            try:
-                total_q += float(values[5]) if values[5] else 0
-            except ValueError:
-                pass
+        total_q = self.table.total_q_day()
         
         messagebox.showinfo("Итоги", f"Общий расход: {total_q:.2f} м3/сут")
         
@@ -226,27 +253,15 @@ class BalanceTab(BaseTab):
             messagebox.showwarning("Внимание", "Выберите строку для дублирования")
             return
         
-        selected_item = selected[0]
-        values = list(self.balance_tree.item(selected_item, 'values'))
-        values[0] = ""  # Очищаем номер
-        
-        all_items = list(self.balance_tree.get_children())
-        selected_index = all_items.index(selected_item)
-        
-        if selected_index + 1 < len(all_items):
-            self.balance_tree.insert("", selected_index + 1, values=values)
-        else:
-            self.balance_tree.insert("", tk.END, values=values)
+        selected_index = self.row_index(selected[0])
+        self.flush_changes()
+        row = self.table.row(selected_index)
+        self.table.insert(selected_index + 1, **row)
+        self.record_edits([('insert', selected_index + 1, row)])
         
-        self.renumber_rows()
-        
-    def renumber_rows(self):
-        """Перенумерация строк"""
-        for i, item in enumerate(self.balance_tree.get_children(), start=1):
-            values = list(self.balance_tree.item(item, 'values'))
-            if values:
-                values[0] = i
-                self.balance_tree.item(item, values=values)
+        # Номера строк пересчитываются при выводе
+        self.refresh_view()
+        self.structure_changed()
                 
     def clear_form(self):
         """Очистка формы ввода"""
@@ -259,8 +274,6 @@ class BalanceTab(BaseTab):
         
     def load_test_data(self):
         """Загрузка тестовых данных"""
-        self.clear_table()
-        
         test_data = [
             (1, "Баланс", "3", "1", "Жилой дом", "150.5", "100", "15.05"),
             (2, "Баланс", "2", "2", "Офисное здание", "200.0", "100", "30.00"),
@@ -269,15 +282,21 @@ class BalanceTab(BaseTab):
             (5, "Баланс", "3", "1", "Спортивный комплекс", "420.0", "100", "105.00")
         ]
         
-        for data in test_data:
-            self.balance_tree.insert("", tk.END, values=data)
+        self.discard_changes()
+        self.table.load_values(test_data)
+        self.record_edits([('load', test_data)])
+        self.refresh_view()
+        self.structure_changed()
         
         messagebox.showinfo("Тестовые данные", "Тестовые данные загружены!")
         
     def get_data(self):
-        return [self.balance_tree.item(item, 'values') for item in self.balance_tree.get_children()]
+        return self.current_table().to_rows()
+        
+    def get_export_data(self):
+        return self.current_table().to_values()
         
     def set_data(self, data):
-        self.clear_table()
-        for row in data:
-            self.balance_tree.insert("", tk.END, values=row)
\ No newline at end of file
+        self.discard_changes()
+        self.table.load_values(data)
+        self.refresh_view()
\ No newline at end of file
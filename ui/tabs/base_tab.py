@@ -6,6 +6,8 @@ import tkinter as tk
 from tkinter import ttk
 
 class BaseTab:
+    CHANGE_DELAY = 150  # Пауза после последнего изменения перед пересчетом, мс
+    
     def __init__(self, notebook, app):
         self.app = app
         self.frame = ttk.Frame(notebook)
@@ -19,10 +21,160 @@ class BaseTab:
         """Получение данных из вкладки"""
         return {}
         
+    def get_export_data(self):
+        """Данные вкладки в отображаемом виде (для экспорта)"""
+        return self.get_data()
+        
     def set_data(self, data):
         """Установка данных во вкладку"""
         pass
         
+    def bind_view(self, tree, table):
+        """
+        Связывание Treeview с таблицей данных вкладки.
+
+        Данные хранятся в table (models.calculation_data), Treeview только
+        отображает их; редакторы ячеек изменяют данные через set_cell.
+        """
+        self.table = table
+        self.view = tree
+        tree.tab = self
+        self.pending_changes = {}  # строка -> имена измененных столбцов
+        self.change_timer = None
+        
+    def refresh_view(self):
+        """Перерисовка Treeview по таблице данных"""
+        self.view.delete(*self.view.get_children())
+        for index in range(len(self.table)):
+            self.view.insert("", tk.END, values=self.table.format_row(index))
+            
+    def refresh_row(self, index):
+        """Перерисовка одной строки Treeview"""
+        self.refresh_rows((index,))
+        
+    def refresh_rows(self, indexes):
+        """
+        Перерисовка строк indexes Treeview.
+
+        Список элементов Treeview запрашивается один раз: get_children
+        разбирает весь список элементов Tcl, и на больших таблицах вызов
+        для каждой строки занимает больше, чем сама перерисовка.
+        """
+        items = self.view.get_children()
+        for index in indexes:
+            self.view.item(items[index], values=self.table.format_row(index))
+        
+    def row_index(self, item):
+        """Номер строки таблицы данных для элемента Treeview"""
+        return self.view.index(item)
+        
+    def selected_indexes(self):
+        """Номера выделенных строк таблицы данных"""
+        return sorted(self.row_index(item) for item in self.view.selection())
+        
+    def set_cell(self, item, view_column, value):
+        """
+        Изменение ячейки: запись в таблицу данных и обновление строки.
+
+        Пересчет зависимых значений откладывается: изменения, сделанные
+        подряд, накапливаются и обрабатываются одним вызовом cells_changed
+        через CHANGE_DELAY мс после последнего из них.
+        """
+        index = self.row_index(item)
+        name = self.table.name_at(view_column)
+        if name is None:
+            return
+        self.table.set(index, name, value)
+        self.record_edits([('set', index, name, value)])
+        self.refresh_row(index)
+        self.pending_changes.setdefault(index, set()).add(name)
+        if self.change_timer is not None:
+            self.app.root.after_cancel(self.change_timer)
+        self.change_timer = self.app.root.after(self.CHANGE_DELAY, self.flush_changes)
+        
+    def flush_changes(self):
+        """Немедленная обработка накопленных изменений"""
+        changes = self.discard_changes()
+        if changes:
+            self.cells_changed(changes)
+            
+    def discard_changes(self):
+        """Сброс накопленных изменений (например, перед полным пересчетом)"""
+        if self.change_timer is not None:
+            self.app.root.after_cancel(self.change_timer)
+            self.change_timer = None
+        changes, self.pending_changes = self.pending_changes, {}
+        return changes
+        
+    def record_edits(self, edits):
+        """
+        Запись правок таблицы в журнал проекта (utils.edit_journal).
+
+        Правка - кортеж: ('set', строка, столбец, значение),
+        ('insert', строка, значения), ('delete', строки) или
+        ('load', строки).
+        """
+        self.app.project_manager.record_edits(self, edits)
+        
+    def apply_edits(self, edits):
+        """
+        Повтор правок из журнала (восстановление после сбоя).
+
+        Правки применяются к таблице в записанном порядке. После вставки
+        или удаления строк вкладка пересчитывается полностью
+        (rows_reset), иначе - по измененным ячейкам (cells_changed).
+        """
+        reset = False
+        for op, *args in edits:
+            if op == 'set':
+                index, name, value = args
+                self.table.set(index, name, value)
+                self.pending_changes.setdefault(index, set()).add(name)
+                continue
+            reset = True
+            if op == 'insert':
+                self.table.insert(args[0], **args[1])
+            elif op == 'delete':
+                self.table.delete(args[0])
+            elif op == 'load':
+                self.table.load_values(args[0])
+        self.refresh_view()
+        if reset:
+            self.discard_changes()
+            self.rows_reset()
+        else:
+            self.flush_changes()
+            
+    def rows_reset(self):
+        """Полный пересчет после замены строк таблицы"""
+        pass
+        
+    def source_changed(self, indexes):
+        """
+        Обновление по изменениям вкладки-источника (ui.change_bus).
+
+        indexes - номера измененных строк источника или None (все строки).
+        """
+        pass
+        
+    def current_table(self):
+        """Снимок таблицы с учетом изменений, еще не обработанных вкладкой"""
+        self.update_if_stale()
+        self.flush_changes()
+        return self.table.snapshot()
+        
+    def is_up_to_date(self):
+        """Нет необработанных изменений ячеек и источника: таблица согласована"""
+        return not self.pending_changes and not self.app.main_window.changes.is_stale(self)
+        
+    def update_if_stale(self):
+        """Обновление вкладки, если источник изменился, пока она была скрыта"""
+        self.app.main_window.changes.update(self)
+        
+    def cells_changed(self, changes):
+        """Пересчет значений, зависящих от измененных ячеек ({строка: столбцы})"""
+        pass
+        
     def validate_data(self):
         """Валидация данных вкладки"""
         return True
\ No newline at end of file
@@ -5,7 +5,8 @@
 import tkinter as tk
 from tkinter import ttk
 from .base_tab import BaseTab
-from functions import filling_speed, calculate_lit_per_sec, MATERIAL
+from functions import calculate_lit_per_sec, MATERIAL
+from utils.capacity_index import capacity_index
 
 class CalculationsTab(BaseTab):
     def create_widgets(self):
@@ -54,8 +55,11 @@ class CalculationsTab(BaseTab):
             q = float(self.entry_q.get())
             i = float(self.entry_i.get())
             n = MATERIAL[self.material_var.get()]
-            h, v = filling_speed(Q=q, d=d, i=i, n=n)
-            result_text = result_text + f"\nНаполнение: {h:.4f} м\nСкорость: {v:.3f} м/c"
+            result = capacity_index.solve(Q=q, d=d, i=i, n=n)
+            result_text = result_text + f"\nНаполнение: {result.h_d:.4f} м\nСкорость: {result.velocity:.3f} м/c"
+            if result.surcharged:
+                result_text += ("\nВнимание: расход превышает пропускную способность трубы, "
+                                f"требуется диаметр {result.required_diameter:g} мм")
             self.text_result.delete(1.0, tk.END)
             self.text_result.insert(tk.END, result_text)
         except Exception as e:
@@ -3,17 +3,34 @@
 """
 
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from .base_tab import BaseTab
-from functions import filling_speed, calculate_lit_per_sec
+from models.calculation_data import CapacityTable, EMPTY, is_empty
+from models.dependency_graph import CAPACITY
+from utils.solver_cache import solver_cache
+from utils.capacity_index import capacity_index
+from utils.background import BackgroundJob
+from utils.parallel import PARALLEL_ROWS, pool_ready, start_pool
+from utils.pipe_sizing import PipeSizer
 from ui.widgets.editable_treeview import EditableTreeview
 from ui.dialogs.selection_dialog import SelectionDialog
 from ui.widgets.context_menus import ColumnContextMenu
 
+# Таблицы от этого размера пересчитываются в рабочем потоке
+BACKGROUND_ROWS = 2000
+# Количество строк в порции расчета наполнения и скорости
+SOLVE_CHUNK = 1000
+# Порций, переносимых в таблицу за один опрос рабочего потока
+APPLY_CHUNKS = 2
+# Столбцы, изменение которых не влияет на расходы участков
+PIPE_INPUTS = {'diametr', 'i_uklon'}
+
 class CapacityTab(BaseTab):
+    job = None  # Текущий расчет в рабочем потоке (BackgroundJob)
+
     def create_widgets(self):
         columns = ("#", "interval", "platform", "q_day", "q_sec", "coeffic", "q_k_sec", 
-                  "diametr", "i_uklon", "filling", "speed")
+                  "diametr", "i_uklon", "filling", "speed", "diametr_req")
 
         # Создание редактируемой таблицы
         self.tree = EditableTreeview(
@@ -35,7 +52,8 @@ class CapacityTab(BaseTab):
             "diametr": "Диаметр, мм",
             "i_uklon": "Уклон, i",
             "filling": "Наполнение, h/d",
-            "speed": "Скорость, м/с"
+            "speed": "Скорость, м/с",
+            "diametr_req": "Требуемый диаметр, мм"
         }
         widths = {col: 80 for col in columns}
         widths["#"] = 40
@@ -47,6 +65,8 @@ class CapacityTab(BaseTab):
             self.tree.heading(col, text=headings[col])
             self.tree.column(col, width=widths[col], anchor=tk.CENTER)
 
+        self.bind_view(self.tree, CapacityTable())
+
         # Контекстное меню для столбцов
         self.context_menu = ColumnContextMenu(self.app, self.tree)
         self.tree.bind("<Button-3>", self.context_menu.show)
@@ -67,11 +87,23 @@ class CapacityTab(BaseTab):
         btn_frame.grid(row=2, column=0, columnspan=2, pady=5)
 
         ttk.Button(btn_frame, text="Добавить строку", 
-                  command=lambda: self.tree.add_row()).pack(side=tk.LEFT, padx=5)
+                  command=self.add_row).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Удалить строку", 
-                  command=lambda: self.tree.delete_selected()).pack(side=tk.LEFT, padx=5)
+                  command=self.delete_selected).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Обновить расчеты", 
                   command=self.update_calculations).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Подобрать трубы", 
+                  command=self.auto_size_pipes).pack(side=tk.LEFT, padx=5)
+
+        # Ход расчета в рабочем потоке
+        self.progress = ttk.Progressbar(btn_frame, length=150, mode='determinate')
+        self.progress.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(btn_frame, text="Отмена", state=tk.DISABLED,
+                                        command=self.cancel_calculations)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        # Состояние последнего расчета (прерван, циклические ссылки)
+        self.status = ttk.Label(btn_frame, text="")
+        self.status.pack(side=tk.LEFT, padx=5)
 
         # Настройка весов
         self.frame.grid_rowconfigure(0, weight=1)
@@ -103,81 +135,240 @@ class CapacityTab(BaseTab):
                 dialog = SelectionDialog(self.app, row, column, self.tree)
                 dialog.show()
 
+    def add_row(self):
+        """Добавление пустой строки"""
+        index = self.table.append()
+        self.record_edits([('insert', index, {})])
+        self.refresh_view()
+
+    def delete_selected(self):
+        """Удаление выделенных строк"""
+        indexes = self.selected_indexes()
+        if indexes:
+            self.flush_changes()
+            restart = self.cancel_calculations()
+            self.table.delete(indexes)
+            self.record_edits([('delete', indexes)])
+            self.refresh_view()
+            self.link_dependencies()
+            if restart:
+                self.update_calculations()
+
     def get_intervals_data(self):
         """Получение данных интервалов из этой таблицы"""
-        intervals = {}
-        for item in self.tree.get_children():
-            values = self.tree.item(item, 'values')
-            if values and len(values) > 1 and values[1]:  # values[1] - интервал
-                interval_name = values[1]
-                try:
-                    q_day = float(values[3]) if values[3] else 0  # values[3] - q_day
-                    intervals[interval_name] = q_day
-                except (ValueError, IndexError):
-                    intervals[interval_name] = 0
-        return intervals
+        return self.table.interval_flows()
 
     def get_platforms_data(self):
-        """Получение данных из вкладки площадок"""
+        """Среднесуточные расходы площадок по порядку (п.1, п.2, ...), м3/сут"""
         platforms_tab = self.app.main_window.platforms_tab
         if platforms_tab:
-            return platforms_tab.get_data()
-        return []
+            return platforms_tab.table.snapshot().column('q_day')
+        return ()
+
+    def cells_changed(self, changes):
+        """
+        Пересчет после изменения ячеек.
+
+        Изменение диаметра или уклона требует только гидравлического
+        расчета строки; остальные изменения пересчитывают строку и
+        зависящие от нее участки.
+        """
+        if self.job is not None:
+            # Идет расчет по снимку до изменений - перезапускается один раз
+            self.update_calculations()
+            return
+        graph = self.app.main_window.dependencies
+        dirty = [index for index, names in changes.items() if not names <= PIPE_INPUTS]
+        if any(changes[index] & {'interval', 'platform'} for index in dirty):
+            # Участки, ссылавшиеся на прежние обозначения, тоже пересчитываются
+            former = [target for index in dirty for target in graph.targets((CAPACITY, index))]
+            self.link_dependencies()
+            graph.mark_dirty(*former)
+        graph.mark_dirty(*((CAPACITY, index) for index in dirty))
+
+        solve = sorted(index for index in changes if index not in dirty)
+        if solve:
+            self.table.solve(solve)
+            self.refresh_rows(solve)
+        self.recompute_dirty()
+
+    def link_dependencies(self):
+        """Построение связей участков с площадками и интервалами"""
+        platforms_tab = self.app.main_window.platforms_tab
+        platform_keys = platforms_tab.table.keys if platforms_tab else []
+        self.table.link(self.app.main_window.dependencies, platform_keys)
         
-    def update_calculations(self):
-        """Обновление всех расчетов в таблице"""
-        # Получаем данные из таблицы площадок
-        platforms_data = self.get_platforms_data()
+    def update_calculations(self, on_done=None):
+        """
+        Обновление всех расчетов в таблице.
+
+        Большие таблицы считаются в рабочем потоке; on_done вызывается
+        после завершения расчета (если он не был отменен).
+        """
+        self.discard_changes()  # Изменения ячеек учитываются полным пересчетом
+        self.cancel_calculations()
+        self.link_dependencies()
+        if len(self.table) >= BACKGROUND_ROWS:
+            self.start_calculations(range(len(self.table)), on_done)
+            return
         
-        # Создаем словарь с данными площадок
-        platform_dict = {}
-        for values in platforms_data:
-            if len(values) >= 3:
-                platform_dict[f"п.{values[0]}"] = float(values[2]) if values[2] else 0
-
-        # Обновляем каждую строку
-        for item in self.tree.get_children():
-            values = list(self.tree.item(item, 'values'))
-            if len(values) >= 3:
-                platform_str = values[2]  # Строка с площадками/интервалами
-                if platform_str:
-                    # Разбиваем строку на элементы
-                    elements = platform_str.replace(" ", "").split('+')
-                    total_q_day = 0
-
-                    # Суммируем данные по всем площадкам
-                    for elem in elements:
-                        if elem in platform_dict:
-                            total_q_day += platform_dict[elem]
-                    
-                    # Обновляем расчетные значения
-                    values[3] = f"{total_q_day:.2f}" if total_q_day > 0 else ""
-                    
-                    if total_q_day > 0:
-                        q_sec = total_q_day / 86.4
-                        values[4] = f"{q_sec:.2f}"
-                        
-                        q, k_sec = calculate_lit_per_sec(total_q_day)
-                        values[5] = f"{k_sec:.2f}"
-                        values[6] = f"{q_sec * k_sec:.2f}"
-
-                        # Пересчитываем наполнение и скорость если есть диаметр и уклон
-                        if len(values) > 8 and values[7] and values[8]:
-                            try:
-                                Q = float(values[6])
-                                d = float(values[7])
-                                i = float(values[8])
-                                h_d_relative, v_final = filling_speed(Q=Q, d=d, i=i, n=0.014)
-                                values[9] = f"{h_d_relative:.2f}"
-                                values[10] = f"{v_final:.2f}"
-                            except (ValueError, IndexError):
-                                values[9] = ""
-                                values[10] = ""
-                    
-                    self.tree.item(item, values=values)
+        self.table.recalculate(range(len(self.table)), self.get_platforms_data())
+        self.report(self.table.cyclic)
+        self.refresh_view()
+
+        if on_done is not None:
+            on_done()
+
+    def start_calculations(self, indexes, on_done=None):
+        """Расчет строк indexes в рабочем потоке по снимку таблицы"""
+        snapshot = self.table.copy()
+        platform_q_day = self.get_platforms_data()
+        len(capacity_index)  # Индекс загружается в главном потоке
+
+        def work(job):
+            rows = snapshot.calculate_flows(indexes, platform_q_day)
+            # От PARALLEL_ROWS строк таблица решается одним пакетом в пуле
+            # процессов (utils.parallel), если он уже запущен; иначе - порциями
+            # в этом потоке, а пул запускается для следующего пересчета.
+            # В поток Tk результаты в обоих случаях передаются порциями
+            large = len(rows) >= PARALLEL_ROWS
+            if large and not pool_ready():
+                start_pool()
+            step = len(rows) if large and pool_ready() else SOLVE_CHUNK
+            for start in range(0, len(rows), step):
+                if job.cancelled:
+                    return
+                batch = rows[start:start + step]
+                snapshot.solve(batch)
+                for position in range(0, len(batch), SOLVE_CHUNK):
+                    job.post(batch[position:position + SOLVE_CHUNK])
+                job.progress(start + len(batch), len(rows))
+
+        def apply(chunk):
+            self.table.copy_from(snapshot, chunk, CapacityTable.CALCULATED)
+            self.refresh_rows(chunk)
+
+        def finished(job):
+            solver_cache.flush()
+            if self.job is not job:
+                return  # Расчет отменен (cancel_calculations)
+            self.job = None
+            self.progress['value'] = 0
+            self.cancel_button.config(state=tk.DISABLED)
+            if job.error is not None:
+                self.status.config(text="Ошибка пересчета таблицы")
+                messagebox.showerror("Ошибка", f"Ошибка пересчета таблицы: {job.error}")
+                return
+            self.report(snapshot.cyclic)
+            if on_done is not None:
+                on_done()
+
+        self.progress.config(maximum=max(len(indexes), 1), value=0)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status.config(text="Пересчет таблицы...")
+        self.job = BackgroundJob(self.app.root, work, apply, on_progress=self.show_progress,
+                                 on_done=finished, batch=APPLY_CHUNKS).start()
+
+    def is_up_to_date(self):
+        return self.job is None and super().is_up_to_date()
+
+    def show_progress(self, done, total):
+        self.progress.config(maximum=max(total, 1), value=done)
+
+    def cancel_calculations(self):
+        """Отмена расчета в рабочем потоке; True, если расчет выполнялся"""
+        if self.job is None:
+            return False
+        job, self.job = self.job, None
+        job.cancel()
+        self.progress['value'] = 0
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status.config(text="Пересчет таблицы прерван")
+        return True
+
+    def recompute_dirty(self):
+        """Пересчет только участков, помеченных в графе зависимостей"""
+        graph = self.app.main_window.dependencies
+        indexes = [index for index in graph.take_dirty(CAPACITY) if index < len(self.table)]
+        if not indexes:
+            return
+        if self.job is not None:
+            # Идет расчет по снимку до изменения - пересчитывается вся таблица
+            self.update_calculations()
+            return
+        self.table.recalculate(indexes, self.get_platforms_data())
+        self.report(self.table.cyclic)
+        self.refresh_rows(indexes)
+
+    def report(self, cyclic):
+        """Сообщение о циклических ссылках (требуемые диаметры перегруженных участков - в таблице)"""
+        if cyclic:
+            rows = ", ".join(str(index + 1) for index in cyclic[:10])
+            if len(cyclic) > 10:
+                rows += f" и еще {len(cyclic) - 10}"
+            self.status.config(text=f"Циклические ссылки интервалов, строки не рассчитаны: {rows}")
+        else:
+            self.status.config(text="")
+        
+    def auto_size_pipes(self):
+        """Подбор диаметра и уклона для выделенных строк (или всех строк)"""
+        selected = self.selected_indexes()
+        self.update_calculations(on_done=lambda: self.size_pipes(selected))
+
+    def size_pipes(self, indexes=None):
+        """Подбор диаметра и уклона для строк indexes (по умолчанию - всех)"""
+        table = self.table
+        indexes = indexes or range(len(table))
+        indexes = [index for index in indexes
+                   if index < len(table) and not is_empty(table.get(index, 'q_k_sec'))]
+        if not indexes:
+            return
+
+        material = self.app.settings_manager.get_setting('default_material')
+        sizer = PipeSizer(material)
+        options = sizer.best(table.get(index, 'q_k_sec') for index in indexes)
+
+        not_sized = 0
+        edits = []
+        for index, option in zip(indexes, options):
+            if option is None:
+                not_sized += 1
+                continue
+            table.set(index, 'diametr', option.diameter)
+            table.set(index, 'i_uklon', option.slope)
+            table.set(index, 'filling', option.h_d)
+            table.set(index, 'speed', option.velocity)
+            table.set(index, 'diametr_req', EMPTY)
+            edits += [('set', index, 'diametr', option.diameter), ('set', index, 'i_uklon', option.slope)]
+        self.record_edits(edits)
+        self.refresh_view()
+
+        message = f"Подобраны трубы: {len(indexes) - not_sized} из {len(indexes)}"
+        if not_sized:
+            message += f"\nНет подходящих труб в каталоге для {not_sized} строк"
+        messagebox.showinfo("Подбор труб", message)
+        
+    def rows_reset(self):
+        """Новые связи участков и полный пересчет"""
+        self.link_dependencies()
+        self.update_calculations()
+        
+    def source_changed(self, indexes):
+        """Пересчет по изменениям площадок: полный или только помеченных участков"""
+        if indexes is None:
+            self.update_calculations()
+        else:
+            self.recompute_dirty()
         
     def get_data(self):
-        return self.tree.get_all_data()
+        return self.current_table().to_rows()
+        
+    def get_export_data(self):
+        return self.current_table().to_values()
         
     def set_data(self, data):
-        self.tree.set_all_data(data)
\ No newline at end of file
+        self.discard_changes()
+        self.cancel_calculations()
+        self.table.load_values(data)
+        self.refresh_view()
+        self.link_dependencies()
@@ -5,7 +5,8 @@
 import tkinter as tk
 from tkinter import ttk
 from .base_tab import BaseTab
-from functions import calculate_lit_per_sec
+from models.calculation_data import PlatformTable
+from models.dependency_graph import BALANCE
 
 
 class PlatformsTab(BaseTab):
@@ -50,6 +51,8 @@ class PlatformsTab(BaseTab):
             self.tree.heading(col, text=headings[col])
             self.tree.column(col, width=widths[col], anchor=tk.CENTER)
 
+        self.bind_view(self.tree, PlatformTable())
+
         scroll_y.config(command=self.tree.yview)
         scroll_x.config(command=self.tree.xview)
 
@@ -57,77 +60,61 @@ class PlatformsTab(BaseTab):
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
-
-        # Кнопки
-        btn_frame = ttk.Frame(self.frame)
-        btn_frame.pack(fill=tk.X, padx=5, pady=5)
-
-        ttk.Button(
-            btn_frame, 
-            text="Обновить данные", 
-            command=self.update_data
-        ).pack(side=tk.RIGHT, padx=5)
         
-    def get_balance_data(self):
-        """Получение данных из вкладки баланса"""
+    def get_balance_table(self):
+        """Таблица данных вкладки баланса"""
         balance_tab = self.app.main_window.balance_tab
         if balance_tab:
-            return balance_tab.get_data()
-        return []
+            return balance_tab.table
+        return None
         
     def update_data(self):
         """Обновление данных из баланса"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        balance = self.get_balance_table()
+        if balance is None:
+            return
+        self.table.rebuild(balance, self.app.main_window.dependencies)
+        self.refresh_view()
+        
+        # Нумерация площадок могла измениться - участки пересчитываются полностью
+        self.app.main_window.changes.publish(self)
         
-        balance_data = self.get_balance_data()
-        if not balance_data:
+    def balance_changed(self, indexes):
+        """Пересчет только тех площадок и участков, которые зависят от строк баланса"""
+        balance = self.get_balance_table()
+        graph = self.app.main_window.dependencies
+        if balance is None:
             return
-
-        # Группируем данные по площадкам
-        platforms = {}
-        for values in balance_data:
-            try:
-                if len(values) >= 8:
-                    q_day = float(values[5]) if values[5] else 0.0  # Общий расход
-                    percent = float(values[6]) if values[6] else 0.0  # %
-                    platform = values[2]  # № пл.
-                    name = values[4]  # Наименование
-                    
-                    if platform not in platforms:
-                        platforms[platform] = {
-                            "names": [],
-                            "total_q_day": 0.0,
-                            "total_percent": 0.0
-                        }
-                    platforms[platform]["names"].append(name)
-                    platforms[platform]["total_q_day"] += q_day
-                    platforms[platform]["total_percent"] += percent
-            except (ValueError, IndexError):
-                continue
-
-        # Сортируем площадки
-        platforms = dict(sorted(platforms.items()))
+        if not self.table.move_rows(balance, graph, indexes):
+            self.update_data()
+            return
+        
+        graph.mark_dirty(*((BALANCE, index) for index in indexes))
+        changed = self.table.recompute_dirty(balance, graph)
+        self.refresh_rows(changed)
         
-        # Добавляем данные в таблицу
-        for i, (platform, data) in enumerate(platforms.items(), start=1):
-            q_sec = data["total_q_day"] / 86.4
-            q_lit_per_sec, k = calculate_lit_per_sec(data["total_q_day"])
-            
-            self.tree.insert("", tk.END, values=(
-                i,  # №
-                f"{' + '.join(data['names'])}",  # Наименование
-                f"{data['total_q_day']:.2f}",  # Среднесуточный расход
-                f"{q_sec:.2f}", # Средне-секундный расход
-                f"{k:.2f}",  # Коэффициент неравномерности
-                f"{q_lit_per_sec:.2f}"  # Секундный расход
-            ))
+        # Зависящие участки помечены в графе
+        if changed:
+            self.app.main_window.changes.publish(self, changed)
+        
+    def source_changed(self, indexes):
+        """Обновление по изменениям баланса"""
+        if indexes is None:
+            self.update_data()
+        else:
+            self.balance_changed(sorted(indexes))
+        
+    def platform_flows(self):
+        """Среднесуточные расходы площадок по обозначениям "п.N", м3/сут"""
+        self.update_if_stale()
+        return self.table.flows()
         
     def get_data(self):
-        return [self.tree.item(item, 'values') for item in self.tree.get_children()]
+        return self.current_table().to_rows()
+        
+    def get_export_data(self):
+        return self.current_table().to_values()
         
     def set_data(self, data):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for row in data:
-            self.tree.insert("", tk.END, values=row)
\ No newline at end of file
+        self.table.load_values(data)
+        self.refresh_view()
\ No newline at end of file
@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import ttk
 from ui.dialogs.cell_editor import CellEditor
 from ui.dialogs.selection_dialog import SelectionDialog
+from functions import SLOPES
 
 class ColumnContextMenu:
     def __init__(self, app, tree):
@@ -65,8 +66,7 @@ class ColumnContextMenu:
         
         # Меню для столбца "Уклон" в таблице пропускной способности
         self.slope_menu = tk.Menu(self.app.root, tearoff=0)
-        slopes = ["0.001", "0.002", "0.003", "0.004", "0.005", "0.006", "0.007", "0.008", "0.009", "0.01"]
-        for slope in slopes:
+        for slope in SLOPES:
             self.slope_menu.add_command(
                 label=slope, 
                 command=lambda s=slope: self.set_cell_value(s)
@@ -166,9 +166,16 @@ class ColumnContextMenu:
         """Установка значения в выбранную ячейку"""
         if self.selected_cell:
             row, column = self.selected_cell
+            col_idx = int(column[1:]) - 1
+            
+            # Таблица с моделью данных: изменение и пересчет выполняет вкладка
+            tab = getattr(self.tree, 'tab', None)
+            if tab is not None:
+                tab.set_cell(row, col_idx, value)
+                return
+            
             item = self.tree.item(row)
             values = list(item['values'])
-            col_idx = int(column[1:]) - 1
             
             # Убеждаемся, что values достаточно длинный
             while len(values) <= col_idx:
@@ -176,58 +183,6 @@ class ColumnContextMenu:
                 
             values[col_idx] = value
             self.tree.item(row, values=values)
-            
-            # Обновляем связанные расчеты
-            self.update_related_calculations(row, column, value)
-            
-    def update_related_calculations(self, row, column, value):
-        """Обновление связанных расчетов при изменении ячейки"""
-        # Если изменились данные в балансе, обновляем связанные таблицы
-        if hasattr(self.tree, 'master') and hasattr(self.tree.master, '__class__'):
-            tab_class = self.tree.master.__class__.__name__
-            
-            if tab_class == 'BalanceTab':
-                self.update_balance_calculations(row, column, value)
-            elif tab_class == 'CapacityTab':
-                self.update_capacity_calculations(row, column, value)
-                
-    def update_balance_calculations(self, row, column, value):
-        """Обновление расчетов в балансе"""
-        item = self.tree.item(row)
-        values = list(item['values'])
-        col_idx = int(column[1:]) - 1
-        
-        # Если изменились q_day или percent_q, пересчитываем percent_result
-        if col_idx in (5, 6):  # Индексы q_day и percent_q
-            try:
-                q_day = float(values[5]) if values[5] else 0
-                percent = float(values[6]) if values[6] else 0
-                values[7] = f"{q_day * percent / 100:.2f}"
-                self.tree.item(row, values=values)
-            except (ValueError, IndexError):
-                pass
-                
-    def update_capacity_calculations(self, row, column, value):
-        """Обновление расчетов в таблице пропускной способности"""
-        item = self.tree.item(row)
-        values = list(item['values'])
-        col_idx = int(column[1:]) - 1
-        
-        # Если изменился диаметр или уклон, пересчитываем наполнение и скорость
-        if col_idx in (7, 8) and values[6]:  # diametr, i_uklon
-            try:
-                from functions import filling_speed
-                d = float(values[7]) if values[7] else 0
-                i = float(values[8]) if values[8] else 0
-                q_calc = float(values[6]) if values[6] else 0
-                
-                if d > 0 and i > 0 and q_calc > 0:
-                    h_d_relative, v_final = filling_speed(Q=q_calc, d=d, i=i, n=0.014)
-                    values[9] = f"{h_d_relative:.2f}"
-                    values[10] = f"{v_final:.2f}"
-                    self.tree.item(row, values=values)
-            except (ValueError, IndexError):
-                pass
                 
     def edit_selected_cell(self):
         """Редактирование выбранной ячейки"""
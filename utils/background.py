@@ -0,0 +1,105 @@
+"""
+Расчеты в рабочем потоке
+
+Функция work выполняется в отдельном потоке и передает результаты
+через job.post(...). Главный поток Tk забирает их из очереди по
+таймеру root.after и передает в on_result порциями, поэтому окно
+продолжает обрабатывать события во время расчета. Отмена - флаг,
+который work проверяет между порциями (job.cancelled).
+"""
+
+import queue
+import threading
+import traceback
+
+POLL_INTERVAL = 50  # Период опроса очереди, мс
+POLL_BATCH = 20     # Максимум результатов, передаваемых за один опрос
+
+
+class BackgroundJob:
+    def __init__(self, root, work, on_result, on_progress=None, on_done=None,
+                 interval=POLL_INTERVAL, batch=POLL_BATCH):
+        """
+        work(job) - расчет в рабочем потоке;
+        on_result(item) - обработка результата в потоке Tk;
+        on_progress(done, total) - ход расчета в потоке Tk;
+        on_done(job) - завершение (job.cancelled, job.error) в потоке Tk.
+        """
+        self.root = root
+        self.work = work
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.interval = interval
+        self.batch = batch
+        self.error = None
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._thread = None
+        self._progress = None
+        self._active = False
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def running(self):
+        """Расчет еще не завершен (on_done не вызван)"""
+        return self._active
+
+    def start(self):
+        self._active = True
+        self._thread = threading.Thread(target=self._run, name="background-job", daemon=True)
+        self._thread.start()
+        self.root.after(self.interval, self._poll)
+        return self
+
+    def cancel(self):
+        """Запрос отмены; уже полученные результаты остаются примененными"""
+        self._cancel.set()
+
+    # Методы для рабочего потока
+
+    def post(self, item):
+        """Передача результата в поток Tk"""
+        self._queue.put(item)
+
+    def progress(self, done, total):
+        """Ход расчета (передается последнее значение)"""
+        self._progress = (done, total)
+
+    def _run(self):
+        try:
+            self.work(self)
+        except Exception as e:
+            self.error = e
+            traceback.print_exc()
+        finally:
+            self._finished.set()
+
+    # Главный поток
+
+    def _poll(self):
+        finished = self._finished.is_set()  # До разбора очереди: после него результатов не будет
+        for _ in range(self.batch):
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not self.cancelled:
+                self.on_result(item)
+        else:
+            finished = False  # В очереди могли остаться результаты
+
+        if self.on_progress is not None and self._progress is not None:
+            self.on_progress(*self._progress)
+
+        if finished and self._queue.empty():
+            self._active = False
+            self._thread = None
+            if self.on_done is not None:
+                self.on_done(self)
+            return
+        self.root.after(self.interval, self._poll)
@@ -2,56 +2,69 @@
 Дополнительные расчетные функции
 """
 
-from functions import filling_speed, calculate_lit_per_sec
+from functions import calculate_lit_per_sec
+from utils.solver_cache import solver_cache
+from models.balance_record import BalanceTable
+from models.calculation_data import CapacityTable
+from models.rollup import rollup
 
 def calculate_platform_totals(balance_data):
     """Расчет суммарных данных по площадкам"""
-    platforms = {}
+    balance = BalanceTable()
+    balance.load_values(item for item in balance_data if len(item) >= 8)
+    names = balance.column('name')
     
-    for item in balance_data:
-        if len(item) >= 8:
-            platform = item[2]  # № пл.
-            name = item[4]      # Наименование
-            q_day = float(item[5]) if item[5] else 0.0
-            percent = float(item[6]) if item[6] else 0.0
-            
-            if platform not in platforms:
-                platforms[platform] = {
-                    "names": [],
-                    "total_q_day": 0.0,
-                    "total_percent": 0.0
-                }
-                
-            platforms[platform]["names"].append(name)
-            platforms[platform]["total_q_day"] += q_day
-            platforms[platform]["total_percent"] += percent
-            
+    platforms = {}
+    for group in rollup(balance, 'number_platform', values=('q_day', 'percent_q')):
+        platforms[group.key[0]] = {
+            "names": [names[row] for row in group.rows],
+            "total_q_day": group.totals[0],
+            "total_percent": group.totals[1]
+        }
     return platforms
 
-def update_capacity_calculations(values):
-    """Обновление расчетов для таблицы пропускной способности"""
-    try:
-        if len(values) >= 7:
-            # Расчет средне-секундного расхода
-            q_day = float(values[3]) if values[3] else 0
-            q_sec = q_day / 86.4
-            values[4] = f"{q_sec:.2f}"
-            
-            # Расчет коэффициента неравномерности
-            q_lit_per_sec, k = calculate_lit_per_sec(q_day)
-            values[5] = f"{k:.2f}"
-            values[6] = f"{q_sec * k:.2f}"
-            
-            # Расчет наполнения и скорости если есть диаметр и уклон
-            if len(values) > 8 and values[7] and values[8]:
-                d = float(values[7])
-                i = float(values[8])
-                q_calc = float(values[6])
-                h_d_relative, v_final = filling_speed(Q=q_calc, d=d, i=i, n=0.014)
-                values[9] = f"{h_d_relative:.2f}"
-                values[10] = f"{v_final:.2f}"
+def update_capacity_calculations(values, n=CapacityTable.N):
+    """Обновление расчетов для строки таблицы пропускной способности (см. update_capacity_rows)"""
+    return update_capacity_rows([values], n)[0]
+
+def update_capacity_rows(rows, n=CapacityTable.N):
+    """
+    Обновление расчетов для строк таблицы пропускной способности.
+
+    Промежуточные значения не перечитываются из строк: расчетный расход
+    передается в гидравлический расчет с полной точностью, округление
+    выполняется только при записи результата. Наполнение и скорость всех
+    строк с диаметром и уклоном рассчитываются одним пакетом
+    (solver_cache.filling_speed_batch); n - шероховатость, как в
+    CapacityTable.
+    """
+    to_solve = []
+    for values in rows:
+        try:
+            if len(values) >= 7:
+                # Расчет средне-секундного расхода
+                q_day = float(values[3]) if values[3] else 0
+                q_sec = q_day / 86.4
+                values[4] = f"{q_sec:.2f}"
                 
-    except (ValueError, IndexError, ZeroDivisionError):
-        pass
+                # Расчет коэффициента неравномерности
+                q_lit_per_sec, k = calculate_lit_per_sec(q_day)
+                q_calc = q_sec * k
+                values[5] = f"{k:.2f}"
+                values[6] = f"{q_calc:.2f}"
+                
+                # Наполнение и скорость - если есть диаметр и уклон
+                if len(values) > 10 and values[7] and values[8]:
+                    to_solve.append((values, q_calc, float(values[7]), float(values[8])))
+                    
+        except (ValueError, IndexError, ZeroDivisionError):
+            pass
+            
+    if to_solve:
+        solve_rows, Q, d, i = zip(*to_solve)
+        h_d, v, converged = solver_cache.filling_speed_batch(Q=list(Q), d=list(d), i=list(i), n=n)
+        for values, h_d_relative, v_final in zip(solve_rows, h_d, v):
+            values[9] = f"{h_d_relative:.2f}"
+            values[10] = f"{v_final:.2f}"
         
-    return values
\ No newline at end of file
+    return rows
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Индекс пропускной способности каталожных труб
+
+Для каждого сочетания диаметра из DIAMETR, стандартного уклона из
+SLOPES и шероховатости из MATERIAL хранятся расход и скорость при
+полном заполнении, максимальный расход и наполнение, при котором он
+достигается. Индекс сохраняется в data/templates/capacity_index.json
+вместе с подписью каталога и перестраивается, если каталог или версия
+решателя изменились.
+
+Строки с расходом не меньше максимального можно отбросить одним
+обращением к индексу, не выполняя итерационный расчет; для остальных
+корень ищется только на возрастающей ветви до наполнения h_d_max.
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass
+
+from functions import (DIAMETR, SLOPES, MATERIAL, SOLVER_VERSION,
+                       full_flow, peak_flow, solve_filling)
+from utils.file_operations import save_json, load_json
+
+TEMPLATES_FOLDER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data", "templates"
+)
+INDEX_FILE = os.path.join(TEMPLATES_FOLDER, "capacity_index.json")
+
+
+@dataclass
+class CapacityEntry:
+    """Пропускная способность трубы"""
+    q_full: float       # Расход при полном заполнении, л/с
+    v_full: float       # Скорость при полном заполнении, м/с
+    q_max: float        # Максимальный расход, л/с
+    h_d_max: float      # Наполнение при максимальном расходе
+
+
+def _key(d, i, n):
+    # Округление умножением (как utils.solver_cache.quantize): round(x, k) заметно медленнее
+    return (round(float(d) * 10) / 10, round(float(i) * 1e6) / 1e6, round(float(n) * 1e4) / 1e4)
+
+
+def catalogue_signature():
+    """Подпись каталога и версии решателя"""
+    catalogue = json.dumps([DIAMETR, SLOPES, MATERIAL, SOLVER_VERSION],
+                           sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(catalogue.encode('utf-8')).hexdigest()
+
+
+def catalogue_combinations():
+    """Все сочетания (диаметр, уклон, шероховатость) каталога"""
+    diameters = sorted({float(d) for values in DIAMETR.values() for d in values})
+    slopes = [float(i) for i in SLOPES]
+    roughness = sorted(set(MATERIAL.values()))
+    return [(d, i, n) for d in diameters for i in slopes for n in roughness]
+
+
+def compute_entry(d, i, n):
+    """Расчет пропускной способности одной трубы"""
+    q_full = full_flow(d, i, n)
+    q_max, h_d_max = peak_flow(d, i, n)
+    v_full = q_full / 1000 / (math.pi / 4 * (d / 1000)**2)
+    return CapacityEntry(q_full, v_full, q_max, h_d_max)
+
+
+class CapacityIndex:
+    def __init__(self, file_path=INDEX_FILE):
+        self.file_path = file_path
+        self._entries = None  # ключ -> CapacityEntry; загружается при первом обращении
+
+    def _load(self):
+        signature = catalogue_signature()
+        data = load_json(self.file_path) if os.path.exists(self.file_path) else None
+        if data and data.get('signature') == signature:
+            self._entries = {
+                _key(d, i, n): CapacityEntry(q_full, v_full, q_max, h_d_max)
+                for d, i, n, q_full, v_full, q_max, h_d_max in data['entries']
+            }
+            return
+        self.rebuild(signature)
+
+    def rebuild(self, signature=None):
+        """Пересчет индекса по каталогу и сохранение в файл"""
+        print("Построение индекса пропускной способности труб...")
+        self._entries = {}
+        rows = []
+        for d, i, n in catalogue_combinations():
+            entry = compute_entry(d, i, n)
+            self._entries[_key(d, i, n)] = entry
+            rows.append([d, i, n, entry.q_full, entry.v_full, entry.q_max, entry.h_d_max])
+        save_json({
+            'signature': signature or catalogue_signature(),
+            'solver_version': SOLVER_VERSION,
+            'entries': rows
+        }, self.file_path, indent=None)
+
+    def lookup(self, d, i, n):
+        """
+        Пропускная способность трубы.
+
+        Сочетания вне каталога рассчитываются при первом обращении и
+        запоминаются без сохранения в файл. Для некорректных данных - None.
+        """
+        if self._entries is None:
+            self._load()
+        try:
+            key = _key(d, i, n)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            try:
+                entry = compute_entry(*key)
+            except (ValueError, ZeroDivisionError, OverflowError):
+                return None
+            self._entries[key] = entry
+        return entry
+
+    def is_overloaded(self, Q, d, i, n):
+        """Превышает ли расход Q (л/с) максимальную пропускную способность"""
+        entry = self.lookup(d, i, n)
+        return entry is not None and Q >= entry.q_max
+
+    def solve(self, Q, d, i, n):
+        """solve_filling с максимальным расходом из индекса (FillingResult)"""
+        entry = self.lookup(d, i, n)
+        if entry is None:
+            return solve_filling(Q, d, i, n)
+        return solve_filling(Q, d, i, n, q_max=entry.q_max, h_d_max=entry.h_d_max)
+
+    def __len__(self):
+        if self._entries is None:
+            self._load()
+        return len(self._entries)
+
+
+# Общий индекс для всего приложения
+capacity_index = CapacityIndex()
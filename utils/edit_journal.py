@@ -0,0 +1,91 @@
+"""
+Журнал правок проекта
+
+Правки таблиц вкладок (изменение ячейки, вставка и удаление строк)
+дописываются в файл рядом с файлом проекта (<проект>.journal) сразу
+после внесения: одна строка JSON на правку, запись завершается fsync.
+При сохранении проекта и штатном выходе журнал удаляется, поэтому
+журнал, найденный при открытии проекта, означает аварийное завершение:
+правки повторяются поверх сохраненного проекта.
+
+Первая строка журнала - заголовок с временем сохранения файла проекта,
+к которому относятся правки; журнал от другой версии файла не
+применяется. Неполная последняя строка (сбой во время записи)
+отбрасывается.
+"""
+
+import json
+import os
+
+from utils.file_operations import atomic_write
+
+JOURNAL_EXTENSION = ".journal"
+
+
+def journal_path(project_path):
+    """Файл журнала для файла проекта"""
+    return project_path + JOURNAL_EXTENSION
+
+
+def _line(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+
+def read_journal(file_path):
+    """
+    Чтение журнала: (время сохранения проекта, правки).
+
+    Если журнала нет или заголовок поврежден - (None, []).
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return None, []
+    try:
+        saved = json.loads(lines[0])["saved"]
+    except (ValueError, KeyError, TypeError):
+        return None, []
+    edits = []
+    for line in lines[1:]:
+        try:
+            edits.append(json.loads(line))
+        except ValueError:
+            break  # Последняя строка записана не полностью
+    return saved, edits
+
+
+class EditJournal:
+    def __init__(self, file_path, saved, edits=()):
+        """
+        Новый журнал для проекта, сохраненного в saved.
+
+        edits - уже примененные правки (после восстановления): файл
+        переписывается с ними без неполной последней строки.
+        """
+        self.file_path = file_path
+        self.saved = saved
+        with atomic_write(file_path, 'w', encoding='utf-8') as f:
+            f.write(_line({"saved": saved}))
+            for edit in edits:
+                f.write(_line(edit))
+        self._file = open(file_path, 'a', encoding='utf-8')
+
+    def append(self, edits):
+        """Запись правок одним обращением к диску"""
+        self._file.write("".join(_line(edit) for edit in edits))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Закрытие и удаление журнала (правки сохранены в проекте или отклонены)"""
+        self.close()
+        try:
+            os.remove(self.file_path)
+        except FileNotFoundError:
+            pass
@@ -88,7 +88,7 @@ class WordExporter:
         """Добавление раздела основных расчетов"""
         doc.add_heading('1. Основные гидравлические расчеты', level=1)
         
-        calculations_data = self.app.main_window.calculations_tab.get_data()
+        calculations_data = self.app.main_window.calculations_tab.get_export_data()
         
         if calculations_data.get('results') and calculations_data['results'] != "Результаты расчета появятся здесь...":
             doc.add_paragraph("Результаты расчетов:")
@@ -101,7 +101,7 @@ class WordExporter:
         """Добавление раздела баланса"""
         doc.add_heading('2. Баланс водопотребления и водоотведения', level=1)
         
-        balance_data = self.app.main_window.balance_tab.get_data()
+        balance_data = self.app.main_window.balance_tab.get_export_data()
         if not balance_data:
             doc.add_paragraph("Данные отсутствуют")
             return
@@ -135,7 +135,7 @@ class WordExporter:
         """Добавление раздела таблицы площадок"""
         doc.add_heading('3. Таблица площадок', level=1)
         
-        platforms_data = self.app.main_window.platforms_tab.get_data()
+        platforms_data = self.app.main_window.platforms_tab.get_export_data()
         if not platforms_data:
             doc.add_paragraph("Данные отсутствуют")
             return
@@ -171,7 +171,7 @@ class WordExporter:
         """Добавление раздела этапов строительства"""
         doc.add_heading('4. Этапы строительства', level=1)
         
-        construction_data = self.app.main_window.construction_tab.get_data()
+        construction_data = self.app.main_window.construction_tab.get_export_data()
         if not construction_data:
             doc.add_paragraph("Данные отсутствуют")
             return
@@ -205,7 +205,7 @@ class WordExporter:
         """Добавление раздела проверки пропускной способности"""
         doc.add_heading('5. Проверка пропускной способности', level=1)
         
-        capacity_data = self.app.main_window.capacity_tab.get_data()
+        capacity_data = self.app.main_window.capacity_tab.get_export_data()
         if not capacity_data:
             doc.add_paragraph("Данные отсутствуют")
             return
@@ -4,8 +4,15 @@
 
 import json
 import os
+import stat
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 
+# Маска прав процесса: mkstemp создает файл с правами 0600, новый файл получает обычные права
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 def ensure_directory_exists(path):
     """Проверка существования директории и создание если нужно"""
     try:
@@ -17,16 +24,47 @@ def ensure_directory_exists(path):
         print(f"Ошибка создания директории {path}: {e}")
         return False
 
-def save_json(data, file_path, indent=4):
-    """Сохранение данных в JSON файл"""
+@contextmanager
+def atomic_write(file_path, mode='w', encoding=None):
+    """
+    Запись файла через временный файл в той же папке.
+
+    Файл заменяется (os.replace) только после успешной записи и сброса
+    на диск, поэтому сбой во время записи не портит прежний файл. Права
+    прежнего файла сохраняются.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    try:
+        permissions = stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        permissions = 0o666 & ~_UMASK
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(file_path) + '.',
+                                     suffix='.tmp')
+    try:
+        os.chmod(temp_path, permissions)
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def save_json(data, file_path, indent=4, quiet=False):
+    """Сохранение данных в JSON файл (атомарно, через atomic_write; quiet - без сообщения об успехе)"""
     try:
         # Создаем директорию если ее нет
         directory = os.path.dirname(file_path)
         ensure_directory_exists(directory)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with atomic_write(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=indent, default=str)
-        print(f"Файл сохранен: {file_path}")
+        if not quiet:
+            print(f"Файл сохранен: {file_path}")
         return True
     except Exception as e:
         print(f"Ошибка сохранения файла {file_path}: {e}")
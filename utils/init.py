@@ -4,11 +4,12 @@
 
 from .validators import validate_float, validate_integer, validate_percentage, validate_positive_float
 from .file_operations import ensure_directory_exists, save_json, load_json, get_file_modified_time, file_exists
-from .calculations import calculate_platform_totals, update_capacity_calculations
+from .calculations import calculate_platform_totals, update_capacity_calculations, update_capacity_rows
 from .exporters import WordExporter
 
 __all__ = [
     'validate_float', 'validate_integer', 'validate_percentage', 'validate_positive_float',
     'ensure_directory_exists', 'save_json', 'load_json', 'get_file_modified_time', 'file_exists',
-    'calculate_platform_totals', 'update_capacity_calculations', 'WordExporter'
+    'calculate_platform_totals', 'update_capacity_calculations', 'update_capacity_rows',
+    'WordExporter'
 ]
\ No newline at end of file
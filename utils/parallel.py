@@ -0,0 +1,156 @@
+"""
+Расчет наполнения и скорости в нескольких процессах
+
+Большие пакеты делятся на порции, которые считаются в пуле процессов
+(ProcessPoolExecutor). Столбцы порции передаются упакованными в байты
+массивами double, результаты возвращаются так же, поэтому pickle
+передает несколько больших bytes вместо списков чисел. Небольшие пакеты
+и расчет на одноядерной машине выполняются в текущем процессе.
+
+Процессы пула запускаются заново (spawn), а не копированием текущего
+процесса (fork): пул создается при первом большом расчете, в том числе
+из рабочего потока (utils.background), а копия процесса с работающими
+потоками Tk может зависнуть на блокировках, захваченных этими потоками.
+
+Запуск пула (около 250 мс до готовности процессов) дольше расчета
+200 тыс. строк в текущем процессе, поэтому пакет считается в пуле
+только после того, как пул запущен: первый большой пакет считается в
+текущем процессе и запускает пул в фоне (start_pool) для следующих.
+"""
+
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from functions import filling_speed_batch as solve_batch, HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+# С этого количества строк расчет распределяется по запущенному пулу: передача
+# столбцов добавляет около 0,25 мкс на строку и несколько мс на пакет при расчете
+# около 1 мкс на строку в текущем процессе
+PARALLEL_ROWS = 20000
+CHUNK_ROWS = 5000      # Строк в одной порции
+
+_executor = None
+_executor_workers = 0
+_started = None  # Пробная задача пула (Future): выполнена - процессы готовы
+
+
+def worker_count():
+    """Количество процессов по умолчанию - число ядер"""
+    return os.cpu_count() or 1
+
+
+def get_executor(workers):
+    """Общий пул процессов (создается при первом обращении)"""
+    global _executor, _executor_workers, _started
+    if _executor is None or _executor_workers != workers:
+        shutdown()
+        _executor = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        _executor_workers = workers
+        _started = _executor.submit(int)
+    return _executor
+
+
+def start_pool(workers=None):
+    """
+    Запуск пула без ожидания готовности процессов.
+
+    Возвращает Future пробной задачи (None, если пул не нужен - одно ядро).
+    """
+    workers = worker_count() if workers is None else workers
+    if workers <= 1:
+        return None
+    get_executor(workers)
+    return _started
+
+
+def pool_ready(workers=None):
+    """Пул запущен и его процессы готовы к расчету"""
+    workers = worker_count() if workers is None else workers
+    return (_executor is not None and _executor_workers == workers
+            and _started is not None and _started.done())
+
+
+def shutdown():
+    """Остановка пула процессов"""
+    global _executor, _executor_workers, _started
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_workers = 0
+    _started = None
+
+
+def _pack(values):
+    if HAS_NUMPY:
+        return np.asarray(values, dtype=float).tobytes()
+    return array('d', values).tobytes()
+
+
+def _unpack(data):
+    if HAS_NUMPY:
+        return np.frombuffer(data, dtype=float)
+    values = array('d')
+    values.frombytes(data)
+    return values
+
+
+def _solve_chunk(payload):
+    """Расчет порции в процессе пула: упакованные столбцы -> упакованные результаты"""
+    Q, d, i, n, q_max, h_d_max = (_unpack(column) for column in payload)
+    h_d, v, converged = solve_batch(Q, d, i, n, q_max=q_max, h_d_max=h_d_max)
+    return _pack(h_d), _pack(v), bytes(bool(value) for value in converged)
+
+
+def _columns(size, *columns):
+    """Столбцы одинаковой длины (числа размножаются, None - nan)"""
+    result = []
+    for column in columns:
+        if column is None:
+            column = float('nan')
+        if hasattr(column, '__len__'):
+            result.append(column if HAS_NUMPY else list(column))
+        else:
+            result.append([column] * size)
+    return result
+
+
+def filling_speed_batch(Q, d, i, n, q_max=None, h_d_max=None, workers=None):
+    """
+    functions.filling_speed_batch с автоматическим выбором режима.
+
+    Пакеты меньше PARALLEL_ROWS строк и расчет при workers=1 выполняются
+    в текущем процессе, остальные - порциями по CHUNK_ROWS в пуле. Пока
+    пул не готов, пакет считается в текущем процессе, а пул запускается
+    в фоне.
+    """
+    size = max(len(x) if hasattr(x, '__len__') else 1 for x in (Q, d, i, n))
+    workers = worker_count() if workers is None else workers
+    if workers <= 1 or size < PARALLEL_ROWS:
+        return solve_batch(Q, d, i, n, q_max=q_max, h_d_max=h_d_max)
+    if not pool_ready(workers):
+        start_pool(workers)
+        return solve_batch(Q, d, i, n, q_max=q_max, h_d_max=h_d_max)
+
+    columns = _columns(size, Q, d, i, n, q_max, h_d_max)
+    if HAS_NUMPY:
+        columns = [np.asarray(column, dtype=float) for column in columns]
+    chunks = [tuple(_pack(column[start:start + CHUNK_ROWS]) for column in columns)
+              for start in range(0, size, CHUNK_ROWS)]
+    results = list(get_executor(workers).map(_solve_chunk, chunks))
+
+    if HAS_NUMPY:
+        return (np.concatenate([_unpack(h_d) for h_d, v, converged in results]),
+                np.concatenate([_unpack(v) for h_d, v, converged in results]),
+                np.concatenate([np.frombuffer(converged, dtype=bool) for h_d, v, converged in results]))
+    h_d, v, converged = [], [], []
+    for h_d_chunk, v_chunk, converged_chunk in results:
+        h_d.extend(_unpack(h_d_chunk))
+        v.extend(_unpack(v_chunk))
+        converged.extend(bool(value) for value in converged_chunk)
+    return h_d, v, converged
@@ -0,0 +1,40 @@
+"""
+Геометрия частично заполненной круглой трубы
+
+Все величины безразмерные: наполнение h/d, центральный угол θ,
+площадь живого сечения ω/d² и гидравлический радиус R/d. Расчет
+точный: решатель наполнения вычисляет Q(h) в нескольких точках на
+строку, и интерполяция по таблице не дает выигрыша по сравнению с
+acos/sin, но добавляет погрешность. Ускорение на порядок по сравнению
+с исходной бисекцией дает только пакетный расчет (partial_fill_array в
+functions.filling_speed_batch); расчет одной трубы (exact_partial_fill)
+быстрее исходного примерно в 1,1 раза, при равной точности - в 3 раза
+(benchmarks/bench_filling_speed).
+"""
+
+import math
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def exact_partial_fill(h_d):
+    """Точный расчет (θ, ω/d², R/d) для наполнения h/d"""
+    theta = 2 * math.acos(1 - 2 * h_d)
+    area = (theta - math.sin(theta)) / 8
+    radius = area / (theta / 2) if theta > 0 else 0.0
+    return theta, area, radius
+
+
+if HAS_NUMPY:
+    def partial_fill_array(h_d):
+        """Расчет (θ, ω/d², R/d) для массива наполнений"""
+        h_d = np.asarray(h_d, dtype=float)
+        theta = 2 * np.arccos(1 - 2 * h_d)
+        area = (theta - np.sin(theta)) / 8
+        with np.errstate(divide='ignore', invalid='ignore'):
+            radius = np.where(theta > 0, area / (theta / 2), 0.0)
+        return theta, area, radius
@@ -0,0 +1,191 @@
+"""
+Подбор диаметра и уклона трубы по расчетному расходу
+
+Варианты перебираются из каталога DIAMETR и стандартных уклонов SLOPES
+в порядке стоимости: сначала меньший диаметр, затем меньший уклон.
+Вариант подходит, если наполнение не превышает допустимого, а скорость
+лежит между минимальной и максимальной (СП 32.13330, бытовые стоки).
+
+При допустимых наполнениях (h/d ≤ 0.8) расход и скорость возрастают
+с ростом h/d, поэтому для каждого варианта ограничения заранее
+сводятся к диапазону расходов. Подбор для всей таблицы - сравнение
+расходов с диапазонами, наполнение и скорость затем считаются одним
+пакетом только для выбранных вариантов.
+"""
+
+from dataclasses import dataclass
+
+from functions import DIAMETR, SLOPES, HAS_NUMPY, partial_flow
+from utils import pipe_geometry as geometry
+from utils.parallel import filling_speed_batch
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+# Наибольшее допустимое наполнение: (диаметр до, мм; h/d)
+FILLING_LIMITS = [(250, 0.6), (400, 0.7), (900, 0.75), (float('inf'), 0.8)]
+
+# Минимальная скорость: (диаметр до, мм; м/с)
+MIN_VELOCITIES = [(250, 0.7), (400, 0.8), (500, 0.9), (800, 1.0), (1200, 1.15), (float('inf'), 1.3)]
+
+# Максимальная скорость, м/с: металлические трубы 8, неметаллические 4
+MAX_VELOCITIES = {"Сталь": 8.0, "Чугун": 8.0}
+DEFAULT_MAX_VELOCITY = 4.0
+
+
+@dataclass
+class SizingOption:
+    """Подходящий вариант трубы"""
+    diameter: float     # Диаметр, мм
+    slope: float        # Уклон
+    h_d: float          # Наполнение h/d
+    velocity: float     # Скорость, м/с
+
+
+def _by_diameter(limits, d):
+    for max_d, value in limits:
+        if d <= max_d:
+            return value
+    return limits[-1][1]
+
+
+def filling_limit(d):
+    """Наибольшее допустимое наполнение для диаметра d, мм"""
+    return _by_diameter(FILLING_LIMITS, d)
+
+
+def min_velocity(d):
+    """Минимальная скорость для диаметра d, мм"""
+    return _by_diameter(MIN_VELOCITIES, d)
+
+
+def catalogue_diameters(material=None):
+    """Диаметры каталога для материала (или всех материалов), по возрастанию"""
+    if material in DIAMETR:
+        values = DIAMETR[material]
+    else:
+        values = [d for diameters in DIAMETR.values() for d in diameters]
+    return sorted({float(d) for d in values})
+
+
+def _velocity(h_d, d, i, n):
+    """Скорость при наполнении h/d, м/с"""
+    area = geometry.exact_partial_fill(h_d)[1] * (d / 1000)**2
+    return partial_flow(h_d, d, i, n) / 1000 / area
+
+
+def _h_d_for_velocity(v, d, i, n, h_max, iterations=50):
+    """Наполнение (до h_max), при котором скорость равна v; бисекция"""
+    lo, hi = 0.0, h_max
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        if _velocity(mid, d, i, n) < v:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def flow_window(d, i, n, v_max):
+    """
+    Диапазон расходов (л/с), при которых труба удовлетворяет ограничениям.
+
+    Ниже допустимого наполнения расход и скорость возрастают с h/d,
+    поэтому ограничения сводятся к Q_min ≤ Q ≤ Q_max. Если диапазон
+    пуст, возвращается (inf, 0).
+    """
+    h_max = filling_limit(d)
+    v_min = min_velocity(d)
+    if _velocity(h_max, d, i, n) < v_min:
+        return float('inf'), 0.0
+    q_min = partial_flow(_h_d_for_velocity(v_min, d, i, n, h_max), d, i, n)
+    if _velocity(h_max, d, i, n) > v_max:
+        h_max = _h_d_for_velocity(v_max, d, i, n, h_max)
+    return q_min, partial_flow(h_max, d, i, n)
+
+
+class PipeSizer:
+    def __init__(self, material=None, n=0.014, slopes=SLOPES, max_velocity=None):
+        self.material = material
+        self.n = n
+        if max_velocity is None:
+            max_velocity = MAX_VELOCITIES.get(material, DEFAULT_MAX_VELOCITY)
+        self.max_velocity = max_velocity
+
+        # Варианты в порядке стоимости и допустимые для них расходы
+        slopes = sorted(float(i) for i in slopes)
+        self.candidates = [(d, i) for d in catalogue_diameters(material) for i in slopes]
+        windows = [flow_window(d, i, n, max_velocity) for d, i in self.candidates]
+        self.q_min = [q_min for q_min, q_max in windows]
+        self.q_max = [q_max for q_min, q_max in windows]
+        if HAS_NUMPY:
+            self._q_min = np.array(self.q_min)
+            self._q_max = np.array(self.q_max)
+
+    def _fits(self, candidate, Q):
+        return self.q_min[candidate] <= Q <= self.q_max[candidate]
+
+    def _solve(self, Q, candidates):
+        """Наполнение и скорость для выбранных вариантов одним пакетом"""
+        d = [self.candidates[c][0] for c in candidates]
+        i = [self.candidates[c][1] for c in candidates]
+        h_d, v, converged = filling_speed_batch(Q, d, i, self.n)
+        return [SizingOption(diameter=d_c, slope=i_c, h_d=float(h), velocity=float(s))
+                for d_c, i_c, h, s in zip(d, i, h_d, v)]
+
+    def options(self, Q, count=3):
+        """Не более count самых дешевых подходящих вариантов для расхода Q, л/с"""
+        try:
+            Q = float(Q)
+        except (TypeError, ValueError):
+            return []
+        candidates = [c for c in range(len(self.candidates)) if self._fits(c, Q)][:count]
+        if not candidates:
+            return []
+        return self._solve([Q] * len(candidates), candidates)
+
+    def best(self, Q_list):
+        """Самый дешевый подходящий вариант для каждого расхода (None, если его нет)"""
+        Q_list = list(Q_list)
+        if HAS_NUMPY:
+            Q = np.array([_to_float(value) for value in Q_list])
+            with np.errstate(invalid='ignore'):
+                fits = (Q[:, None] >= self._q_min[None, :]) & (Q[:, None] <= self._q_max[None, :])
+            # Варианты упорядочены по стоимости, поэтому первый подходящий - лучший
+            first = np.argmax(fits, axis=1)
+            rows = np.flatnonzero(fits[np.arange(len(Q)), first]) if len(Q) else []
+            chosen = [(row, first[row]) for row in rows]
+        else:
+            chosen = []
+            for row, value in enumerate(Q_list):
+                Q = _to_float(value)
+                for candidate in range(len(self.candidates)):
+                    if self._fits(candidate, Q):
+                        chosen.append((row, candidate))
+                        break
+
+        result = [None] * len(Q_list)
+        if chosen:
+            rows, candidates = zip(*chosen)
+            options = self._solve([_to_float(Q_list[row]) for row in rows], candidates)
+            for row, option in zip(rows, options):
+                result[row] = option
+        return result
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def size_pipe(Q, material=None, n=0.014, count=3):
+    """Самые дешевые варианты трубы для расхода Q, л/с"""
+    return PipeSizer(material, n).options(Q, count)
+
+
+def size_pipes(Q_list, material=None, n=0.014):
+    """Самый дешевый вариант трубы для каждого расхода из списка, л/с"""
+    return PipeSizer(material, n).best(Q_list)
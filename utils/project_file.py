@@ -0,0 +1,202 @@
+"""
+Файл проекта .hydro
+
+Формат контейнера (версия FORMAT_VERSION):
+    сигнатура MAGIC, версия формата (uint16), длина заголовка (uint32);
+    заголовок - JSON с метаданными проекта и оглавлением разделов
+    (имя, строк в порции, порции: смещение от конца заголовка, длина,
+    crc32);
+    порции - JSON данных вкладок, каждая сжата zlib отдельно. Таблицы
+    делятся на порции строк, остальные разделы - одна порция.
+
+Метаданные и оглавление читаются без распаковки разделов, раздел
+распаковывается при первом обращении к нему (ProjectSections). Сжатые
+порции хранятся вместе с данными и записываются при следующем
+сохранении без повторного кодирования. Файлы версии 1 (раздел - одна
+порция) и проекты прежнего формата (JSON целиком, без сигнатуры)
+по-прежнему читаются.
+"""
+
+import json
+import struct
+import zlib
+from collections.abc import MutableMapping
+
+MAGIC = b"HYDRO\x00"
+FORMAT_VERSION = 2
+PREAMBLE = struct.Struct("<6sHI")  # сигнатура, версия формата, длина заголовка
+COMPRESSION_LEVEL = 1  # Быстрое сжатие: уровень 6 медленнее в 4 раза при выигрыше ~10%
+
+
+class ProjectFileError(ValueError):
+    """Файл не является контейнером проекта или поврежден"""
+
+
+def is_project_file(file_path):
+    """Является ли файл контейнером .hydro (а не проектом в формате JSON)"""
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def encode_section(data):
+    """Сжатое представление данных раздела"""
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decode_section(payload):
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def decode_chunks(chunks, chunk_rows):
+    """Данные раздела из сжатых порций (chunk_rows=None - раздел одной порцией)"""
+    if chunk_rows is None:
+        return decode_section(chunks[0])
+    rows = []
+    for chunk in chunks:
+        rows.extend(decode_section(chunk))
+    return rows
+
+
+def write_project_file(f, metadata, sections):
+    """Запись контейнера с разделами sections (словарь или ProjectSections) в двоичный файл f"""
+    if not isinstance(sections, ProjectSections):
+        data, sections = sections, ProjectSections()
+        sections.update(data)
+    payloads = []
+    toc = []
+    offset = 0
+    for name in sections:
+        chunks, chunk_rows = sections.chunks(name)
+        entries = []
+        for payload in chunks:
+            entries.append({"offset": offset, "length": len(payload), "crc32": zlib.crc32(payload)})
+            payloads.append(payload)
+            offset += len(payload)
+        entry = {"name": name, "chunks": entries}
+        if chunk_rows is not None:
+            entry["chunk_rows"] = chunk_rows
+        toc.append(entry)
+
+    header = json.dumps({"metadata": metadata, "sections": toc},
+                        ensure_ascii=False).encode('utf-8')
+    f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+    f.write(header)
+    for payload in payloads:
+        f.write(payload)
+
+
+def _read_header(f):
+    preamble = f.read(PREAMBLE.size)
+    if len(preamble) < PREAMBLE.size:
+        raise ProjectFileError("Файл слишком короткий")
+    magic, version, header_length = PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise ProjectFileError("Файл не является проектом .hydro")
+    if version > FORMAT_VERSION:
+        raise ProjectFileError(f"Версия формата {version} не поддерживается")
+    return json.loads(f.read(header_length).decode('utf-8'))
+
+
+def read_metadata(file_path):
+    """Метаданные проекта (разделы не читаются)"""
+    with open(file_path, 'rb') as f:
+        return _read_header(f).get("metadata", {})
+
+
+class ProjectFile:
+    """
+    Прочитанный контейнер проекта.
+
+    Файл читается целиком одним обращением к диску (файл может быть
+    перезаписан при следующем сохранении), разделы распаковываются
+    только по запросу.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            header = _read_header(f)
+            self._data = f.read()
+        self.metadata = header.get("metadata", {})
+        self.toc = {entry["name"]: entry for entry in header.get("sections", [])}
+
+    @property
+    def names(self):
+        return list(self.toc)
+
+    def chunks(self, name):
+        """Сжатые порции раздела и строк в порции (проверяются контрольные суммы)"""
+        entry = self.toc[name]
+        chunks = []
+        for chunk in entry.get("chunks", [entry]):  # В версии 1 - одна порция
+            payload = self._data[chunk["offset"]:chunk["offset"] + chunk["length"]]
+            if len(payload) != chunk["length"] or zlib.crc32(payload) != chunk["crc32"]:
+                raise ProjectFileError(f"Раздел '{name}' поврежден")
+            chunks.append(payload)
+        return chunks, entry.get("chunk_rows")
+
+    def read(self, name):
+        """Распакованные данные раздела"""
+        return decode_chunks(*self.chunks(name))
+
+
+class ProjectSections(MutableMapping):
+    """
+    Данные проекта по разделам.
+
+    Раздел хранится распакованным, сжатыми порциями или в обоих видах;
+    недостающий вид получается при первом обращении.
+    """
+
+    def __init__(self, project_file=None):
+        self._file = project_file
+        self._names = list(project_file.toc) if project_file is not None else []
+        self._loaded = {}  # имя -> данные
+        self._chunks = {}  # имя -> (сжатые порции, строк в порции)
+
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            self._loaded[name] = decode_chunks(*self.chunks(name))
+        return self._loaded[name]
+
+    def __setitem__(self, name, value):
+        if name not in self._names:
+            self._names.append(name)
+        self._loaded[name] = value
+        self._chunks.pop(name, None)
+
+    def __delitem__(self, name):
+        self._names.remove(name)
+        self._loaded.pop(name, None)
+        self._chunks.pop(name, None)
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def is_loaded(self, name):
+        return name in self._loaded
+
+    def chunks(self, name):
+        """Сжатые порции раздела и строк в порции (None - раздел одной порцией)"""
+        if name not in self._chunks:
+            if name in self._loaded:
+                self._chunks[name] = ([encode_section(self._loaded[name])], None)
+            elif name in self._names and self._file is not None:
+                self._chunks[name] = self._file.chunks(name)
+            else:
+                raise KeyError(name)
+        return self._chunks[name]
+
+    def set_chunks(self, name, chunks, chunk_rows):
+        """Замена раздела уже сжатыми порциями (данные распакуются при обращении)"""
+        if name not in self._names:
+            self._names.append(name)
+        self._chunks[name] = (list(chunks), chunk_rows)
+        self._loaded.pop(name, None)
@@ -0,0 +1,222 @@
+"""
+Постоянный кэш результатов гидравлического расчета
+
+Результаты хранятся в базе SQLite в папке проектов и переживают
+перезапуск приложения. Ключ - версия решателя и квантованные исходные
+данные (см. utils.solver_cache.quantize). При открытии базы записи
+других версий решателя удаляются, при превышении допустимого размера
+вытесняются давно не использовавшиеся записи.
+
+База не опрашивается на каждый промах: последние использованные
+результаты загружаются в кэш в памяти целиком, а новые записываются
+пакетами (см. SolverCache.attach_store). Запись в базу стоит дороже
+самого пакетного расчета, поэтому put_many, touch_many и clear только
+ставят пакет в очередь: записи выполняются по порядку в отдельном
+потоке, close дожидается их окончания.
+"""
+
+import math
+import os
+import queue
+import sqlite3
+import threading
+
+from functions import SOLVER_VERSION
+
+DEFAULT_MAX_ROWS = 200000  # Максимальное количество записей в базе
+EVICT_FRACTION = 0.1       # Доля записей, удаляемых при переполнении
+FILE_NAME = "result_cache.sqlite"
+STORE_FORMAT = 2  # Версия схемы базы; база другой схемы создается заново
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    version INTEGER NOT NULL,
+    q REAL NOT NULL,
+    d REAL NOT NULL,
+    i REAL NOT NULL,
+    n REAL NOT NULL,
+    h_d REAL NOT NULL,
+    velocity REAL NOT NULL,
+    converged INTEGER NOT NULL,
+    surcharged INTEGER NOT NULL,
+    required_diameter REAL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (version, q, d, i, n)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+class ResultStore:
+    def __init__(self, file_path, max_rows=DEFAULT_MAX_ROWS, version=SOLVER_VERSION):
+        self.file_path = file_path
+        self.max_rows = max_rows
+        self.version = version
+        self.connection = None
+        self.loaded = 0
+        self.writes = 0
+        self.evictions = 0
+        self._clock = 0  # Счетчик обращений для вытеснения старых записей
+        self._rows = 0
+        self._queue = queue.Queue()  # Пакеты записи: (метод, аргументы)
+        self._writer = None          # Поток записи (запускается с первым пакетом)
+
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Соединение используется потоком записи
+            self.connection = sqlite3.connect(file_path, check_same_thread=False)
+            # Кэш можно пересчитать, поэтому надежность записи важна меньше скорости
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] != STORE_FORMAT:
+                self.connection.execute("DROP TABLE IF EXISTS results")
+                self.connection.execute(f"PRAGMA user_version = {STORE_FORMAT}")
+            self.connection.executescript(_SCHEMA)
+            with self.connection:
+                self.connection.execute("DELETE FROM results WHERE version != ?", (version,))
+            self._clock, self._rows = self.connection.execute(
+                "SELECT COALESCE(MAX(used), 0), COUNT(*) FROM results").fetchone()
+            print(f"Кэш результатов открыт: {file_path} ({self._rows} записей)")
+        except sqlite3.Error as e:
+            print(f"Ошибка открытия кэша результатов {file_path}: {e}")
+            self.close()
+
+    @property
+    def available(self):
+        return self.connection is not None
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _submit(self, method, *args):
+        """Постановка записи в очередь потока записи"""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="result-store", daemon=True)
+            self._writer.start()
+        self._queue.put((method, args))
+
+    def _write_loop(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                method, args = task
+                try:
+                    method(*args)
+                except sqlite3.Error as e:
+                    print(f"Ошибка записи кэша результатов: {e}")
+            finally:
+                self._queue.task_done()
+
+    def load(self, limit):
+        """
+        Последние использованные результаты (не более limit).
+
+        Возвращает пары (ключ, результат SolverCache.solve) от давних к
+        недавним - в порядке заполнения LRU-кэша.
+        """
+        if not self.available or limit <= 0:
+            return []
+        self._queue.join()  # Сначала записываются поставленные в очередь пакеты
+        try:
+            rows = self.connection.execute(
+                "SELECT q, d, i, n, h_d, velocity, converged, surcharged, required_diameter "
+                "FROM results "
+                "WHERE version = ? ORDER BY used DESC LIMIT ?",
+                (self.version, limit)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Ошибка чтения кэша результатов: {e}")
+            return []
+        self.loaded += len(rows)
+        return [((q, d, i, n), (h_d, v, bool(converged), bool(surcharged),
+                                math.nan if required is None else required))
+                for q, d, i, n, h_d, v, converged, surcharged, required in reversed(rows)]
+
+    def put_many(self, items):
+        """Сохранение результатов: items - пары (ключ, результат SolverCache.solve)"""
+        if self.available and items:
+            self._submit(self._put_many, list(items))
+
+    def _put_many(self, items):
+        # Некорректные исходные данные (результат nan) не сохраняются
+        items = [(key, result) for key, result in items
+                 if math.isfinite(result[0]) and math.isfinite(result[1])]
+        if not items:
+            return
+        used = self._tick()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(version, q, d, i, n, h_d, velocity, converged, surcharged, required_diameter, used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.version,) + tuple(key) + (h_d, v, int(converged), int(surcharged),
+                                                 required if math.isfinite(required) else None, used)
+                 for key, (h_d, v, converged, surcharged, required) in items])
+        self.writes += len(items)
+        self._rows += len(items)
+        if self._rows > self.max_rows:
+            self._evict()
+
+    def touch_many(self, keys):
+        """Отметка использования записей, чтобы они не были вытеснены"""
+        if self.available and keys:
+            self._submit(self._touch_many, list(keys))
+
+    def _touch_many(self, keys):
+        used = self._tick()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE results SET used = ? "
+                "WHERE version = ? AND q = ? AND d = ? AND i = ? AND n = ?",
+                [(used, self.version) + tuple(key) for key in keys])
+
+    def _evict(self):
+        """Удаление давно не использовавшихся записей при переполнении"""
+        self._rows = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = self._rows - self.max_rows
+        if excess <= 0:
+            return
+        count = excess + int(self.max_rows * EVICT_FRACTION)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY used LIMIT ?)", (count,))
+        self._rows -= count
+        self.evictions += count
+
+    def clear(self):
+        """Удаление всех записей"""
+        if self.available:
+            self._submit(self._clear)
+
+    def _clear(self):
+        with self.connection:
+            self.connection.execute("DELETE FROM results")
+        self._rows = 0
+
+    def stats(self):
+        """Статистика использования базы"""
+        return {
+            'rows': self._rows,
+            'max_rows': self.max_rows,
+            'loaded': self.loaded,
+            'writes': self.writes,
+            'evictions': self.evictions
+        }
+
+    def close(self):
+        """Окончание поставленных в очередь записей и закрытие базы"""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except sqlite3.Error:
+                pass
+            self.connection = None
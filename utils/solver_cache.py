@@ -0,0 +1,257 @@
+"""
+Кэш результатов расчета наполнения и скорости
+
+Строки таблиц часто повторяют одни и те же диаметр, уклон и
+шероховатость, а расходы отличаются лишь в последних знаках.
+Исходные данные округляются до шагов квантования, расчет выполняется
+по округленным значениям, результат хранится в ограниченном LRU-кэше.
+При подключенном постоянном хранилище (utils.result_store) кэш
+заполняется из него при подключении, а новые результаты записываются
+туда пакетами. Перегруженные трубы отсеиваются по индексу
+пропускной способности (utils.capacity_index) без итераций; для них
+в результате хранится признак перегрузки и требуемый диаметр.
+
+Кэш используется при расчете отдельных труб (solve, filling_speed).
+Таблицы рассчитываются пакетом (solve_batch) без кэша: векторный расчет
+строки дешевле, чем ее поиск в словаре результатов.
+
+Кэшем можно пользоваться из рабочего потока (utils.background):
+обращения к словарю результатов защищены блокировкой, а хранилище
+записывает пакеты в собственном потоке, поэтому flush можно вызывать
+из любого потока.
+"""
+
+import threading
+from collections import OrderedDict
+
+from functions import HAS_NUMPY, required_diameter
+from utils.capacity_index import capacity_index
+from utils.parallel import filling_speed_batch
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+DEFAULT_MAX_SIZE = 20000  # Максимальное количество хранимых результатов
+FLUSH_SIZE = 500          # Количество новых результатов для записи в хранилище
+
+# Количество знаков после запятой при квантовании исходных данных
+Q_DIGITS = 3   # расход, л/с
+D_DIGITS = 1   # диаметр, мм
+I_DIGITS = 6   # уклон
+N_DIGITS = 4   # шероховатость
+DIGITS = (Q_DIGITS, D_DIGITS, I_DIGITS, N_DIGITS)
+
+NAN = float('nan')
+# Результат: (h/d, скорость, сходимость, перегрузка, требуемый диаметр или nan)
+INVALID_RESULT = (NAN, NAN, False, False, NAN)  # Результат для некорректных данных
+
+
+_Q_SCALE, _D_SCALE, _I_SCALE, _N_SCALE = (10.0 ** digits for digits in DIGITS)
+
+
+def quantize(Q, d, i, n):
+    """Ключ кэша: округленные исходные данные (ValueError/OverflowError для nan и inf)"""
+    # Округление умножением, как в numpy.round, поэтому ключи строк и столбцов
+    # совпадают; round(x, k) заметно медленнее
+    return (round(float(Q) * _Q_SCALE) / _Q_SCALE, round(float(d) * _D_SCALE) / _D_SCALE,
+            round(float(i) * _I_SCALE) / _I_SCALE, round(float(n) * _N_SCALE) / _N_SCALE)
+
+
+def _required_diameter(Q, i, n):
+    """Требуемый диаметр перегруженной трубы, мм (nan, если подобрать нельзя)"""
+    try:
+        return required_diameter(Q, i, n)
+    except (ValueError, ZeroDivisionError, OverflowError):
+        return NAN
+
+
+def pipe_limits(d, i, n):
+    """
+    Столбцы максимального расхода и наполнения (q_max, h_d_max) из индекса
+    пропускной способности; каждая труба ищется в индексе один раз.
+    """
+    pipes = {}  # (d, i, n) -> (q_max, h_d_max)
+    q_max, h_d_max = [], []
+    for pipe in zip(d, i, n):
+        limits = pipes.get(pipe)
+        if limits is None:
+            entry = capacity_index.lookup(*pipe)
+            limits = pipes[pipe] = (entry.q_max, entry.h_d_max) if entry else (NAN, NAN)
+        q_max.append(limits[0])
+        h_d_max.append(limits[1])
+    return q_max, h_d_max
+
+
+def _surcharged(Q, q_max):
+    """Признаки перегрузки для столбцов расхода и максимального расхода"""
+    if HAS_NUMPY:
+        try:
+            return (np.asarray(Q, dtype=float) >= np.asarray(q_max, dtype=float)).tolist()
+        except (TypeError, ValueError):
+            pass  # Нечисловые значения - построчно
+    surcharged = []
+    for value, limit in zip(Q, q_max):
+        try:
+            surcharged.append(float(value) >= limit)
+        except (TypeError, ValueError):
+            surcharged.append(False)
+    return surcharged
+
+
+class SolverCache:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._results = OrderedDict()  # ключ -> результат (см. INVALID_RESULT)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0  # Промахи, отсеянные по индексу пропускной способности
+        self.store = None  # Постоянное хранилище результатов (ResultStore)
+        self._unsaved = []  # Новые результаты, еще не записанные в хранилище
+        self._lock = threading.RLock()
+
+    def attach_store(self, store):
+        """Подключение постоянного хранилища и загрузка из него последних результатов"""
+        self.detach_store()
+        if store is None or not store.available:
+            return
+        self.store = store
+        with self._lock:
+            for key, result in store.load(self.max_size):
+                self._put(key, result)
+
+    def detach_store(self):
+        """Запись несохраненных результатов, отключение и закрытие хранилища"""
+        if self.store is None:
+            return
+        self.flush()
+        # Результаты, оставшиеся в памяти, использовались последними
+        with self._lock:
+            keys = list(self._results)
+        store, self.store = self.store, None
+        store.touch_many(keys)
+        store.close()
+
+    def flush(self):
+        """Передача новых результатов в постоянное хранилище"""
+        with self._lock:
+            store, unsaved, self._unsaved = self.store, self._unsaved, []
+        if store is not None and unsaved:
+            store.put_many(unsaved)
+
+    def _remember(self, key, result):
+        """Сохранение нового результата в кэше и очереди на запись"""
+        self._put(key, result)
+        if self.store is not None:
+            self._unsaved.append((key, result))
+
+    def _get(self, key):
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+        return result
+
+    def _put(self, key, result):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def solve(self, Q, d, i, n):
+        """Результат (h/d, скорость, сходимость, перегрузка, требуемый диаметр) для одной трубы"""
+        try:
+            key = quantize(Q, d, i, n)
+        except (TypeError, ValueError, OverflowError):
+            return INVALID_RESULT
+        with self._lock:
+            result = self._get(key)
+            if result is None:
+                self.misses += 1
+        if result is None:
+            solved = capacity_index.solve(*key)
+            result = (solved.h_d, solved.velocity, solved.converged, solved.surcharged,
+                      NAN if solved.required_diameter is None else solved.required_diameter)
+            with self._lock:
+                self.rejected += solved.surcharged
+                self._remember(key, result)
+            if len(self._unsaved) >= FLUSH_SIZE:
+                self.flush()
+        return result
+
+    def filling_speed(self, Q, d, i, n):
+        """Кэшируемый аналог functions.filling_speed"""
+        return self.solve(Q, d, i, n)[:2]
+
+    def solve_batch(self, Q, d, i, n):
+        """
+        Результаты (как solve) для столбцов исходных данных, по строкам.
+
+        Пакет рассчитывается без обращения к кэшу: векторный расчет
+        (functions.filling_speed_batch) дешевле построчного поиска в
+        словаре даже при всех строках в кэше. Пропускная способность
+        берется из индекса один раз на трубу, перегруженные строки
+        отсеиваются по q_max без итераций, большие пакеты считаются в пуле
+        процессов (utils.parallel).
+        """
+        h_d, v, converged, surcharged, required = self._solve_columns(Q, d, i, n)
+        if HAS_NUMPY:
+            h_d, v, converged = h_d.tolist(), v.tolist(), converged.tolist()
+        return list(zip(h_d, v, converged, surcharged, required))
+
+    def filling_speed_batch(self, Q, d, i, n):
+        """Аналог functions.filling_speed_batch с отсевом перегруженных труб по индексу (см. solve_batch)"""
+        return self._solve_columns(Q, d, i, n)[:3]
+
+    def _solve_columns(self, Q, d, i, n):
+        """Столбцы h/d, скорости, сходимости, перегрузки и требуемого диаметра"""
+        size = max(len(x) if hasattr(x, '__len__') else 1 for x in (Q, d, i, n))
+        Q, d, i, n = (x if hasattr(x, '__len__') else [x] * size for x in (Q, d, i, n))
+        q_max, h_d_max = pipe_limits(d, i, n)
+        h_d, v, converged = filling_speed_batch(Q, d, i, n, q_max=q_max, h_d_max=h_d_max)
+        surcharged = _surcharged(Q, q_max)
+        required = [_required_diameter(Q[row], i[row], n[row]) if overloaded else NAN
+                    for row, overloaded in enumerate(surcharged)]
+        with self._lock:
+            self.rejected += sum(surcharged)
+        return h_d, v, converged, surcharged, required
+
+    def stats(self):
+        """Статистика использования кэша"""
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._results),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'store': self.store.stats() if self.store is not None else None
+        }
+
+    def clear(self):
+        """Очистка кэша и статистики"""
+        with self._lock:
+            self._results.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def __str__(self):
+        stats = self.stats()
+        return (f"записей {stats['size']}/{stats['max_size']}, попаданий {stats['hits']}, "
+                f"промахов {stats['misses']} (перегрузка по индексу {stats['rejected']}), "
+                f"вытеснений {stats['evictions']}, "
+                f"доля попаданий {stats['hit_rate']:.1%}"
+                + (f", загружено из базы {stats['store']['loaded']}" if stats['store'] else ""))
+
+
+# Общий кэш для всех вкладок и диалогов
+solver_cache = SolverCache()